@@ -0,0 +1,245 @@
+"""
+JSON API for the magic-link flow.
+
+Mirrors accounts.views for front-ends and mobile clients: the same
+validators, rate limits, tokens and email service, but each step answers
+with a small JSON body and a meaningful status code instead of a rendered
+page or a redirect through the messages framework. Nothing is written to
+the session except by a successful login.
+
+All endpoints take POST with a JSON (or form-encoded) body and keep CSRF
+protection: send the csrftoken cookie value in the X-CSRFToken header.
+"""
+
+import json
+import logging
+import math
+from functools import wraps
+
+from django.contrib.auth import get_user_model, login
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+
+from . import events
+from .models import AuthEvent
+from .rate_limit import is_rate_limited
+from .validators import validate_email_address, validate_name
+from .views import LOGIN_RATE_LIMIT, REGISTER_RATE_LIMIT
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+class _BadRequest(Exception):
+    """Raised when the request body cannot be parsed."""
+
+
+def _payload(request):
+    """
+    Read request data from a JSON or form-encoded body.
+
+    Returns:
+        Dictionary of submitted fields
+
+    Raises:
+        _BadRequest: If a JSON body is malformed or not an object
+    """
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError as e:
+            raise _BadRequest("Request body is not valid JSON.") from e
+        if not isinstance(data, dict):
+            raise _BadRequest("Request body must be a JSON object.")
+        return data
+    return request.POST
+
+
+def _field(data, name):
+    value = data.get(name, "")
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _error(status, code, message, **headers):
+    response = JsonResponse({"error": code, "message": message}, status=status)
+    for name, value in headers.items():
+        response[name.replace("_", "-")] = value
+    return response
+
+
+def _rate_limited(request, action, email, limit_config):
+    """Return a 429 response if the email is over its limit, else None."""
+    if is_rate_limited(action, email.lower(), limit_config["limit"], limit_config["window"]):
+        events.record(AuthEvent.Kind.RATE_LIMITED, email, request, detail=action)
+        return _error(429, "rate_limited", "Too many requests. Please try again later.",
+                      Retry_After=str(limit_config["window"]))
+    return None
+
+
+def api_view(view):
+    """Restrict a view to POST and turn malformed bodies into 400 responses."""
+    @require_POST
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except _BadRequest as e:
+            return _error(400, "bad_request", str(e))
+    return wrapper
+
+
+@api_view
+def register(request):
+    """
+    Create an account and send a verification email.
+
+    Returns:
+        201 when created, 202 when a verification email was re-sent to an
+        unverified account, 400 on invalid input, 409 if the email is
+        already verified, 429 when rate limited
+    """
+    from .services import MailCircuitOpen, send_verification_email
+
+    data = _payload(request)
+    email, name = _field(data, "email"), _field(data, "name")
+    mailing_list = bool(data.get("mailing_list"))
+
+    for field, (is_valid, message) in (("email", validate_email_address(email)), ("name", validate_name(name))):
+        if not is_valid:
+            return JsonResponse({"error": "invalid", "field": field, "message": message}, status=400)
+
+    limited = _rate_limited(request, "register", email, REGISTER_RATE_LIMIT)
+    if limited:
+        return limited
+
+    existing = User.objects.filter(email=email).only("is_verified", "name").first()
+    if existing is not None and existing.is_verified:
+        return _error(409, "already_registered", "This email is already registered. Please log in instead.")
+
+    if existing is None:
+        try:
+            User.objects.create_user(email=email, name=name, mailing_list=mailing_list)
+        except IntegrityError:
+            return _error(409, "already_registered", "This email is already registered. Please log in instead.")
+        events.record(AuthEvent.Kind.REGISTERED, email, request)
+    status = 202 if existing is not None else 201
+    try:
+        send_verification_email(request, email, existing.name if existing is not None else name)
+        email_sent = True
+        events.record(AuthEvent.Kind.VERIFICATION_SENT, email, request)
+    except MailCircuitOpen:
+        email_sent = False
+        events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="circuit_open")
+    except Exception as e:
+        logger.error("Failed to send verification email: %s", e)
+        email_sent = False
+        events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="verification")
+    return JsonResponse({"status": "verification_sent" if email_sent else "created", "email_sent": email_sent},
+                        status=status)
+
+
+@api_view
+def login_request(request):
+    """
+    Send a login link to a verified account.
+
+    Returns:
+        202 when sent, 200 if already signed in, 400 on invalid input,
+        403 for unverified accounts, 404 for unknown emails, 429 when rate
+        limited, 503 if the email could not be sent
+    """
+    from .services import MailCircuitOpen, send_login_email
+
+    if request.user.is_authenticated:
+        return JsonResponse({"status": "already_authenticated"})
+
+    email = _field(_payload(request), "email")
+    is_valid, message = validate_email_address(email)
+    if not is_valid:
+        return JsonResponse({"error": "invalid", "field": "email", "message": message}, status=400)
+
+    limited = _rate_limited(request, "login", email, LOGIN_RATE_LIMIT)
+    if limited:
+        return limited
+
+    user = User.objects.filter(email=email).only("is_verified", "name").first()
+    if user is None:
+        return _error(404, "not_found", "No account found with this email address.")
+    if not user.is_verified:
+        return _error(403, "unverified", "Please verify your email address before logging in.")
+
+    try:
+        send_login_email(request, email, user.name)
+    except MailCircuitOpen as e:
+        events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="circuit_open")
+        return _error(503, "mail_unavailable", "Email is temporarily unavailable. Please try again shortly.",
+                      Retry_After=str(max(1, math.ceil(e.retry_after))))
+    except Exception as e:
+        logger.error("Failed to send login email: %s", e)
+        events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="login")
+        return _error(503, "mail_unavailable", "We couldn't send the login email. Please try again later.",
+                      Retry_After="60")
+    events.record(AuthEvent.Kind.LOGIN_LINK_SENT, email, request)
+    return JsonResponse({"status": "login_link_sent"}, status=202)
+
+
+@api_view
+def verify_email(request):
+    """
+    Mark an account verified using a verification token.
+
+    Returns:
+        200 when verified (or already verified), 400 for a missing,
+        invalid or expired token, 404 if the account no longer exists
+    """
+    from .tokens import verify_verification_token
+
+    token = _field(_payload(request), "token")
+    if not token:
+        return _error(400, "invalid", "Verification token is missing.")
+
+    data = verify_verification_token(token)
+    if not data:
+        events.record(AuthEvent.Kind.TOKEN_REJECTED, request=request, detail="verify")
+        return _error(400, "invalid_token", "Invalid or expired verification token.")
+
+    updated = User.objects.filter(email=data.email, is_verified=False).update(is_verified=True)
+    if updated:
+        events.record(AuthEvent.Kind.VERIFIED, data.email, request)
+        return JsonResponse({"status": "verified"})
+    if User.objects.filter(email=data.email).exists():
+        return JsonResponse({"status": "already_verified"})
+    return _error(404, "not_found", "User account not found.")
+
+
+@api_view
+def login_confirm(request):
+    """
+    Sign in using a login token.
+
+    Returns:
+        200 with the user's email and name, 400 for a missing, invalid or
+        expired token, 403 for unverified accounts, 404 if the account no
+        longer exists
+    """
+    from .tokens import verify_login_token
+
+    token = _field(_payload(request), "token")
+    if not token:
+        return _error(400, "invalid", "Login token is missing.")
+
+    data = verify_login_token(token)
+    if not data:
+        events.record(AuthEvent.Kind.TOKEN_REJECTED, request=request, detail="login")
+        return _error(400, "invalid_token", "Invalid or expired login token.")
+
+    user = User.objects.filter(email=data.email).first()
+    if user is None:
+        return _error(404, "not_found", "User account not found.")
+    if not user.is_verified:
+        return _error(403, "unverified", "Please verify your email address before logging in.")
+
+    login(request, user)
+    events.record(AuthEvent.Kind.LOGGED_IN, user.email, request)
+    return JsonResponse({"status": "logged_in", "user": {"email": user.email, "name": user.name}})
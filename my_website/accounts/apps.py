@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from core import metrics
+
+        from . import events  # noqa: F401
+        from .mail_circuit import mail_breaker
+        from .token_cache import rejected_tokens
+
+        # Registered here rather than where they are used: accounts.services
+        # and accounts.tokens are only imported on the first mail or token
+        metrics.register("mail_circuit", mail_breaker.state)
+        metrics.register("token_negative_cache", rejected_tokens.snapshot)
@@ -0,0 +1,234 @@
+"""
+Precompiled multipart emails.
+
+Rendering a Django template for every message would dominate a bulk send,
+so each EmailTemplate is rendered once per process with placeholders in
+place of its per-recipient fields (link, name, ...). The HTML part has its
+<style> rules inlined into style attributes at that point, since many mail
+clients ignore <style> blocks. Both parts are then split into static
+chunks around the placeholders. A message costs one HTML-escape per field
+and a join, not a template render.
+
+Per-recipient fields are only known at send time: templates may print
+them ({{ link }}) but must not filter or branch on them. Everything else
+in the template is fixed when it is compiled.
+"""
+
+import html
+import re
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import get_template
+
+# Surrounds a field name in the compile-time render; survives HTML escaping
+_MARK = "\x1f"
+_SLOT = re.compile(f"{_MARK}(\\w+){_MARK}")
+
+_STYLE_BLOCK = re.compile(r"<style[^>]*>(.*?)</style>\s*", re.DOTALL | re.IGNORECASE)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][a-zA-Z0-9]*)?(?:\.([\w-]+))?$")
+_START_TAG = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)((?:\s[^<>]*?)?)(/?)>")
+_CLASS_ATTR = re.compile(r"""\sclass\s*=\s*(["'])(.*?)\1""", re.DOTALL)
+_STYLE_ATTR = re.compile(r"""\sstyle\s*=\s*(["'])(.*?)\1""", re.DOTALL)
+
+
+class CompiledText:
+    """A rendered body split into static chunks and per-recipient slots."""
+
+    def __init__(self, rendered, fields, escape):
+        pieces = _SLOT.split(rendered)
+        unknown = set(pieces[1::2]) - set(fields)
+        if unknown:
+            raise ValueError(f"Unknown email fields: {', '.join(sorted(unknown))}")
+        self.escape = escape
+        self._parts = pieces
+        self._slots = [(index, pieces[index]) for index in range(1, len(pieces), 2)]
+
+    def render(self, values):
+        """
+        Fill the slots.
+
+        Args:
+            values: {field: value}; values are HTML-escaped for HTML bodies
+
+        Returns:
+            Message body string
+        """
+        if self.escape:
+            values = {field: html.escape(str(value)) for field, value in values.items()}
+        parts = self._parts[:]
+        for index, field in self._slots:
+            parts[index] = values[field]
+        return "".join(parts)
+
+
+def render_placeholders(template, context=None, fields=()):
+    """
+    Render a template once with placeholders for per-recipient fields.
+
+    Args:
+        template: Template from django.template.loader or engines[...].from_string
+        context: Values shared by every message
+        fields: Names of the per-recipient fields
+
+    Returns:
+        Rendered string for CompiledText
+    """
+    return template.render({**(context or {}), **{field: f"{_MARK}{field}{_MARK}" for field in fields}})
+
+
+def _parse_css(css):
+    """
+    Split a stylesheet into inlinable rules and the rest.
+
+    Returns:
+        Tuple of ([(specificity, order, tag, class, declarations)], leftover CSS)
+    """
+    css = _CSS_COMMENT.sub("", css)
+    rules, leftover, order = [], [], 0
+    pos = 0
+    while True:
+        brace = css.find("{", pos)
+        if brace == -1:
+            break
+        selector = css[pos:brace].strip()
+        # Find the matching close brace (at-rules nest one level)
+        depth, end = 1, brace + 1
+        while depth and end < len(css):
+            depth += {"{": 1, "}": -1}.get(css[end], 0)
+            end += 1
+        body = css[brace + 1:end - 1].strip()
+        pos = end
+
+        parsed = [_SIMPLE_SELECTOR.match(part.strip()) for part in selector.split(",")]
+        if selector.startswith("@") or not all(match and any(match.groups()) for match in parsed):
+            leftover.append(f"{selector} {{ {body} }}")
+            continue
+        declarations = [d.strip().replace('"', "'") for d in body.split(";") if d.strip()]
+        for match in parsed:
+            tag, cls = match.groups()
+            specificity = (1 if cls else 0, 1 if tag else 0)
+            rules.append((specificity, order, tag and tag.lower(), cls, declarations))
+            order += 1
+    rules.sort(key=lambda rule: rule[:2])
+    return rules, "\n".join(leftover)
+
+
+def inline_css(document):
+    """
+    Move simple <style> rules into style attributes.
+
+    Type (p), class (.button) and type-plus-class (a.button) selectors are
+    inlined in specificity order; an existing style attribute wins. Other
+    rules, such as @media queries, stay in a <style> block.
+
+    Args:
+        document: HTML string
+
+    Returns:
+        HTML string with inlined styles
+    """
+    css = "\n".join(_STYLE_BLOCK.findall(document))
+    if not css:
+        return document
+    rules, leftover = _parse_css(css)
+    head_style = f"<style>\n{leftover}\n</style>\n" if leftover else ""
+    first = _STYLE_BLOCK.search(document)
+    document = document[:first.start()] + "\0" + _STYLE_BLOCK.sub("", document[first.start():])
+
+    def apply(match):
+        tag, attrs, closing = match.group(1).lower(), match.group(2), match.group(3)
+        class_match = _CLASS_ATTR.search(attrs)
+        classes = set(class_match.group(2).split()) if class_match else set()
+        declarations = [
+            d for _, _, rule_tag, cls, decls in rules
+            if (rule_tag is None or rule_tag == tag) and (cls is None or cls in classes)
+            for d in decls
+        ]
+        if not declarations:
+            return match.group(0)
+        style_match = _STYLE_ATTR.search(attrs)
+        if style_match:
+            declarations.append(style_match.group(2).strip().rstrip(";"))
+            attrs = attrs[:style_match.start()] + attrs[style_match.end():]
+        return f'<{match.group(1)}{attrs} style="{"; ".join(declarations)}"{closing}>'
+
+    return _START_TAG.sub(apply, document).replace("\0", head_style, 1)
+
+
+class EmailTemplate:
+    """
+    A subject plus text and HTML templates, compiled on first use.
+
+    Templates are loaded from "<name>.txt" and "<name>.html".
+    """
+
+    def __init__(self, name, subject, fields=("link", "name")):
+        self.name = name
+        self.subject = subject
+        self.fields = tuple(fields)
+        self._compiled = None
+        self._lock = threading.Lock()
+
+    def compile(self):
+        """
+        Render and split both bodies (once per process).
+
+        Returns:
+            Tuple of (text CompiledText, html CompiledText)
+        """
+        if self._compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    context = {"subject": self.subject}
+                    text = render_placeholders(get_template(f"{self.name}.txt"), context, self.fields)
+                    body = inline_css(render_placeholders(get_template(f"{self.name}.html"), context, self.fields))
+                    self._compiled = (
+                        CompiledText(text, self.fields, escape=False),
+                        CompiledText(body, self.fields, escape=True),
+                    )
+        return self._compiled
+
+    def render(self, **values):
+        """
+        Render both bodies for one recipient.
+
+        Args:
+            **values: A value for every field
+
+        Returns:
+            Tuple of (text body, HTML body)
+        """
+        text, body = self.compile()
+        return text.render(values), body.render(values)
+
+    def message(self, to, from_email=None, connection=None, **values):
+        """
+        Build a multipart message for one recipient.
+
+        Args:
+            to: Recipient email address
+            from_email: Sender (defaults to EMAIL_HOST_USER)
+            connection: Optional open mail connection
+            **values: A value for every field
+
+        Returns:
+            EmailMultiAlternatives instance
+        """
+        text, body = self.render(**values)
+        message = EmailMultiAlternatives(
+            self.subject, text, from_email or settings.EMAIL_HOST_USER, [to], connection=connection,
+        )
+        message.attach_alternative(body, "text/html")
+        return message
+
+    def reset(self):
+        """Forget the compiled bodies so templates are reloaded on next use."""
+        with self._lock:
+            self._compiled = None
+
+
+VERIFY_EMAIL = EmailTemplate("accounts/email/verify", "Verify your account")
+LOGIN_EMAIL = EmailTemplate("accounts/email/login", "Your login link")
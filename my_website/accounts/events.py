@@ -0,0 +1,174 @@
+"""
+Write-behind auth event log.
+
+record() appends an unsaved AuthEvent to an in-memory buffer and returns
+at once; nothing touches the database on the request path. After a
+response has been sent (request_finished) the buffer is written with one
+bulk_create if it has reached AUTH_EVENT_LOG["flush_size"] events or
+"flush_interval" seconds have passed since the last flush. A daemon
+thread, started by the first record() in each process, also flushes every
+"flush_interval" seconds, so events recorded just before a worker goes
+quiet are not held in memory until its next request. Whatever is left is
+written at interpreter exit.
+
+The buffer is bounded by "max_buffer": when the database cannot keep up,
+new events are dropped and counted rather than growing memory. A failed
+flush is dropped and counted too. Both counters are reported through
+core.metrics.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import close_old_connections, transaction
+
+from core import metrics
+
+from .models import AuthEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    "enabled": True,
+    "max_buffer": 5000,
+    "flush_size": 100,
+    "flush_interval": 5.0,
+    "background_flush": True,
+}
+
+_buffer = []
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_last_flush = time.monotonic()
+_stats = {"recorded": 0, "flushed": 0, "dropped": 0, "failed": 0, "flushes": 0}
+# Process the flusher thread was started in; a forked child starts its own
+_flusher_pid = None
+
+
+def get_config():
+    """
+    Return the effective AUTH_EVENT_LOG configuration.
+
+    Returns:
+        Dictionary with enabled, max_buffer, flush_size, flush_interval and
+        background_flush
+    """
+    return {**DEFAULT_CONFIG, **getattr(settings, "AUTH_EVENT_LOG", {})}
+
+
+def record(kind, email="", request=None, detail=""):
+    """
+    Buffer an auth event for the next flush.
+
+    Args:
+        kind: AuthEvent.Kind value
+        email: Email address involved, if any
+        request: Request the event came from (for IP address and path)
+        detail: Short free-form context
+
+    Returns:
+        True if buffered, False if disabled or dropped under backpressure
+    """
+    config = get_config()
+    if not config["enabled"]:
+        return False
+    event = AuthEvent(kind=kind, email=(email or "")[:254], detail=str(detail)[:255])
+    if request is not None:
+        event.ip_address = request.META.get("REMOTE_ADDR") or None
+        event.path = request.path[:200]
+    if _flusher_pid != os.getpid() and config["background_flush"]:
+        _start_flusher()
+    with _lock:
+        if len(_buffer) >= config["max_buffer"]:
+            _stats["dropped"] += 1
+            return False
+        _buffer.append(event)
+        _stats["recorded"] += 1
+    return True
+
+
+def flush(force=False):
+    """
+    Write buffered events with a single bulk insert.
+
+    Args:
+        force: Flush regardless of the size and time thresholds
+
+    Returns:
+        Number of events written
+    """
+    global _last_flush
+    config = get_config()
+    with _lock:
+        due = len(_buffer) >= config["flush_size"] or time.monotonic() - _last_flush >= config["flush_interval"]
+        if not _buffer or not (force or due):
+            return 0
+        batch = _buffer[:]
+        _buffer.clear()
+        _last_flush = time.monotonic()
+
+    # Serialize flushes so batches land in order
+    with _flush_lock:
+        try:
+            with transaction.atomic():
+                AuthEvent.objects.bulk_create(batch, batch_size=config["flush_size"])
+        except Exception:
+            logger.exception("Dropping %d auth events after a failed flush", len(batch))
+            _stats["failed"] += len(batch)
+            return 0
+    _stats["flushed"] += len(batch)
+    _stats["flushes"] += 1
+    return len(batch)
+
+
+def pending():
+    """Number of events waiting to be flushed."""
+    return len(_buffer)
+
+
+def snapshot():
+    """Buffer depth and counters for the metrics view."""
+    return {"buffered": pending(), **_stats}
+
+
+def _start_flusher():
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name="auth-event-flusher", daemon=True).start()
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(get_config()["flush_interval"])
+        if not get_config()["background_flush"]:
+            continue
+        try:
+            flush()
+        except Exception:
+            logger.exception("Periodic auth event flush failed")
+        finally:
+            close_old_connections()
+
+
+def _flush_after_request(**kwargs):
+    flush()
+
+
+def _flush_at_exit():
+    try:
+        flush(force=True)
+    except Exception:
+        logger.exception("Final auth event flush failed")
+
+
+request_finished.connect(_flush_after_request, dispatch_uid="accounts.events.flush")
+atexit.register(_flush_at_exit)
+metrics.register("auth_events", snapshot)
@@ -0,0 +1,38 @@
+"""
+Periodic housekeeping jobs for the accounts app (see core.scheduler).
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.scheduler import job
+
+from . import events
+from .maintenance import purge_expired_magic_links, reap_unverified_users
+
+# Expired links are kept this long for support lookups before they are purged
+MAGIC_LINK_RETENTION = timedelta(days=1)
+UNVERIFIED_ACCOUNT_AGE = timedelta(days=7)
+
+
+@job(interval=60 * 60, budget=30)
+def purge_magic_links(budget):
+    """Delete magic links that expired more than a day ago."""
+    deleted = purge_expired_magic_links(
+        timezone.now() - MAGIC_LINK_RETENTION, should_stop=lambda: budget.exhausted,
+    )
+    return {"deleted": deleted}
+
+
+@job(interval=24 * 60 * 60, budget=60)
+def reap_unverified(budget):
+    """Delete accounts that have not verified their email within a week."""
+    return reap_unverified_users(timezone.now() - UNVERIFIED_ACCOUNT_AGE, should_stop=lambda: budget.exhausted)
+
+
+# The event buffer is per process, so every process flushes its own
+@job(interval=30, jitter=0.2, lock=False)
+def flush_auth_events(budget):
+    """Write buffered auth events even when no requests arrive to trigger a flush."""
+    return {"flushed": events.flush()}
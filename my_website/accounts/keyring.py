@@ -0,0 +1,184 @@
+"""
+Key-ID tagged signing keys for magic-link tokens.
+
+Tokens carry the ID of the key that signed them, so verification costs
+exactly one HMAC however many retired keys are still accepted. Each key's
+HMAC state is derived once per process and copied for every use, so
+signing does no key derivation on the request path.
+
+Keys live in a JSON file named by the MAGIC_LINK_KEYRING setting:
+
+    {"active": 3, "keys": {"0": null, "2": "<hex secret>", "3": "<hex secret>"}}
+
+Key IDs are 0-255; keys are listed oldest first. A null secret stands for
+SECRET_KEY, so tokens issued before the first rotation stay valid without
+copying SECRET_KEY into the file. The file is re-read when its mtime, size or inode
+changes; that is checked at most every KEYRING_CHECK_INTERVAL seconds, so
+a rotation by `manage.py rotate_magic_link_keys` reaches running
+processes without a restart. Without a keyring file, key 0 is derived
+from SECRET_KEY.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stat() calls on the keyring file
+KEYRING_CHECK_INTERVAL = 5.0
+
+KEY_SALT = "accounts.keyring.magic-link"
+
+_lock = threading.Lock()
+_cached = None
+
+
+class Keyring:
+    """Signing keys by ID, with precomputed HMAC state."""
+
+    def __init__(self, active, secrets, source=None):
+        if active not in secrets:
+            raise ImproperlyConfigured(f"Magic-link keyring has no key for active id {active}")
+        self.active = active
+        self.source = source
+        self._macs = {
+            kid: _derive(settings.SECRET_KEY if secret is None else secret) for kid, secret in secrets.items()
+        }
+
+    @property
+    def key_ids(self):
+        """Sorted key IDs."""
+        return sorted(self._macs)
+
+    def sign(self, body, kid=None):
+        """
+        HMAC a message with one key.
+
+        Args:
+            body: Bytes to authenticate
+            kid: Key ID (defaults to the active key)
+
+        Returns:
+            Full SHA-256 HMAC digest
+
+        Raises:
+            KeyError: If kid is not in the keyring
+        """
+        mac = self._macs[self.active if kid is None else kid].copy()
+        mac.update(body)
+        return mac.digest()
+
+
+def _derive(secret):
+    """Derive a purpose-bound key from a secret and return its HMAC state."""
+    key = hashlib.sha256(f"{KEY_SALT}{secret}".encode()).digest()
+    return hmac.new(key, digestmod=hashlib.sha256)
+
+
+def _signature(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def read_keyring_file(path):
+    """
+    Parse a keyring file.
+
+    Args:
+        path: Path to the JSON keyring
+
+    Returns:
+        Tuple of (active key ID, {key ID: secret or None}), oldest key first
+
+    Raises:
+        ImproperlyConfigured: If the file is malformed
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        secrets = {int(kid): None if secret is None else str(secret) for kid, secret in data["keys"].items()}
+        active = int(data["active"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ImproperlyConfigured(f"Invalid magic-link keyring {path}: {e}") from e
+    if any(not 0 <= kid <= 255 for kid in secrets):
+        raise ImproperlyConfigured(f"Magic-link key IDs in {path} must be between 0 and 255")
+    return active, secrets
+
+
+def write_keyring_file(path, active, secrets):
+    """
+    Atomically replace a keyring file (readable by the owner only).
+
+    Args:
+        path: Destination path
+        active: Active key ID
+        secrets: {key ID: secret or None}, oldest first
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    data = {"active": active, "keys": {str(kid): secret for kid, secret in secrets.items()}}
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2)
+    os.replace(tmp, path)
+
+
+def _load(path, signature):
+    if signature is None:
+        return Keyring(0, {0: settings.SECRET_KEY}, source=None)
+    active, secrets = read_keyring_file(path)
+    return Keyring(active, secrets, source=path)
+
+
+def get_keyring():
+    """
+    Return the current keyring, reloading it if the file changed.
+
+    Returns:
+        Keyring instance
+
+    Raises:
+        ImproperlyConfigured: If the keyring file is malformed on first load
+    """
+    global _cached
+    # SECRET_KEY is part of the identity because it is key 0 without a file
+    source = (getattr(settings, "MAGIC_LINK_KEYRING", None), settings.SECRET_KEY)
+    now = time.monotonic()
+    cached = _cached
+    if cached is not None and cached[0] == source and now < cached[2]:
+        return cached[3]
+
+    with _lock:
+        cached = _cached
+        path = Path(source[0]) if source[0] else None
+        signature = _signature(path) if path else None
+        if cached is not None and cached[0] == source and cached[1] == signature:
+            keyring = cached[3]
+        else:
+            try:
+                keyring = _load(path, signature)
+            except ImproperlyConfigured:
+                if cached is None or cached[0] != source:
+                    raise
+                logger.exception("Keeping the previous magic-link keyring")
+                keyring = cached[3]
+        _cached = (source, signature, now + KEYRING_CHECK_INTERVAL, keyring)
+        return keyring
+
+
+def reload_keyring():
+    """Drop the cached keyring so the next use re-reads the file."""
+    global _cached
+    with _lock:
+        _cached = None
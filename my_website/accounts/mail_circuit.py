@@ -0,0 +1,26 @@
+"""
+Circuit breaker around magic-link mail delivery.
+
+Kept apart from accounts.services, which is only imported when a mail is
+sent, so the breaker's state can be reported at /core/metrics/ from the
+moment the app is ready.
+"""
+
+import smtplib
+
+from core.circuit import CircuitBreaker, CircuitOpen
+
+
+class MailCircuitOpen(CircuitOpen):
+    """Raised without contacting the mail server while it is considered down."""
+
+
+def _is_transport_failure(error):
+    # A refused recipient is the address's problem, not the server's
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPRecipientsRefused)
+
+
+# Trips when the SMTP server keeps failing or timing out (MAIL_CIRCUIT_BREAKER)
+mail_breaker = CircuitBreaker(
+    "mail", "MAIL_CIRCUIT_BREAKER", error_class=MailCircuitOpen, counts_as_failure=_is_transport_failure,
+)
@@ -0,0 +1,112 @@
+"""
+Housekeeping routines for the accounts app.
+
+This module removes accounts that never completed verification, together
+with their MagicLink rows, and magic links that expired long ago, in
+bounded batches so cleanup never holds long locks on a growing table.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import transaction
+from django.db.models import Q
+
+from .models import MagicLink
+
+
+def stale_unverified_users(cutoff):
+    """
+    Return the queryset of reapable accounts.
+
+    Only passwordless, non-staff accounts are considered, so accounts from
+    the legacy password flow and admin users are never removed.
+
+    Args:
+        cutoff: Accounts that joined before this datetime are stale
+
+    Returns:
+        QuerySet of User
+    """
+    return get_user_model().objects.filter(
+        is_verified=False,
+        date_joined__lt=cutoff,
+        is_staff=False,
+        is_superuser=False,
+        password__startswith=UNUSABLE_PASSWORD_PREFIX,
+    )
+
+
+def reap_unverified_users(cutoff, batch_size=500, dry_run=False, progress=None, should_stop=None):
+    """
+    Delete stale unverified users and their magic links in batches.
+
+    Batches are walked in (date_joined, pk) order so each one is an index
+    range scan; every batch is deleted in its own short transaction.
+
+    Args:
+        cutoff: Accounts that joined before this datetime are removed
+        batch_size: Maximum users handled per batch
+        dry_run: Count what would be deleted without deleting anything
+        progress: Optional callable receiving the running totals after each batch
+        should_stop: Optional callable; when it returns True no further batch is started
+
+    Returns:
+        Dictionary with "users" and "links" totals
+    """
+    User = get_user_model()
+    stale = stale_unverified_users(cutoff).order_by("date_joined", "pk")
+    totals = {"users": 0, "links": 0}
+    last = None
+
+    while not (should_stop and should_stop()):
+        page = stale
+        if last is not None:
+            page = page.filter(Q(date_joined__gt=last[0]) | Q(date_joined=last[0], pk__gt=last[1]))
+        batch = list(page.values_list("date_joined", "pk", "email")[:batch_size])
+        if not batch:
+            break
+        last = batch[-1][:2]
+        pks = [pk for _, pk, _ in batch]
+        emails = [email for _, _, email in batch]
+
+        if dry_run:
+            users = len(batch)
+            links = MagicLink.objects.filter(email__in=emails).count()
+        else:
+            with transaction.atomic():
+                # Re-check the criteria in the delete itself: an account may have
+                # verified (or been re-registered) since the batch was read
+                users = stale_unverified_users(cutoff).filter(pk__in=pks).delete()[1].get(User._meta.label, 0)
+                # Only the links of accounts that were actually deleted go with them
+                kept = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+                links = MagicLink.objects.filter(email__in=[email for email in emails if email not in kept]).delete()[0]
+
+        totals["users"] += users
+        totals["links"] += links
+        if progress is not None:
+            progress(totals)
+
+    return totals
+
+
+def purge_expired_magic_links(cutoff, batch_size=1000, should_stop=None):
+    """
+    Delete magic links that expired before cutoff, in batches.
+
+    Args:
+        cutoff: Links whose expires_at is before this datetime are removed
+        batch_size: Maximum links deleted per transaction
+        should_stop: Optional callable; when it returns True no further batch is started
+
+    Returns:
+        Number of links deleted
+    """
+    expired = MagicLink.objects.filter(expires_at__lt=cutoff).order_by("expires_at")
+    deleted = 0
+    while not (should_stop and should_stop()):
+        pks = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            deleted += MagicLink.objects.filter(pk__in=pks).delete()[0]
+    return deleted
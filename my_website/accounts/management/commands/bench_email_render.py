@@ -0,0 +1,67 @@
+"""
+Benchmark rendering magic-link emails.
+
+Compares building each message with a full Django template render (plus
+CSS inlining, as a naive rich-email setup would) against the precompiled
+EmailTemplate path in accounts.emails. --mime also serializes every
+message to MIME bytes, which is what reaches the SMTP connection.
+"""
+
+import time
+
+from django.core.mail import EmailMultiAlternatives
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from accounts.emails import LOGIN_EMAIL, VERIFY_EMAIL, inline_css
+
+TEMPLATES = {"verify": VERIFY_EMAIL, "login": LOGIN_EMAIL}
+
+
+class Command(BaseCommand):
+    help = "Measure messages rendered per second: per-message template render vs precompiled templates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=2000, help="Messages per strategy (default: 2000)")
+        parser.add_argument("--template", choices=sorted(TEMPLATES), default="verify", help="Email to render")
+        parser.add_argument("--mime", action="store_true", help="Also serialize each message to MIME bytes")
+
+    def handle(self, *args, **options):
+        if options["count"] < 1:
+            raise CommandError("--count must be at least 1")
+        template = TEMPLATES[options["template"]]
+        recipients = [
+            (f"user{i}@example.com", f"User {i}", f"https://example.com/accounts/verify/?token=tok{i:08d}")
+            for i in range(options["count"])
+        ]
+
+        def naive(email, name, link):
+            context = {"subject": template.subject, "link": link, "name": name}
+            message = EmailMultiAlternatives(
+                template.subject, render_to_string(f"{template.name}.txt", context), "noreply@example.com", [email],
+            )
+            message.attach_alternative(inline_css(render_to_string(f"{template.name}.html", context)), "text/html")
+            return message
+
+        def compiled(email, name, link):
+            return template.message(email, "noreply@example.com", link=link, name=name)
+
+        # Warm the template loader and compile once so both runs measure steady state
+        naive(*recipients[0])
+        template.compile()
+
+        rows = [(label, self._run(build, recipients, options["mime"])) for label, build in (
+            ("template render", naive), ("precompiled", compiled),
+        )]
+        self.stdout.write(f"{'strategy':<18}{'messages/s':>12}{'us/message':>12}")
+        for label, elapsed in rows:
+            self.stdout.write(f"{label:<18}{len(recipients) / elapsed:>12.0f}{elapsed / len(recipients) * 1e6:>12.1f}")
+        self.stdout.write(f"Speed-up: {rows[0][1] / rows[1][1]:.1f}x")
+
+    def _run(self, build, recipients, mime):
+        started = time.perf_counter()
+        for recipient in recipients:
+            message = build(*recipient)
+            if mime:
+                message.message().as_bytes()
+        return time.perf_counter() - started
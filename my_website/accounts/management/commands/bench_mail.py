@@ -0,0 +1,142 @@
+"""
+Benchmark magic-link email throughput against a local SMTP stand-in.
+
+Pushes verification and login emails through accounts.services for each
+dispatch strategy and reports throughput, request-thread blocking time and
+how delivery failures surface. Database writes are rolled back afterwards.
+The mail circuit breaker is off unless --breaker is given; with it, sends
+refused while the breaker is open are reported as fast-failed.
+"""
+
+import logging
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+
+from accounts import services
+from accounts.smtp_stub import LocalSMTPServer
+
+
+class Command(BaseCommand):
+    help = "Benchmark magic-link email dispatch strategies against a local SMTP server."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100, help="Emails per strategy (default: 100)")
+        parser.add_argument("--latency", type=float, default=0.05, help="Injected SMTP latency in seconds (default: 0.05)")
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of messages the server rejects (default: 0)")
+        parser.add_argument(
+            "--strategy",
+            action="append",
+            choices=services.DISPATCH_STRATEGIES,
+            dest="strategies",
+            help="Strategy to run (repeatable, default: all)",
+        )
+        parser.add_argument("--drain-timeout", type=float, default=60.0, help="Seconds to wait for background delivery")
+        parser.add_argument("--seed", type=int, default=1, help="Seed for failure injection")
+        parser.add_argument("--breaker", action="store_true", help="Send through the mail circuit breaker")
+
+    def handle(self, *args, **options):
+        if options["count"] < 1:
+            raise CommandError("--count must be at least 1")
+        strategies = options["strategies"] or list(services.DISPATCH_STRATEGIES)
+
+        request = RequestFactory().get("/", HTTP_HOST="localhost")
+        service_logger = logging.getLogger(services.__name__)
+        propagate = service_logger.propagate
+        # Background failures are logged per message; keep them off the report
+        silencer = logging.NullHandler()
+        service_logger.addHandler(silencer)
+        service_logger.propagate = False
+
+        rows = []
+        try:
+            with LocalSMTPServer(
+                latency=options["latency"],
+                failure_rate=options["failure_rate"],
+                seed=options["seed"],
+            ) as server:
+                for strategy in strategies:
+                    server.reset_counters()
+                    services.mail_breaker.reset()
+                    with override_settings(
+                        EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                        EMAIL_HOST="127.0.0.1",
+                        EMAIL_PORT=server.port,
+                        EMAIL_HOST_USER="",
+                        EMAIL_HOST_PASSWORD="",
+                        EMAIL_USE_TLS=False,
+                        EMAIL_USE_SSL=False,
+                        MAGIC_LINK_EMAIL_DISPATCH=strategy,
+                        MAIL_CIRCUIT_BREAKER={"enabled": options["breaker"]},
+                    ):
+                        rows.append(self._run(strategy, request, server, options))
+        finally:
+            service_logger.removeHandler(silencer)
+            service_logger.propagate = propagate
+
+        self._report(rows, options)
+
+    def _run(self, strategy, request, server, options):
+        """Send the configured number of emails with one strategy."""
+        count = options["count"]
+        blocking = []
+        raised = fast_failed = 0
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            for i in range(count):
+                email = f"bench{i}@example.com"
+                send = services.send_verification_email if i % 2 == 0 else services.send_login_email
+                call_started = time.perf_counter()
+                try:
+                    send(request, email)
+                except services.MailCircuitOpen:
+                    fast_failed += 1
+                except Exception:
+                    raised += 1
+                blocking.append(time.perf_counter() - call_started)
+            transaction.set_rollback(True)
+
+        deadline = time.monotonic() + options["drain_timeout"]
+        while server.accepted + server.rejected + fast_failed < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        delivered = time.perf_counter() - started
+
+        return {
+            "strategy": strategy,
+            "accepted": server.accepted,
+            "rejected": server.rejected,
+            "raised": raised,
+            "silent": server.rejected - raised,
+            "fast_failed": fast_failed,
+            "rate": count / delivered,
+            "mean_ms": statistics.mean(blocking) * 1000,
+            "p95_ms": (statistics.quantiles(blocking, n=20)[-1] if count > 1 else blocking[0]) * 1000,
+            "max_ms": max(blocking) * 1000,
+        }
+
+    def _report(self, rows, options):
+        """Print the comparison table."""
+        self.stdout.write(
+            f"{options['count']} emails per strategy, latency {options['latency'] * 1000:.0f} ms, "
+            f"failure rate {options['failure_rate']:.0%}, circuit breaker {'on' if options['breaker'] else 'off'}"
+        )
+        header = (
+            f"{'strategy':<11}{'emails/s':>10}{'block avg':>11}{'block p95':>11}{'block max':>11}"
+            f"{'accepted':>10}{'rejected':>10}{'raised':>8}{'silent':>8}{'fast':>6}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in rows:
+            self.stdout.write(
+                f"{row['strategy']:<11}{row['rate']:>10.1f}{row['mean_ms']:>9.2f}ms{row['p95_ms']:>9.2f}ms"
+                f"{row['max_ms']:>9.2f}ms{row['accepted']:>10}{row['rejected']:>10}{row['raised']:>8}{row['silent']:>8}{row['fast_failed']:>6}"
+            )
+        self.stdout.write(
+            "block = time the calling (request) thread spends inside send_*_email; "
+            "raised = failures surfaced to the view; silent = rejections only visible in logs; "
+            "fast = refused by the open circuit breaker without contacting the server."
+        )
@@ -0,0 +1,90 @@
+"""
+Microbenchmark magic-link token formats.
+
+Times encoding and decoding (signature/MAC check plus parsing) of the
+legacy django.core.signing JSON tokens, compact version 1 tokens and
+key-ID tagged version 2 tokens, and reports their length and the length
+of a full verification URL. Database work is the same for every format
+and is left out.
+
+With --old-keys N, tokens are issued with the oldest of N+1 keys and then
+verified after N rotations. This is the worst case for SECRET_KEY_FALLBACKS,
+where every older key is tried in turn. Key-ID tokens still check exactly
+one key.
+"""
+
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts import tokens
+from accounts.keyring import reload_keyring, write_keyring_file
+from accounts.models import MagicLink
+
+FORMATS = {
+    "signed": (tokens._encode_signed, lambda token: tokens._decode_signed(token, 1800)),
+    "compact-v1": (tokens._encode_compact_v1, tokens._decode_compact),
+    "compact-v2": (tokens._encode_compact, tokens._decode_compact),
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark issue/verify cost and length of magic-link token formats."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=5000, help="Tokens per format (default: 5000)")
+        parser.add_argument("--old-keys", type=int, default=0, help="Rotations since the tokens were issued (default: 0)")
+        parser.add_argument("--email", default="someone.with.a.long.name@example.com", help="Email embedded in legacy tokens")
+        parser.add_argument("--base-url", default="https://example.com", help="Base URL for the link length column")
+
+    def handle(self, *args, **options):
+        if options["count"] < 1 or not 0 <= options["old_keys"] < 255:
+            raise CommandError("--count must be positive and --old-keys between 0 and 254")
+        exp = timezone.now().timestamp() + 1800
+        payloads = [
+            tokens.TokenPayload(email=options["email"], exp=exp, token_id=str(uuid.uuid4()),
+                                token_type=MagicLink.TokenType.LOGIN)
+            for _ in range(options["count"])
+        ]
+        path = reverse("accounts:login_confirm")
+        secrets = [f"bench-secret-{kid}-{uuid.uuid4().hex}" for kid in range(options["old_keys"] + 1)]
+
+        header = f"{'format':<12}{'issue us':>10}{'verify us':>11}{'token len':>11}{'url len':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        with tempfile.TemporaryDirectory() as tmp:
+            keyring = Path(tmp) / "keys.json"
+            try:
+                for name, (encode, decode) in FORMATS.items():
+                    # Issue with the oldest key...
+                    write_keyring_file(keyring, 0, dict(enumerate(secrets)))
+                    reload_keyring()
+                    with override_settings(SECRET_KEY=secrets[0], SECRET_KEY_FALLBACKS=[], MAGIC_LINK_KEYRING=keyring):
+                        issue, issued = self._time(encode, payloads)
+                    # ...and verify after the rotations, oldest fallback tried last
+                    write_keyring_file(keyring, len(secrets) - 1, dict(enumerate(secrets)))
+                    reload_keyring()
+                    with override_settings(SECRET_KEY=secrets[-1], SECRET_KEY_FALLBACKS=secrets[-2::-1],
+                                           MAGIC_LINK_KEYRING=keyring):
+                        verify, _ = self._time(decode, issued)
+                    length = statistics.mean(len(token) for token in issued)
+                    url = len(f"{options['base_url'].rstrip('/')}{path}?token=") + length
+                    self.stdout.write(f"{name:<12}{issue:>10.2f}{verify:>11.2f}{length:>11.0f}{url:>9.0f}")
+            finally:
+                reload_keyring()
+
+    def _time(self, func, items):
+        """Microseconds per call (median of 5 passes) and the last pass's results."""
+        samples, results = [], []
+        for _ in range(5):
+            started = time.perf_counter()
+            results = [func(item) for item in items]
+            samples.append((time.perf_counter() - started) * 1e6 / len(items))
+        return statistics.median(samples), results
@@ -0,0 +1,134 @@
+"""
+Bulk-import users from a CSV or JSONL file.
+
+Rows are streamed from disk, normalized and validated, de-duplicated
+within each batch and against existing accounts with one query per batch,
+and inserted with bulk_create inside a transaction per batch. Optionally
+issues verification links for the new accounts over a shared connection.
+"""
+
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from accounts.services import send_verification_emails
+
+User = get_user_model()
+
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+
+
+def _flag(value):
+    """Interpret a CSV/JSON value as a boolean."""
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+class Command(BaseCommand):
+    help = "Import users from CSV (with header row) or JSONL with columns email, name, mailing_list, is_verified."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import")
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="Input format (default: from file extension)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction (default: 1000)")
+        parser.add_argument("--send-verification", action="store_true", help="Email verification links to unverified imports")
+        parser.add_argument("--base-url", help="Site origin for verification links, e.g. https://example.com")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options["send_verification"] and not options["base_url"]:
+            raise CommandError("--send-verification requires --base-url")
+
+        fmt = options["format"] or ("jsonl" if path.suffix in (".jsonl", ".ndjson") else "csv")
+        connection = get_connection() if options["send_verification"] else None
+        totals = {"read": 0, "created": 0, "duplicate": 0, "invalid": 0, "emailed": 0}
+        started = time.perf_counter()
+
+        if connection is not None:
+            connection.open()
+        try:
+            with path.open(newline="", encoding="utf-8") as handle:
+                rows = self._read_jsonl(handle) if fmt == "jsonl" else csv.DictReader(handle)
+                while True:
+                    batch = list(islice(rows, options["batch_size"]))
+                    if not batch:
+                        break
+                    self._import_batch(batch, totals, connection, options)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{totals['read']} rows read, {totals['created']} created "
+                        f"({totals['read'] / elapsed:.0f} rows/s)"
+                    )
+        finally:
+            if connection is not None:
+                connection.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['created']} users in {elapsed:.2f}s "
+            f"({totals['read'] / elapsed if elapsed else 0:.0f} rows/s); "
+            f"{totals['duplicate']} duplicates, {totals['invalid']} invalid, {totals['emailed']} verification emails sent"
+        ))
+
+    def _read_jsonl(self, handle):
+        """Yield one dict per non-blank JSONL line."""
+        for number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise CommandError(f"Line {number}: {e}") from e
+
+    def _import_batch(self, batch, totals, connection, options):
+        """Normalize, de-duplicate and insert one batch of rows."""
+        totals["read"] += len(batch)
+        candidates = {}
+        for row in batch:
+            email = User.objects.normalize_email((row.get("email") or "").strip())
+            try:
+                validate_email(email)
+            except ValidationError:
+                totals["invalid"] += 1
+                continue
+            if email in candidates:
+                totals["duplicate"] += 1
+                continue
+            candidates[email] = row
+
+        existing = set(User.objects.filter(email__in=candidates).values_list("email", flat=True))
+        totals["duplicate"] += len(existing)
+
+        users = [
+            User.objects.build_user(
+                email,
+                (row.get("name") or email.split("@")[0]).strip()[:255],
+                mailing_list=_flag(row.get("mailing_list")),
+                is_verified=_flag(row.get("is_verified")),
+            )
+            for email, row in candidates.items()
+            if email not in existing
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+        totals["created"] += len(users)
+
+        if connection is not None:
+            pending = {user.email: user.name for user in users if not user.is_verified}
+            totals["emailed"] += send_verification_emails(
+                options["base_url"], list(pending), connection=connection, names=pending,
+            )
@@ -0,0 +1,46 @@
+"""
+Delete accounts that never verified their email, plus their magic links.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.maintenance import reap_unverified_users
+
+
+class Command(BaseCommand):
+    help = "Delete unverified accounts older than a threshold, and their magic links, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Minimum account age in days (default: 7)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Users deleted per transaction (default: 500)")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting")
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+
+        def progress(totals):
+            self.stdout.write(f"{verb} {totals['users']} users and {totals['links']} magic links so far")
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        totals = reap_unverified_users(
+            cutoff,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {totals['users']} unverified users joined before {cutoff:%Y-%m-%d %H:%M} "
+            f"and {totals['links']} magic links"
+        ))
@@ -0,0 +1,69 @@
+"""
+Rotate the magic-link signing keyring.
+
+Adds a fresh random key, makes it active and keeps the most recent
+retired keys so links already in inboxes keep working. Rotate no more
+often than the longest token lifetime (24 hours for verification links)
+times --keep, or older links will stop verifying. Running processes pick
+the new keyring up within accounts.keyring.KEYRING_CHECK_INTERVAL seconds.
+"""
+
+import secrets
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.keyring import read_keyring_file, reload_keyring, write_keyring_file
+
+
+class Command(BaseCommand):
+    help = "Add a new active magic-link signing key and retire old ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", type=int, default=2, help="Retired keys to keep accepting (default: 2)")
+        parser.add_argument("--list", action="store_true", help="Show the keyring without changing it")
+
+    def handle(self, *args, **options):
+        path = getattr(settings, "MAGIC_LINK_KEYRING", None)
+        if not path:
+            raise CommandError("MAGIC_LINK_KEYRING is not set")
+        if options["keep"] < 0:
+            raise CommandError("--keep cannot be negative")
+
+        if Path(path).exists():
+            try:
+                active, keys = read_keyring_file(path)
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e)) from e
+        else:
+            # Tokens issued so far were signed with SECRET_KEY as key 0
+            active, keys = 0, {0: None}
+
+        if options["list"]:
+            for kid, secret in keys.items():
+                marker = " (active)" if kid == active else ""
+                source = "SECRET_KEY" if secret is None else "keyring"
+                self.stdout.write(f"{kid:>3}  {source}{marker}")
+            return
+
+        new_kid = next(
+            (candidate for candidate in ((active + step) % 256 for step in range(1, 257)) if candidate not in keys),
+            None,
+        )
+        if new_kid is None:
+            raise CommandError("All 256 key IDs are in use; lower --keep")
+        keys[new_kid] = secrets.token_hex(32)
+
+        retired = [kid for kid in keys if kid != new_kid]
+        removed = retired[:max(len(retired) - options["keep"], 0)]
+        for kid in removed:
+            del keys[kid]
+
+        write_keyring_file(path, new_kid, keys)
+        reload_keyring()
+        self.stdout.write(self.style.SUCCESS(
+            f"Active key is now {new_kid}; accepting {len(keys) - 1} retired keys"
+            + (f"; removed {', '.join(map(str, removed))}" if removed else "")
+        ))
@@ -0,0 +1,128 @@
+"""
+Send a newsletter to opted-in, verified users.
+
+The message bodies are compiled once (accounts.emails): templates may
+print the per-recipient {{ name }} and {{ email }}, which are filled in
+without re-rendering, and <style> rules in the HTML part are inlined.
+Recipients are read in primary-key order one batch at a time, and every batch goes out over the same SMTP
+connection. After each batch the last delivered primary key is written to
+a checkpoint file so an interrupted run can resume where it stopped.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+
+from accounts.emails import CompiledText, inline_css, render_placeholders
+from accounts.services import SENDER_EMAIL
+
+User = get_user_model()
+
+RECIPIENT_FIELDS = ("name", "email")
+
+
+class Command(BaseCommand):
+    help = "Send a newsletter to mailing-list subscribers in resumable batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subject", required=True, help="Message subject")
+        parser.add_argument("--body-file", required=True, help="Plain-text body (Django template syntax, compiled once)")
+        parser.add_argument("--html-file", help="Optional HTML alternative (compiled once)")
+        parser.add_argument("--batch-size", type=int, default=200, help="Recipients per batch (default: 200)")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted send")
+        parser.add_argument("--dry-run", action="store_true", help="Count recipients without sending")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        subject = options["subject"]
+        body = self._render(options["body_file"], subject)
+        html = inline_css(self._render(options["html_file"], subject)) if options["html_file"] else None
+        campaign = hashlib.sha256("\0".join([subject, body, html or ""]).encode()).hexdigest()
+        body = CompiledText(body, RECIPIENT_FIELDS, escape=False)
+        html = CompiledText(html, RECIPIENT_FIELDS, escape=True) if html else None
+
+        checkpoint = Path(options["checkpoint"]) if options["checkpoint"] else None
+        last_pk, sent = self._load_checkpoint(checkpoint, campaign)
+        if last_pk:
+            self.stdout.write(f"Resuming after user #{last_pk} ({sent} already sent)")
+
+        recipients = User.objects.filter(mailing_list=True, is_verified=True).order_by("pk")
+        if options["dry_run"]:
+            self.stdout.write(f"{recipients.filter(pk__gt=last_pk).count()} recipients would be sent to")
+            return
+
+        connection = get_connection()
+        started = time.perf_counter()
+        connection.open()
+        try:
+            while True:
+                batch = list(
+                    recipients.filter(pk__gt=last_pk).values_list("pk", "email", "name")[:options["batch_size"]]
+                )
+                if not batch:
+                    break
+
+                messages = []
+                for _, email, name in batch:
+                    values = {"email": email, "name": name}
+                    message = EmailMultiAlternatives(
+                        subject, body.render(values), SENDER_EMAIL, [email], connection=connection,
+                    )
+                    if html:
+                        message.attach_alternative(html.render(values), "text/html")
+                    messages.append(message)
+
+                try:
+                    sent += connection.send_messages(messages) or 0
+                except Exception as e:
+                    raise CommandError(
+                        f"Batch after user #{last_pk} failed: {e}. Re-run with the same --checkpoint to resume."
+                    ) from e
+
+                last_pk = batch[-1][0]
+                self._save_checkpoint(checkpoint, campaign, last_pk, sent)
+                self.stdout.write(f"Sent {sent} (through user #{last_pk})")
+
+                if options["pause"]:
+                    time.sleep(options["pause"])
+        finally:
+            connection.close()
+
+        elapsed = time.perf_counter() - started
+        rate = sent / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(f"Done: {sent} messages in {elapsed:.1f}s ({rate:.1f}/s)"))
+
+    def _render(self, path, subject):
+        """Render a template file once, with placeholders for the recipient fields."""
+        try:
+            source = Path(path).read_text(encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}") from e
+        return render_placeholders(engines["django"].from_string(source), {"subject": subject}, RECIPIENT_FIELDS)
+
+    def _load_checkpoint(self, path, campaign):
+        """Return (last_pk, sent) from a checkpoint for this campaign."""
+        if path is None or not path.exists():
+            return 0, 0
+        state = json.loads(path.read_text())
+        if state.get("campaign") != campaign:
+            raise CommandError(f"{path} belongs to a different newsletter; remove it or pick another --checkpoint")
+        return state["last_pk"], state["sent"]
+
+    def _save_checkpoint(self, path, campaign, last_pk, sent):
+        """Atomically record progress after a delivered batch."""
+        if path is None:
+            return
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text(json.dumps({"campaign": campaign, "last_pk": last_pk, "sent": sent}))
+        os.replace(tmp, path)
@@ -7,9 +7,9 @@ class UserManager(BaseUserManager):
     Handles user creation with email as the primary identifier.
     """
 
-    def create_user(self, email, name, password=None, **extra_fields):
+    def build_user(self, email, name, password=None, **extra_fields):
         """
-        Create and return a regular user with the given email and name.
+        Return an unsaved user with a normalized email and password set.
 
         Args:
             email: User's email address (required)
@@ -18,7 +18,7 @@ class UserManager(BaseUserManager):
             **extra_fields: Additional user fields
 
         Returns:
-            User instance
+            Unsaved User instance
 
         Raises:
             ValueError: If email is not provided
@@ -34,6 +34,25 @@ class UserManager(BaseUserManager):
         else:
             user.set_unusable_password()
 
+        return user
+
+    def create_user(self, email, name, password=None, **extra_fields):
+        """
+        Create and return a regular user with the given email and name.
+
+        Args:
+            email: User's email address (required)
+            name: User's full name (required)
+            password: Optional password (not used in passwordless auth)
+            **extra_fields: Additional user fields
+
+        Returns:
+            User instance
+
+        Raises:
+            ValueError: If email is not provided
+        """
+        user = self.build_user(email, name, password=password, **extra_fields)
         user.save(using=self._db)
         return user
 
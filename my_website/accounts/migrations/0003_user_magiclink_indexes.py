@@ -0,0 +1,78 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_magiclink'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='magiclink',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, help_text='Token creation timestamp'),
+        ),
+        migrations.AlterField(
+            model_name='magiclink',
+            name='email',
+            field=models.EmailField(help_text='Email address associated with this token', max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='magiclink',
+            name='expires_at',
+            field=models.DateTimeField(help_text='Token expiration timestamp'),
+        ),
+        migrations.AlterField(
+            model_name='magiclink',
+            name='token_type',
+            field=models.CharField(choices=[('login', 'Login'), ('verify', 'Verify')], help_text='Type of token', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='magiclink',
+            name='used_at',
+            field=models.DateTimeField(blank=True, help_text='When token was used (null if unused)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='date_joined',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Account creation date'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(help_text="User's email address (used for login)", max_length=254, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='is_staff',
+            field=models.BooleanField(default=False, help_text='Staff status'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='is_verified',
+            field=models.BooleanField(default=False, help_text='Whether email has been verified'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='mailing_list',
+            field=models.BooleanField(default=False, help_text='Opt-in for mailing list'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='name',
+            field=models.CharField(help_text="User's full name", max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='magiclink',
+            index=models.Index(fields=['email'], name='magiclink_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_verified', 'date_joined'], name='user_verified_joined_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_magiclink_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='magiclink',
+            index=models.Index(fields=['-created_at'], name='magiclink_created_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_magiclink_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('registered', 'Registered'), ('verification_sent', 'Verification sent'), ('verified', 'Verified'), ('login_link_sent', 'Login link sent'), ('logged_in', 'Logged in'), ('logged_out', 'Logged out'), ('token_rejected', 'Token rejected'), ('rate_limited', 'Rate limited'), ('mail_failed', 'Mail failed')], help_text='What happened', max_length=20)),
+                ('email', models.EmailField(blank=True, help_text='Email address involved, if known', max_length=254)),
+                ('ip_address', models.GenericIPAddressField(blank=True, help_text='Client address (REMOTE_ADDR)', null=True)),
+                ('path', models.CharField(blank=True, help_text='Request path', max_length=200)),
+                ('detail', models.CharField(blank=True, help_text='Short free-form context', max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the event happened')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at'], name='authevent_created_idx'), models.Index(fields=['email', '-created_at'], name='authevent_email_idx'), models.Index(fields=['kind', '-created_at'], name='authevent_kind_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_authevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='magiclink',
+            index=models.Index(fields=['expires_at'], name='magiclink_expires_idx'),
+        ),
+    ]
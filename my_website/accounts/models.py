@@ -32,6 +32,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            # Serves the stale-unverified scan in accounts.maintenance
+            models.Index(fields=["is_verified", "date_joined"], name="user_verified_joined_idx"),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -54,6 +60,16 @@ class MagicLink(models.Model):
     used_at = models.DateTimeField(null=True, blank=True, help_text="When token was used (null if unused)")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Token creation timestamp")
 
+    class Meta:
+        indexes = [
+            # Links are keyed by email rather than a foreign key, so cleanup looks them up by email
+            models.Index(fields=["email"], name="magiclink_email_idx"),
+            # Newest-first ordering for the admin changelist
+            models.Index(fields=["-created_at"], name="magiclink_created_idx"),
+            # Range scans for the purge_magic_links job
+            models.Index(fields=["expires_at"], name="magiclink_expires_idx"),
+        ]
+
     def mark_used(self):
         """Mark this token as used."""
         self.used_at = timezone.now()
@@ -71,3 +87,40 @@ class MagicLink(models.Model):
 
     def __str__(self):
         return f"{self.token_type} magic link for {self.email}"
+
+
+class AuthEvent(models.Model):
+    """
+    Audit record of an authentication event.
+
+    Rows are written behind the request in batches by accounts.events, so
+    created_at is when the event happened, not when it was inserted.
+    """
+    class Kind(models.TextChoices):
+        """Kinds of recorded events."""
+        REGISTERED = "registered", "Registered"
+        VERIFICATION_SENT = "verification_sent", "Verification sent"
+        VERIFIED = "verified", "Verified"
+        LOGIN_LINK_SENT = "login_link_sent", "Login link sent"
+        LOGGED_IN = "logged_in", "Logged in"
+        LOGGED_OUT = "logged_out", "Logged out"
+        TOKEN_REJECTED = "token_rejected", "Token rejected"
+        RATE_LIMITED = "rate_limited", "Rate limited"
+        MAIL_FAILED = "mail_failed", "Mail failed"
+
+    kind = models.CharField(max_length=20, choices=Kind.choices, help_text="What happened")
+    email = models.EmailField(blank=True, help_text="Email address involved, if known")
+    ip_address = models.GenericIPAddressField(null=True, blank=True, help_text="Client address (REMOTE_ADDR)")
+    path = models.CharField(max_length=200, blank=True, help_text="Request path")
+    detail = models.CharField(max_length=255, blank=True, help_text="Short free-form context")
+    created_at = models.DateTimeField(default=timezone.now, help_text="When the event happened")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="authevent_created_idx"),
+            models.Index(fields=["email", "-created_at"], name="authevent_email_idx"),
+            models.Index(fields=["kind", "-created_at"], name="authevent_kind_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.email}".strip()
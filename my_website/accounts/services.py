@@ -2,20 +2,38 @@
 Email service functions for sending magic link emails.
 
 This module handles asynchronous email sending for verification and login links.
+Message bodies come from the precompiled templates in accounts.emails.
 """
 
 import asyncio
+import logging
 import os
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 from asgiref.sync import async_to_sync
-from django.core.mail import send_mail
+from django.conf import settings
+from django.core.mail import get_connection
 from django.urls import reverse
 
-from .tokens import generate_login_token, generate_verification_token
+from .emails import LOGIN_EMAIL, VERIFY_EMAIL
+from .mail_circuit import MailCircuitOpen, _is_transport_failure, mail_breaker  # noqa: F401
+from .tokens import generate_login_token, generate_verification_token, generate_verification_tokens
 
 SENDER_EMAIL = os.getenv("EMAIL_HOST_USER")
 
+# How magic-link emails leave the request thread:
+#   "executor"   - hand off to the event loop's thread pool and wait (default)
+#   "inline"     - send directly on the calling thread
+#   "background" - queue on a worker pool and return immediately
+DISPATCH_STRATEGIES = ("executor", "inline", "background")
+DEFAULT_DISPATCH_STRATEGY = "executor"
+
+logger = logging.getLogger(__name__)
+
+_background_pool = None
+_background_pool_lock = Lock()
+
 
 def _build_magic_link(request, url_name, token):
     """
@@ -32,66 +50,191 @@ def _build_magic_link(request, url_name, token):
     return request.build_absolute_uri(f"{reverse(url_name)}?token={token}")
 
 
-async def _send_mail_async(*args, **kwargs):
+def _build_absolute_magic_link(base_url, url_name, token):
+    """
+    Build absolute URL for magic link without a request.
+
+    Args:
+        base_url: Site origin, e.g. "https://example.com"
+        url_name: URL name pattern
+        token: Authentication token
+
+    Returns:
+        Absolute URL string
+    """
+    return f"{base_url.rstrip('/')}{reverse(url_name)}?token={token}"
+
+
+async def _send_async(message):
     """
     Send email asynchronously in a thread pool.
 
     Args:
-        *args: Positional arguments for send_mail
-        **kwargs: Keyword arguments for send_mail
+        message: EmailMessage instance to send
     """
     loop = asyncio.get_event_loop()
-    send = partial(send_mail, *args, **kwargs)
-    await loop.run_in_executor(None, send)
+    await loop.run_in_executor(None, message.send)
 
 
-def send_verification_email(request, email):
+def _get_background_pool():
+    """
+    Return the shared worker pool used by the "background" strategy.
+
+    Returns:
+        ThreadPoolExecutor instance (created on first use)
+    """
+    global _background_pool
+    if _background_pool is None:
+        with _background_pool_lock:
+            if _background_pool is None:
+                _background_pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "MAGIC_LINK_EMAIL_WORKERS", 4),
+                    thread_name_prefix="magic-link-mail",
+                )
+    return _background_pool
+
+
+def _send_logged(message, probe=False):
+    """
+    Send a message from a background worker, logging instead of raising.
+
+    Args:
+        message: EmailMessage instance to send
+        probe: Whether this send is the mail breaker's half-open probe
+    """
+    try:
+        message.send()
+    except Exception as e:
+        mail_breaker.record(not _is_transport_failure(e), probe)
+        logger.exception("Background delivery to %s failed", ", ".join(message.to))
+    else:
+        mail_breaker.record(True, probe)
+
+
+def get_dispatch_strategy():
+    """
+    Return the configured dispatch strategy name.
+
+    Returns:
+        One of DISPATCH_STRATEGIES
+
+    Raises:
+        ValueError: If MAGIC_LINK_EMAIL_DISPATCH names an unknown strategy
+    """
+    strategy = getattr(settings, "MAGIC_LINK_EMAIL_DISPATCH", DEFAULT_DISPATCH_STRATEGY)
+    if strategy not in DISPATCH_STRATEGIES:
+        raise ValueError(f"Unknown MAGIC_LINK_EMAIL_DISPATCH strategy: {strategy!r}")
+    return strategy
+
+
+def _dispatch(message):
+    """
+    Deliver a message using the configured dispatch strategy.
+
+    Every strategy goes through the mail circuit breaker: while it is open
+    nothing is sent or queued and the caller gets MailCircuitOpen at once.
+
+    Args:
+        message: EmailMessage instance to send
+
+    Raises:
+        MailCircuitOpen: If the mail server is considered down
+        Exception: If delivery fails (not raised by the "background" strategy,
+            which logs failures from the worker instead)
+    """
+    strategy = get_dispatch_strategy()
+    if strategy == "inline":
+        mail_breaker.call(message.send)
+    elif strategy == "background":
+        _get_background_pool().submit(_send_logged, message, mail_breaker.before_call())
+    else:
+        mail_breaker.call(async_to_sync(_send_async), message)
+
+
+def _greeting_name(name):
+    return name or "there"
+
+
+def send_verification_email(request, email, name=""):
     """
     Send email verification link to user.
 
     Args:
         request: Django request object
         email: Recipient email address
+        name: Recipient's name for the greeting
 
     Returns:
         Verification URL string
 
     Raises:
+        MailCircuitOpen: If the mail server is considered down (no token is issued)
         Exception: If email sending fails
     """
+    mail_breaker.raise_if_open()
     token = generate_verification_token(email)
     url = _build_magic_link(request, "accounts:verify", token)
-    async_to_sync(_send_mail_async)(
-        "Verify your account",
-        f"Click to verify your email:\n\n{url}",
-        SENDER_EMAIL,
-        [email],
-        fail_silently=False,
-    )
+    _dispatch(VERIFY_EMAIL.message(email, SENDER_EMAIL, link=url, name=_greeting_name(name)))
     return url
 
 
-def send_login_email(request, email):
+def send_login_email(request, email, name=""):
     """
     Send magic login link to user.
 
     Args:
         request: Django request object
         email: Recipient email address
+        name: Recipient's name for the greeting
 
     Returns:
         Login URL string
 
     Raises:
+        MailCircuitOpen: If the mail server is considered down (no token is issued)
         Exception: If email sending fails
     """
+    mail_breaker.raise_if_open()
     token = generate_login_token(email)
     url = _build_magic_link(request, "accounts:login_confirm", token)
-    async_to_sync(_send_mail_async)(
-        "Your login link",
-        f"Click here to log in:\n\n{url}",
-        SENDER_EMAIL,
-        [email],
-        fail_silently=False,
-    )
+    _dispatch(LOGIN_EMAIL.message(email, SENDER_EMAIL, link=url, name=_greeting_name(name)))
     return url
+
+
+def send_verification_emails(base_url, emails, connection=None, names=None):
+    """
+    Issue verification links for many addresses and send them in one go.
+
+    Tokens are created with a single bulk insert and all messages share one
+    SMTP connection. Used by bulk tooling rather than request handlers.
+
+    Args:
+        base_url: Site origin used to build absolute links
+        emails: Recipient email addresses
+        connection: Optional open mail connection to reuse
+        names: Optional {email: name} for the greeting
+
+    Returns:
+        Number of messages sent
+
+    Raises:
+        MailCircuitOpen: If the mail server is considered down
+        Exception: If email sending fails
+    """
+    emails = list(emails)
+    if not emails:
+        return 0
+    mail_breaker.raise_if_open()
+    connection = connection or get_connection()
+    names = names or {}
+    messages = [
+        VERIFY_EMAIL.message(
+            email,
+            SENDER_EMAIL,
+            connection=connection,
+            link=_build_absolute_magic_link(base_url, "accounts:verify", token),
+            name=_greeting_name(names.get(email)),
+        )
+        for email, token in zip(emails, generate_verification_tokens(emails))
+    ]
+    return mail_breaker.call(connection.send_messages, messages) or 0
@@ -0,0 +1,124 @@
+"""
+Local SMTP stand-in for benchmarking mail delivery.
+
+This module provides a small threaded SMTP server that accepts messages
+without relaying them, with configurable injected latency and failure rate.
+It speaks just enough of the protocol for smtplib (and therefore Django's
+SMTP backend) to deliver messages to it.
+"""
+
+import random
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Handle one SMTP session for LocalSMTPServer."""
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def _read_data(self):
+        """Consume a DATA payload up to the terminating dot line."""
+        size = 0
+        for raw in self.rfile:
+            if raw in (b".\r\n", b".\n"):
+                break
+            size += len(raw)
+        return size
+
+    def handle(self):
+        server = self.server
+        self._reply("220 localhost SMTP stand-in ready")
+        for raw in self.rfile:
+            command = raw.decode("ascii", "replace").strip()
+            verb = command[:4].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 localhost")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                self._read_data()
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.should_fail():
+                    server.record(accepted=False)
+                    self._reply("451 4.3.0 Injected failure")
+                else:
+                    server.record(accepted=True)
+                    self._reply("250 OK: queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Threaded SMTP sink bound to localhost.
+
+    Attributes:
+        latency: Seconds to wait before acknowledging each message
+        failure_rate: Fraction (0-1) of messages rejected with a 451 reply
+        accepted: Number of messages acknowledged
+        rejected: Number of messages rejected by failure injection
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, failure_rate=0.0, seed=None):
+        super().__init__((host, port), _SMTPHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.accepted = 0
+        self.rejected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        """Port the server is listening on."""
+        return self.server_address[1]
+
+    def should_fail(self):
+        """Decide whether the current message should be rejected."""
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def record(self, accepted):
+        """Count a message as accepted or rejected."""
+        with self._lock:
+            if accepted:
+                self.accepted += 1
+            else:
+                self.rejected += 1
+
+    def reset_counters(self):
+        """Zero the accepted/rejected counters."""
+        with self._lock:
+            self.accepted = 0
+            self.rejected = 0
+
+    def start(self):
+        """Serve in a daemon thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, name="smtp-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
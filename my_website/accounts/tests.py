@@ -1,9 +1,41 @@
+import json
+import smtplib
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings as django_settings
+from django.contrib.admin.models import DELETION, LogEntry
 from django.contrib.auth import get_user_model
+from django.core import mail
 from django.core.cache import cache
-from django.test import TestCase, override_settings
+from django.db import DatabaseError, connection
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+
+from core.checks import check_shared_cache
+from core.scheduler import Budget
+
+from . import events, jobs
+from .emails import VERIFY_EMAIL, inline_css
+from .maintenance import reap_unverified_users, stale_unverified_users
+from .models import AuthEvent, MagicLink
+from .services import DISPATCH_STRATEGIES, MailCircuitOpen, mail_breaker, send_login_email
+from .smtp_stub import LocalSMTPServer
+from .token_cache import rejected_tokens
+from .keyring import get_keyring, reload_keyring, write_keyring_file
+from .tokens import TokenPayload, _encode_compact_v1, _encode_signed, generate_login_token, generate_verification_token, verify_login_token, verify_verification_token
+
 
-from .tokens import generate_login_token, generate_verification_token, verify_login_token, verify_verification_token
+def tearDownModule():
+    # Write buffered auth events while the test database still exists
+    events.flush(force=True)
 
 
 @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
@@ -34,3 +66,524 @@ class MagicLinkTests(TestCase):
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, 302)
         self.assertRedirects(response, url)
+
+
+class MailDispatchTests(TestCase):
+    def setUp(self):
+        mail_breaker.reset()
+
+    def test_inline_failure_surfaces_to_caller(self):
+        request = RequestFactory().get("/", HTTP_HOST="localhost")
+        with LocalSMTPServer(failure_rate=1.0) as server, override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=server.port,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+            EMAIL_USE_TLS=False,
+            MAGIC_LINK_EMAIL_DISPATCH="inline",
+        ):
+            with self.assertRaises(smtplib.SMTPDataError):
+                send_login_email(request, "user@example.com")
+        self.assertEqual(server.rejected, 1)
+
+    def test_bench_mail_reports_each_strategy(self):
+        out = StringIO()
+        call_command("bench_mail", count=2, latency=0, stdout=out)
+        for strategy in DISPATCH_STRATEGIES:
+            self.assertIn(strategy, out.getvalue())
+
+
+@override_settings(MAIL_CIRCUIT_BREAKER={"min_calls": 2, "failure_rate": 0.5, "window": 60, "open_seconds": 30,
+                                        "cache": "breaker"})
+class MailCircuitBreakerTests(TestCase):
+    def setUp(self):
+        mail_breaker.reset()
+        self.request = RequestFactory().get("/", HTTP_HOST="localhost")
+
+    def test_opens_fails_fast_and_closes_after_probe(self):
+        with LocalSMTPServer(failure_rate=1.0) as server, override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=server.port,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+            EMAIL_USE_TLS=False,
+            MAGIC_LINK_EMAIL_DISPATCH="inline",
+        ):
+            for _ in range(2):
+                with self.assertRaises(smtplib.SMTPDataError):
+                    send_login_email(self.request, "user@example.com")
+            links = MagicLink.objects.count()
+            with self.assertRaises(MailCircuitOpen) as raised:
+                send_login_email(self.request, "user@example.com")
+            self.assertGreater(raised.exception.retry_after, 29)
+            # Refused before a token was issued or the server was contacted
+            self.assertEqual((server.rejected, MagicLink.objects.count()), (2, links))
+            self.assertEqual(mail_breaker.state()["state"], "open")
+
+            server.failure_rate = 0.0
+            later = time.time() + 31
+            with mock.patch("core.circuit.time.time", return_value=later):
+                self.assertEqual(mail_breaker.state()["state"], "half_open")
+                send_login_email(self.request, "user@example.com")
+                self.assertEqual(mail_breaker.state()["state"], "closed")
+        self.assertEqual(server.accepted, 1)
+
+    def test_system_check_warns_about_per_process_breaker(self):
+        locmem = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        with override_settings(CACHES={"default": locmem, "breaker": locmem}):
+            self.assertEqual([m.id for m in check_shared_cache(None)], ["core.W001"])
+            with override_settings(MAIL_CIRCUIT_BREAKER={"enabled": False}):
+                self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES={"default": locmem}):
+            self.assertEqual([m.id for m in check_shared_cache(None)], ["core.E001"])
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_api_answers_503_with_retry_after_while_open(self):
+        get_user_model().objects.create_user(email="user@example.com", name="User", is_verified=True)
+        for _ in range(2):
+            mail_breaker.record(False)
+        response = self.client.post(reverse("accounts:api_login"), json.dumps({"email": "user@example.com"}),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["error"], "mail_unavailable")
+        self.assertIn(response["Retry-After"], ("30", "29"))
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class EmailTemplateTests(TestCase):
+    def test_precompiled_message_is_multipart_and_escaped(self):
+        message = VERIFY_EMAIL.message("a@example.com", "noreply@example.com",
+                                       link="https://example.com/v/?token=a&b", name="<Ann>")
+        self.assertEqual(message.subject, "Verify your account")
+        self.assertIn("Hi <Ann>,", message.body)
+        self.assertIn("https://example.com/v/?token=a&b", message.body)
+
+        html, mime_type = message.alternatives[0]
+        self.assertEqual(mime_type, "text/html")
+        self.assertIn("Hi &lt;Ann&gt;", html)
+        self.assertIn('href="https://example.com/v/?token=a&amp;b"', html)
+        self.assertNotIn("\x1f", html)
+        # Simple rules are inlined; media queries stay in a style block
+        self.assertRegex(html, r'<a class="button" href="[^"]+" style="display: inline-block;')
+        self.assertIn("@media", html)
+
+    def test_inline_css_specificity_and_existing_style(self):
+        html = inline_css(
+            "<style>.note { color: red } p { color: blue; margin: 0 } p.note { font-weight: bold }</style>"
+            '<p class="note" style="color: green">x</p><p>y</p>'
+        )
+        self.assertEqual(
+            html, '<p class="note" style="color: blue; margin: 0; color: red; font-weight: bold; color: green">x</p>'
+            '<p style="color: blue; margin: 0">y</p>',
+        )
+
+    def test_bench_email_render_reports_rates(self):
+        out = StringIO()
+        call_command("bench_email_render", count=3, stdout=out)
+        self.assertIn("precompiled", out.getvalue())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class MailingListTests(TestCase):
+    def setUp(self):
+        self.user_model = get_user_model()
+        self.subscribers = [
+            self.user_model.objects.create_user(email=f"sub{i}@example.com", name=f"=Sub {i}", is_verified=True, mailing_list=True)
+            for i in range(3)
+        ]
+        self.user_model.objects.create_user(email="unverified@example.com", name="Pending", mailing_list=True)
+        self.user_model.objects.create_user(email="optout@example.com", name="Quiet", is_verified=True)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.body = self.tmp / "body.txt"
+        self.body.write_text("News for {{ subject }}")
+
+    def test_export_streams_only_subscribers(self):
+        staff = self.user_model.objects.create_user(email="staff@example.com", name="Staff", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("accounts:export_mailing_list"))
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith("sub0@example.com,'=Sub 0,"))
+
+    def test_newsletter_sends_in_batches(self):
+        call_command("send_newsletter", subject="May", body_file=str(self.body), batch_size=2, stdout=StringIO())
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [u.email for u in self.subscribers])
+        self.assertEqual(mail.outbox[0].body, "News for May")
+
+    def test_newsletter_fills_recipient_fields(self):
+        html = self.tmp / "body.html"
+        html.write_text("<style>p { color: red; }</style><p>Hi {{ name }}</p>")
+        self.body.write_text("Hi {{ name }}, news for {{ subject }}")
+        call_command("send_newsletter", subject="May", body_file=str(self.body), html_file=str(html),
+                     stdout=StringIO())
+        message = mail.outbox[0]
+        self.assertEqual(message.body, "Hi =Sub 0, news for May")
+        self.assertEqual(message.alternatives[0][0], '<p style="color: red">Hi =Sub 0</p>')
+
+    def test_newsletter_resumes_from_checkpoint(self):
+        checkpoint = self.tmp / "checkpoint.json"
+        call_command("send_newsletter", subject="May", body_file=str(self.body), batch_size=2,
+                     checkpoint=str(checkpoint), stdout=StringIO())
+        state = json.loads(checkpoint.read_text())
+        checkpoint.write_text(json.dumps(dict(state, last_pk=self.subscribers[0].pk, sent=1)))
+        mail.outbox.clear()
+
+        call_command("send_newsletter", subject="May", body_file=str(self.body), batch_size=2,
+                     checkpoint=str(checkpoint), stdout=StringIO())
+        self.assertEqual([m.to[0] for m in mail.outbox], [u.email for u in self.subscribers[1:]])
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        self.user_model = get_user_model()
+        self.user_model.objects.create_user(email="existing@example.com", name="Existing")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def test_csv_import_normalizes_and_deduplicates(self):
+        source = self.tmp / "users.csv"
+        source.write_text(
+            "email,name,mailing_list,is_verified\n"
+            "new@EXAMPLE.com,New,yes,1\n"
+            "new@example.com,Duplicate,no,0\n"
+            "existing@example.com,Again,,\n"
+            "not-an-email,Bad,,\n"
+            "other@example.com,Other,,\n"
+        )
+        call_command("import_users", str(source), batch_size=2, stdout=StringIO())
+
+        created = self.user_model.objects.get(email="new@example.com")
+        self.assertTrue(created.mailing_list and created.is_verified)
+        self.assertFalse(created.has_usable_password())
+        self.assertEqual(self.user_model.objects.count(), 3)
+
+    def test_jsonl_import_sends_verification_links(self):
+        source = self.tmp / "users.jsonl"
+        source.write_text(
+            json.dumps({"email": "a@example.com", "name": "A"}) + "\n"
+            + json.dumps({"email": "b@example.com", "name": "B", "is_verified": True}) + "\n"
+        )
+        call_command("import_users", str(source), send_verification=True,
+                     base_url="https://example.com", stdout=StringIO())
+
+        self.assertEqual([m.to for m in mail.outbox], [["a@example.com"]])
+        self.assertIn("https://example.com/accounts/verify/?token=", mail.outbox[0].body)
+
+
+class ReapUnverifiedTests(TestCase):
+    def setUp(self):
+        self.user_model = get_user_model()
+        old = timezone.now() - timedelta(days=30)
+        self.stale = [
+            self.user_model.objects.create_user(email=f"stale{i}@example.com", name="Stale", date_joined=old)
+            for i in range(3)
+        ]
+        self.user_model.objects.create_user(email="fresh@example.com", name="Fresh")
+        self.user_model.objects.create_user(email="verified@example.com", name="Done", is_verified=True, date_joined=old)
+        self.user_model.objects.create_user(email="legacy@example.com", name="Legacy", password="pw-123456", date_joined=old)
+        for user in self.stale[:2]:
+            generate_verification_token(user.email)
+
+    def test_dry_run_deletes_nothing(self):
+        out = StringIO()
+        call_command("reap_unverified", dry_run=True, batch_size=2, stdout=out)
+        self.assertIn("Would delete 3 unverified users", out.getvalue())
+        self.assertEqual(self.user_model.objects.count(), 6)
+
+    def test_reaps_stale_users_and_their_links(self):
+        call_command("reap_unverified", batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            sorted(self.user_model.objects.values_list("email", flat=True)),
+            ["fresh@example.com", "legacy@example.com", "verified@example.com"],
+        )
+        self.assertFalse(MagicLink.objects.exists())
+
+    def test_account_verified_mid_batch_is_kept_with_its_link(self):
+        calls = []
+
+        def verify_between_select_and_delete(cutoff):
+            calls.append(cutoff)
+            if len(calls) == 2:
+                self.user_model.objects.filter(email="stale0@example.com").update(is_verified=True)
+            return stale_unverified_users(cutoff)
+
+        with mock.patch("accounts.maintenance.stale_unverified_users", side_effect=verify_between_select_and_delete):
+            totals = reap_unverified_users(timezone.now() - timedelta(days=7), batch_size=10)
+        self.assertEqual(totals, {"users": 2, "links": 1})
+        self.assertTrue(self.user_model.objects.filter(email="stale0@example.com").exists())
+        self.assertEqual(list(MagicLink.objects.values_list("email", flat=True)), ["stale0@example.com"])
+
+    def test_purge_job_removes_only_long_expired_links(self):
+        generate_login_token("fresh@example.com")
+        MagicLink.objects.filter(email="stale0@example.com").update(expires_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(jobs.purge_magic_links(Budget(None)), {"deleted": 1})
+        self.assertEqual(sorted(MagicLink.objects.values_list("email", flat=True)),
+                         ["fresh@example.com", "stale1@example.com"])
+        self.assertEqual(jobs.purge_magic_links(Budget(0)), {"deleted": 0})
+
+
+class AccountsAdminTests(TestCase):
+    def setUp(self):
+        self.user_model = get_user_model()
+        self.admin = self.user_model.objects.create_superuser(email="admin@example.com", name="Admin", password="pw-123456")
+        self.client.force_login(self.admin)
+        self.pending = [
+            self.user_model.objects.create_user(email=f"pending{i}@example.com", name="Pending")
+            for i in range(2)
+        ]
+        generate_verification_token(self.pending[0].email)
+
+    def test_changelist_searches_by_prefix(self):
+        response = self.client.get(reverse("admin:accounts_user_changelist"), {"q": "pending1"})
+        self.assertContains(response, "pending1@example.com")
+        self.assertNotContains(response, "pending0@example.com")
+
+    def test_bulk_actions_are_set_based(self):
+        url = reverse("admin:accounts_user_changelist")
+        pks = [user.pk for user in self.pending]
+        self.client.post(url, {"action": "revoke_magic_links", "_selected_action": pks})
+        self.assertTrue(MagicLink.objects.get().is_used)
+
+        self.client.post(url, {"action": "verify_users", "_selected_action": pks})
+        self.assertEqual(self.user_model.objects.filter(is_verified=True).count(), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {"action": "delete_users", "select_across": "1", "_selected_action": pks[:1]})
+        self.assertContains(response, "Permanently delete 3 users")
+        # The confirmation only counts; the one row loaded is the signed-in admin
+        loads = [q["sql"] for q in queries if 'FROM "accounts_user"' in q["sql"] and "COUNT(" not in q["sql"]]
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(self.user_model.objects.count(), 3)
+
+        self.client.post(url, {"action": "delete_users", "_selected_action": pks, "post": "yes"})
+        self.assertEqual(list(self.user_model.objects.all()), [self.admin])
+        self.assertFalse(MagicLink.objects.exists())
+        entry = LogEntry.objects.get()
+        self.assertEqual((entry.action_flag, entry.user_id), (DELETION, self.admin.pk))
+        self.assertIn("2 users", entry.change_message)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', MAGIC_LINK_EMAIL_DISPATCH="inline")
+class MagicLinkApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user_model = get_user_model()
+
+    def post(self, name, data, **extra):
+        return self.client.post(reverse(f"accounts:{name}"), json.dumps(data), content_type="application/json", **extra)
+
+    def test_register_verify_login_confirm(self):
+        response = self.post("api_register", {"email": "api@example.com", "name": "Api User"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"status": "verification_sent", "email_sent": True})
+
+        token = mail.outbox[-1].body.split("token=")[1].split()[0]
+        self.assertEqual(self.post("api_verify", {"token": token}).json(), {"status": "verified"})
+        self.assertEqual(self.post("api_verify", {"token": token}).status_code, 400)
+
+        self.assertEqual(self.post("api_login", {"email": "api@example.com"}).status_code, 202)
+        token = mail.outbox[-1].body.split("token=")[1].split()[0]
+        response = self.post("api_confirm", {"token": token})
+        self.assertEqual(response.json()["user"], {"email": "api@example.com", "name": "Api User"})
+        self.assertIn("_auth_user_id", self.client.session)
+        self.assertNotIn("_messages", self.client.session)
+
+    def test_error_statuses(self):
+        self.user_model.objects.create_user(email="done@example.com", name="Done", is_verified=True)
+        self.user_model.objects.create_user(email="pending@example.com", name="Pending")
+
+        self.assertEqual(self.post("api_register", {"email": "nope", "name": "X Y"}).json()["field"], "email")
+        self.assertEqual(self.post("api_register", {"email": "done@example.com", "name": "Done"}).status_code, 409)
+        self.assertEqual(self.post("api_login", {"email": "ghost@example.com"}).status_code, 404)
+        self.assertEqual(self.post("api_login", {"email": "pending@example.com"}).status_code, 403)
+        bad = self.client.post(reverse("accounts:api_login"), "{", content_type="application/json")
+        self.assertEqual(bad.json()["error"], "bad_request")
+        self.assertEqual(self.client.get(reverse("accounts:api_login")).status_code, 405)
+
+    def test_rate_limit_shared_with_html_flow_and_csrf_enforced(self):
+        self.user_model.objects.create_user(email="user@example.com", name="User", is_verified=True)
+        for _ in range(5):
+            self.client.post(reverse("accounts:login"), {"email": "user@example.com"})
+        response = self.post("api_login", {"email": "user@example.com"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "900")
+
+        csrf_client = self.client_class(enforce_csrf_checks=True)
+        response = csrf_client.post(reverse("accounts:api_login"), "{}", content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', MAGIC_LINK_EMAIL_DISPATCH="inline")
+class AuthEventLogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        events.flush(force=True)
+
+    @override_settings(AUTH_EVENT_LOG={"flush_size": 2, "flush_interval": 3600})
+    def test_events_written_in_batches_after_responses(self):
+        self.client.post(reverse("accounts:login"), {"email": "ghost@example.com"})
+        self.client.get(reverse("accounts:verify"), {"token": "bogus"})
+        self.assertEqual(AuthEvent.objects.count(), 0)
+        self.assertEqual(events.pending(), 1)
+
+        self.client.post(reverse("accounts:register"), {"email": "new@example.com", "name": "New User"})
+        kinds = list(AuthEvent.objects.order_by("created_at").values_list("kind", flat=True))
+        self.assertEqual(kinds, ["token_rejected", "registered", "verification_sent"])
+        self.assertEqual(AuthEvent.objects.filter(email="new@example.com").first().path, reverse("accounts:register"))
+
+    @override_settings(AUTH_EVENT_LOG={"max_buffer": 2, "flush_size": 100, "flush_interval": 3600})
+    def test_full_buffer_drops_and_counts(self):
+        dropped = events.snapshot()["dropped"]
+        results = [events.record(AuthEvent.Kind.RATE_LIMITED, "x@example.com") for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(events.snapshot()["dropped"], dropped + 1)
+        self.assertEqual(events.flush(force=True), 2)
+
+    @override_settings(AUTH_EVENT_LOG={"flush_interval": 3600})
+    def test_first_record_starts_one_daemon_flusher(self):
+        with mock.patch.object(events, "_flusher_pid", None), mock.patch("accounts.events.threading.Thread") as thread:
+            events.record(AuthEvent.Kind.LOGGED_IN, "a@example.com")
+            events.record(AuthEvent.Kind.LOGGED_IN, "b@example.com")
+        thread.assert_called_once_with(target=events._flush_periodically, name="auth-event-flusher", daemon=True)
+        thread.return_value.start.assert_called_once_with()
+
+    @override_settings(AUTH_EVENT_LOG={"flush_interval": 7})
+    def test_flusher_flushes_every_interval(self):
+        with mock.patch("accounts.events.time.sleep", side_effect=[None, SystemExit]) as sleep, \
+                mock.patch.object(events, "flush") as flush, self.assertRaises(SystemExit):
+            events._flush_periodically()
+        sleep.assert_called_with(7)
+        flush.assert_called_once_with()
+
+    def test_admin_changelist(self):
+        staff = get_user_model().objects.create_superuser(email="admin@example.com", name="Admin", password="pw")
+        AuthEvent.objects.create(kind=AuthEvent.Kind.LOGGED_IN, email="user@example.com")
+        self.client.force_login(staff)
+        response = self.client.get(reverse("admin:accounts_authevent_changelist"), {"q": "user@"})
+        self.assertContains(response, "user@example.com")
+
+
+class NegativeTokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        rejected_tokens.clear()
+
+    def test_consumed_and_forged_tokens_skip_the_database(self):
+        token = generate_login_token("user@example.com")
+        self.assertIsNotNone(verify_login_token(token))
+        with self.assertNumQueries(0):
+            self.assertIsNone(verify_login_token(token))
+
+        self.assertIsNone(verify_login_token(token[:-2] + "xx"))
+        rejected_tokens.clear()  # the shared cache still knows it
+        with self.assertNumQueries(0):
+            self.assertIsNone(verify_login_token(token[:-2] + "xx"))
+
+    def test_rejection_is_scoped_to_token_type(self):
+        token = generate_verification_token("user@example.com")
+        self.assertIsNone(verify_login_token(token))
+        self.assertIsNotNone(verify_verification_token(token))
+
+    def test_transient_failures_are_not_cached(self):
+        token = generate_login_token("user@example.com")
+        with mock.patch.object(MagicLink.objects, "filter", side_effect=DatabaseError("locked")):
+            with self.assertLogs("accounts.tokens", "ERROR"):
+                self.assertIsNone(verify_login_token(token))
+        self.assertIsNotNone(verify_login_token(token))
+
+
+class CompactTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        rejected_tokens.clear()
+
+    def test_compact_token_reads_email_from_link_row(self):
+        token = generate_login_token("Someone.Long@example.com")
+        self.assertEqual(len(token), 52)
+        self.assertNotIn(":", token)
+        self.assertNotIn("Someone", token)
+        self.assertEqual(verify_login_token(token).email, "Someone.Long@example.com")
+
+    def test_tampered_and_legacy_tokens(self):
+        token = generate_verification_token("user@example.com")
+        forged = token[:10] + ("A" if token[10] != "A" else "B") + token[11:]
+        self.assertIsNone(verify_verification_token(forged))
+        self.assertIsNotNone(verify_verification_token(token))
+
+        link = MagicLink.objects.create(email="old@example.com", token_type=MagicLink.TokenType.LOGIN,
+                                        expires_at=timezone.now() + timedelta(minutes=30))
+        legacy = _encode_signed(TokenPayload(email="old@example.com", exp=link.expires_at.timestamp(),
+                                             token_id=str(link.id), token_type=MagicLink.TokenType.LOGIN))
+        with override_settings(MAGIC_LINK_ACCEPT_LEGACY_TOKENS=False):
+            self.assertIsNone(verify_login_token(legacy))
+        rejected_tokens.clear()
+        cache.clear()
+        self.assertEqual(verify_login_token(legacy).email, "old@example.com")
+
+    def test_bench_tokens_reports_both_formats(self):
+        out = StringIO()
+        call_command("bench_tokens", count=10, stdout=out)
+        for name in ("signed", "compact-v1", "compact-v2"):
+            self.assertIn(name, out.getvalue())
+
+
+class KeyRotationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        rejected_tokens.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.keyring = Path(tmp.name) / "keys.json"
+        settings_override = override_settings(MAGIC_LINK_KEYRING=str(self.keyring))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(reload_keyring)
+        reload_keyring()
+
+    def rotate(self, **options):
+        call_command("rotate_magic_link_keys", stdout=StringIO(), **options)
+
+    def test_tokens_survive_rotation_until_their_key_is_pruned(self):
+        before = generate_login_token("user@example.com")
+        self.rotate(keep=1)
+        self.assertEqual(get_keyring().key_ids, [0, 1])
+        self.assertNotIn(django_settings.SECRET_KEY, self.keyring.read_text())
+        middle = generate_login_token("user@example.com")
+
+        self.rotate(keep=1)
+        self.assertEqual(get_keyring().active, 2)
+        self.assertIsNone(verify_login_token(before))
+        self.assertIsNotNone(verify_login_token(middle))
+        self.assertIsNotNone(verify_login_token(generate_login_token("user@example.com")))
+
+    def test_unknown_key_is_reread_and_never_cached(self):
+        keys = {0: None, 7: "ab" * 32}
+        write_keyring_file(self.keyring, 7, keys)
+        reload_keyring()
+        token = generate_login_token("user@example.com")
+
+        # A host whose keyring file lacks key 7 turns the token away, but only there
+        write_keyring_file(self.keyring, 0, {0: None})
+        reload_keyring()
+        self.assertIsNone(verify_login_token(token))
+        self.assertFalse(rejected_tokens.contains(rejected_tokens.key(token, MagicLink.TokenType.LOGIN, 1800)))
+
+        # Rotated in since the last check: the keyring is re-read at once
+        write_keyring_file(self.keyring, 7, keys)
+        self.assertIsNotNone(verify_login_token(token))
+
+    def test_compact_v1_tokens_still_verify(self):
+        link = MagicLink.objects.create(email="old@example.com", token_type=MagicLink.TokenType.VERIFY,
+                                        expires_at=timezone.now() + timedelta(hours=1))
+        token = _encode_compact_v1(TokenPayload(email="", exp=link.expires_at.timestamp(),
+                                                token_id=str(link.id), token_type=MagicLink.TokenType.VERIFY))
+        self.rotate()
+        self.assertEqual(verify_verification_token(token).email, "old@example.com")
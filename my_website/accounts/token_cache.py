@@ -0,0 +1,124 @@
+"""
+Negative cache for magic-link tokens.
+
+Mail-provider link scanners and impatient users present the same dead
+token over and over. Once a token has been seen to be definitively bad
+(forged, malformed, expired, wrong type, unknown or already consumed) it
+can never become valid, so its digest is remembered in a bounded
+in-process LRU and in the shared cache. Later presentations are rejected
+before any signature check or database query.
+
+Entries are keyed by SHA-256 of the token plus the expected token type
+and max age, so a token rejected by one endpoint is never blocked at
+another where it is valid. Entries expire after the token's max age, when
+the signature check alone rejects it cheaply. Transient failures (such
+as database errors) are never cached.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_SIZE = 10000
+CACHE_PREFIX = "magic-link:rejected"
+
+
+class NegativeTokenCache:
+    """Two-level (process LRU, shared cache) set of rejected token digests."""
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "stored": 0}
+
+    @staticmethod
+    def key(token, token_type, max_age):
+        """
+        Build the cache key for a presented token.
+
+        Args:
+            token: Token string as presented
+            token_type: Token type the endpoint expects
+            max_age: Maximum age the endpoint accepts
+
+        Returns:
+            Cache key string
+        """
+        digest = hashlib.sha256(token.encode("utf-8", "surrogatepass")).hexdigest()
+        return f"{CACHE_PREFIX}:{token_type}:{max_age}:{digest}"
+
+    def contains(self, key):
+        """
+        Check whether a token was already rejected.
+
+        Args:
+            key: Key from key()
+
+        Returns:
+            True if the token is known to be bad
+        """
+        now = time.monotonic()
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is not None:
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.stats["local_hits"] += 1
+                    return True
+                del self._entries[key]
+
+        # The shared entry holds its wall-clock expiry so the local copy matches it
+        expires_at = cache.get(key)
+        if expires_at is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return False
+        self._remember(key, max(expires_at - time.time(), 1))
+        with self._lock:
+            self.stats["shared_hits"] += 1
+        return True
+
+    def add(self, key, timeout):
+        """
+        Record a token as definitively bad.
+
+        Args:
+            key: Key from key()
+            timeout: Seconds to remember it (the token's max age)
+        """
+        self._remember(key, timeout)
+        cache.set(key, time.time() + timeout, timeout)
+        with self._lock:
+            self.stats["stored"] += 1
+
+    def _remember(self, key, timeout):
+        with self._lock:
+            self._entries[key] = time.monotonic() + timeout
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every locally cached entry (shared entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        """Hit rate and counters for the metrics view."""
+        with self._lock:
+            hits = self.stats["local_hits"] + self.stats["shared_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                "size": len(self._entries),
+                "capacity": self.size,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                **self.stats,
+            }
+
+
+rejected_tokens = NegativeTokenCache(getattr(settings, "MAGIC_LINK_NEGATIVE_CACHE_SIZE", DEFAULT_SIZE))
@@ -3,20 +3,57 @@ Token generation and verification for magic links.
 
 This module handles creation and validation of secure tokens for email
 verification and passwordless login.
+
+Tokens use a compact binary format (version 2), base64url-encoded without
+padding:
+
+    version (1) | key ID (1) | MagicLink UUID (16) | type (1)
+    | expiry, uint32 seconds (4) | HMAC-SHA256 of the preceding bytes,
+    truncated to 16
+
+That is 52 URL-safe characters. The key ID selects exactly one key from
+accounts.keyring, so verification costs one HMAC however many retired keys
+are kept. The token carries no email address; it is read from the
+MagicLink row at verification time.
+
+Older formats still verify during the transition: version 1 (the same
+layout without a key ID, MAC keyed from SECRET_KEY and its fallbacks) and,
+while MAGIC_LINK_ACCEPT_LEGACY_TOKENS is on, django.core.signing JSON
+payloads, which always contain a ":".
 """
 
+import base64
+import logging
+import struct
+import uuid
 from dataclasses import dataclass
 from datetime import timedelta
-from typing import Optional
+from typing import Iterable, List, Optional
 
+from django.conf import settings
 from django.core import signing
+from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
 
+from .keyring import get_keyring, reload_keyring
 from .models import MagicLink
+from .token_cache import rejected_tokens
+
+logger = logging.getLogger(__name__)
 
 # Salt for token signing to prevent tampering
 MAGIC_LINK_SALT = "magic-link"
 
+COMPACT_VERSION = 2
+COMPACT_MAC_BYTES = 16
+# version, key ID, UUID bytes, type code, expiry (seconds since the epoch)
+_COMPACT_BODY = struct.Struct(">BB16sBI")
+# Version 1: the same without a key ID
+_COMPACT_V1_BODY = struct.Struct(">B16sBI")
+_TYPE_CODES = {MagicLink.TokenType.LOGIN: 1, MagicLink.TokenType.VERIFY: 2}
+_TYPES_BY_CODE = {code: token_type for token_type, code in _TYPE_CODES.items()}
+
 
 @dataclass
 class TokenPayload:
@@ -35,6 +72,16 @@ class TokenPayload:
     token_type: str
 
 
+class UnknownSigningKey(Exception):
+    """
+    A token names a key ID this process's keyring does not have.
+
+    Not proof of forgery: the keyring may lag a rotation, or this host's
+    keyring file may be missing or out of sync, so such tokens are never
+    remembered as rejected.
+    """
+
+
 def _stamp_payload(email: str, expires: int, token_type: str) -> TokenPayload:
     """
     Create a token payload and associated MagicLink record.
@@ -61,19 +108,169 @@ def _stamp_payload(email: str, expires: int, token_type: str) -> TokenPayload:
     )
 
 
-def _generate_token(payload: TokenPayload) -> str:
+def _stamp_payloads(emails: Iterable[str], expires: int, token_type: str) -> List[TokenPayload]:
+    """
+    Create token payloads and their MagicLink records in one bulk insert.
+
+    Args:
+        emails: Email addresses to issue tokens for
+        expires: Expiration time in seconds
+        token_type: Type of token (LOGIN or VERIFY)
+
+    Returns:
+        List of TokenPayload instances, in input order
+    """
+    expires_at = timezone.now() + timedelta(seconds=expires)
+    magic_links = MagicLink.objects.bulk_create([
+        MagicLink(email=email, token_type=token_type, expires_at=expires_at)
+        for email in emails
+    ])
+    return [
+        TokenPayload(
+            email=magic_link.email,
+            exp=expires_at.timestamp(),
+            token_id=str(magic_link.id),
+            token_type=token_type,
+        )
+        for magic_link in magic_links
+    ]
+
+
+def _compact_v1_mac(body: bytes, secret: str) -> bytes:
+    return salted_hmac(MAGIC_LINK_SALT, body, secret=secret, algorithm="sha256").digest()[:COMPACT_MAC_BYTES]
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _encode_compact(payload: TokenPayload) -> str:
     """
-    Generate a signed token from payload.
+    Pack a payload into a compact token signed with the active key.
 
     Args:
         payload: TokenPayload instance
 
     Returns:
-        Signed token string
+        URL-safe token string
+    """
+    keyring = get_keyring()
+    body = _COMPACT_BODY.pack(
+        COMPACT_VERSION,
+        keyring.active,
+        uuid.UUID(payload.token_id).bytes,
+        _TYPE_CODES[payload.token_type],
+        int(payload.exp),
+    )
+    return _b64encode(body + keyring.sign(body)[:COMPACT_MAC_BYTES])
+
+
+def _encode_compact_v1(payload: TokenPayload) -> str:
+    """Version 1 format, kept for tests and comparison benchmarks."""
+    body = _COMPACT_V1_BODY.pack(
+        1, uuid.UUID(payload.token_id).bytes, _TYPE_CODES[payload.token_type], int(payload.exp),
+    )
+    return _b64encode(body + _compact_v1_mac(body, settings.SECRET_KEY))
+
+
+def _decode_compact(token: str) -> TokenPayload:
+    """
+    Check and unpack a compact (version 2 or 1) token.
+
+    The email is left blank; it comes from the MagicLink row.
+
+    Args:
+        token: Token string
+
+    Returns:
+        TokenPayload instance
+
+    Raises:
+        signing.BadSignature: If the token is malformed or its MAC does not match
+        UnknownSigningKey: If the keyring, even re-read, lacks the token's key ID
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except ValueError as e:
+        raise signing.BadSignature("Malformed token") from e
+    # Reject non-canonical spellings so each token has exactly one string form
+    if not raw or _b64encode(raw) != token:
+        raise signing.BadSignature("Non-canonical token encoding")
+
+    if raw[0] == COMPACT_VERSION and len(raw) == _COMPACT_BODY.size + COMPACT_MAC_BYTES:
+        body, mac = raw[:_COMPACT_BODY.size], raw[_COMPACT_BODY.size:]
+        try:
+            expected = get_keyring().sign(body, kid=raw[1])[:COMPACT_MAC_BYTES]
+        except KeyError:
+            # Possibly rotated in since the last check: re-read the file once
+            reload_keyring()
+            try:
+                expected = get_keyring().sign(body, kid=raw[1])[:COMPACT_MAC_BYTES]
+            except KeyError as e:
+                raise UnknownSigningKey(raw[1]) from e
+        if not constant_time_compare(mac, expected):
+            raise signing.BadSignature("Token MAC mismatch")
+        _, _, token_id, type_code, exp = _COMPACT_BODY.unpack(body)
+    elif raw[0] == 1 and len(raw) == _COMPACT_V1_BODY.size + COMPACT_MAC_BYTES:
+        body, mac = raw[:_COMPACT_V1_BODY.size], raw[_COMPACT_V1_BODY.size:]
+        secrets = [settings.SECRET_KEY, *getattr(settings, "SECRET_KEY_FALLBACKS", [])]
+        if not any(constant_time_compare(mac, _compact_v1_mac(body, secret)) for secret in secrets):
+            raise signing.BadSignature("Token MAC mismatch")
+        _, token_id, type_code, exp = _COMPACT_V1_BODY.unpack(body)
+    else:
+        raise signing.BadSignature("Unknown token format")
+
+    if type_code not in _TYPES_BY_CODE:
+        raise signing.BadSignature("Unknown token type")
+    return TokenPayload(email="", exp=float(exp), token_id=str(uuid.UUID(bytes=token_id)),
+                        token_type=_TYPES_BY_CODE[type_code])
+
+
+def _decode_signed(token: str, max_age: int) -> TokenPayload:
+    """
+    Check and unpack a legacy django.core.signing token.
+
+    Args:
+        token: Token string
+        max_age: Maximum age in seconds
+
+    Returns:
+        TokenPayload instance
+
+    Raises:
+        signing.BadSignature: If the signature is invalid or expired
+        TypeError: If the payload has unexpected fields
     """
+    return TokenPayload(**signing.loads(token, salt=MAGIC_LINK_SALT, max_age=max_age))
+
+
+def _encode_signed(payload: TokenPayload) -> str:
+    """Legacy format, kept for comparison benchmarks."""
     return signing.dumps(payload.__dict__, salt=MAGIC_LINK_SALT)
 
 
+def _decode_token(token: str, max_age: int) -> TokenPayload:
+    """Dispatch on format: legacy signed tokens always contain a colon."""
+    if ":" in token:
+        if not getattr(settings, "MAGIC_LINK_ACCEPT_LEGACY_TOKENS", True):
+            raise signing.BadSignature("Legacy tokens are no longer accepted")
+        return _decode_signed(token, max_age)
+    return _decode_compact(token)
+
+
+def _generate_token(payload: TokenPayload) -> str:
+    """
+    Generate a compact token from payload.
+
+    Args:
+        payload: TokenPayload instance
+
+    Returns:
+        URL-safe token string
+    """
+    return _encode_compact(payload)
+
+
 def generate_login_token(email: str, expires: int = 1800) -> str:
     """
     Generate a login magic link token.
@@ -83,7 +280,7 @@ def generate_login_token(email: str, expires: int = 1800) -> str:
         expires: Expiration time in seconds (default: 30 minutes)
 
     Returns:
-        Signed token string
+        Token string
     """
     return _generate_token(_stamp_payload(email, expires, MagicLink.TokenType.LOGIN))
 
@@ -97,41 +294,79 @@ def generate_verification_token(email: str, expires: int = 60 * 60 * 24) -> str:
         expires: Expiration time in seconds (default: 24 hours)
 
     Returns:
-        Signed token string
+        Token string
     """
     return _generate_token(_stamp_payload(email, expires, MagicLink.TokenType.VERIFY))
 
 
+def generate_verification_tokens(emails: Iterable[str], expires: int = 60 * 60 * 24) -> List[str]:
+    """
+    Generate email verification tokens for many addresses at once.
+
+    Args:
+        emails: Email addresses to issue tokens for
+        expires: Expiration time in seconds (default: 24 hours)
+
+    Returns:
+        List of token strings, in input order
+    """
+    return [_generate_token(payload) for payload in _stamp_payloads(emails, expires, MagicLink.TokenType.VERIFY)]
+
+
 def _verify_token(token: str, max_age: int, token_type: str) -> Optional[TokenPayload]:
     """
     Verify and validate a magic link token.
 
+    Tokens that are definitively bad (bad signature, expired, wrong type,
+    unknown or already used) are remembered in the negative cache, so a
+    replay is rejected before any signature check or database work.
+    Successfully verified tokens are consumed and remembered the same way.
+    The returned payload's email is taken from the MagicLink row.
+
     Args:
-        token: Signed token string
-        max_age: Maximum age in seconds
+        token: Token string
+        max_age: Maximum age in seconds (legacy tokens; compact tokens carry
+            their expiry)
         token_type: Expected token type (LOGIN or VERIFY)
 
     Returns:
         TokenPayload if valid, None otherwise
     """
-    try:
-        data = signing.loads(token, salt=MAGIC_LINK_SALT, max_age=max_age)
-        payload = TokenPayload(**data)
-
-        if payload.token_type != token_type:
-            return None
+    if not isinstance(token, str):
+        return None
+    key = rejected_tokens.key(token, token_type, max_age)
+    if rejected_tokens.contains(key):
+        return None
 
-        magic_link = MagicLink.objects.filter(id=payload.token_id, token_type=token_type).first()
-        if not magic_link or magic_link.is_used or magic_link.is_expired:
-            return None
+    try:
+        payload = _decode_token(token, max_age)
+        if payload.token_type != token_type or payload.exp < timezone.now().timestamp():
+            magic_link = None
+        else:
+            magic_link = MagicLink.objects.filter(id=payload.token_id, token_type=token_type).first()
+    except (signing.BadSignature, TypeError, ValueError, ValidationError):
+        rejected_tokens.add(key, max_age)
+        return None
+    except UnknownSigningKey as e:
+        logger.warning("Magic-link token signed with unknown key ID %s", e)
+        return None
+    except Exception:
+        # Transient (e.g. database) failure: reject this attempt, don't remember it
+        logger.exception("Token verification failed")
+        return None
 
-        if payload.exp < timezone.now().timestamp():
-            return None
+    if not magic_link or magic_link.is_used or magic_link.is_expired:
+        rejected_tokens.add(key, max_age)
+        return None
 
+    try:
         magic_link.mark_used()
-        return payload
     except Exception:
+        logger.exception("Could not mark magic link %s used", magic_link.id)
         return None
+    rejected_tokens.add(key, max_age)
+    payload.email = magic_link.email
+    return payload
 
 
 def verify_login_token(token: str, max_age: int = 1800) -> Optional[TokenPayload]:
@@ -139,7 +374,7 @@ def verify_login_token(token: str, max_age: int = 1800) -> Optional[TokenPayload
     Verify a login magic link token.
 
     Args:
-        token: Signed token string
+        token: Token string
         max_age: Maximum age in seconds (default: 30 minutes)
 
     Returns:
@@ -153,7 +388,7 @@ def verify_verification_token(token: str, max_age: int = 60 * 60 * 24) -> Option
     Verify an email verification token.
 
     Args:
-        token: Signed token string
+        token: Token string
         max_age: Maximum age in seconds (default: 24 hours)
 
     Returns:
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'accounts'
 
@@ -9,5 +9,10 @@ urlpatterns = [
     path('verify/', views.verify_email, name='verify'),
     path('login/confirm/', views.login_confirm, name='login_confirm'),
     path('logout/', views.logout_view, name='logout'),
-    path('delete/<str:email>/', views.delete_user, name='delete_user')
+    path('delete/<str:email>/', views.delete_user, name='delete_user'),
+    path('api/register', api.register, name='api_register'),
+    path('api/login', api.login_request, name='api_login'),
+    path('api/verify', api.verify_email, name='api_verify'),
+    path('api/confirm', api.login_confirm, name='api_confirm'),
+    path('export/mailing-list.csv', views.export_mailing_list, name='export_mailing_list'),
 ]
@@ -0,0 +1,44 @@
+"""
+Input validation shared by the HTML views and the JSON API.
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+
+def validate_email_address(email):
+    """
+    Validate email format.
+
+    Args:
+        email: Email address to validate
+
+    Returns:
+        Tuple of (is_valid: bool, error_message: str | None)
+    """
+    if not email:
+        return False, "Email is required."
+    try:
+        validate_email(email)
+        return True, None
+    except ValidationError:
+        return False, "Please enter a valid email address."
+
+
+def validate_name(name):
+    """
+    Validate name field.
+
+    Args:
+        name: Name string to validate
+
+    Returns:
+        Tuple of (is_valid: bool, error_message: str | None)
+    """
+    if not name:
+        return False, "Name is required."
+    if len(name.strip()) < 2:
+        return False, "Name must be at least 2 characters long."
+    if len(name.strip()) > 255:
+        return False, "Name must be less than 255 characters."
+    return True, None
@@ -6,17 +6,19 @@ functionality using passwordless (magic link) authentication.
 """
 
 from django.shortcuts import render, redirect
+from django.http import StreamingHttpResponse
 from django.contrib.auth import login, logout, get_user_model
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
-from django.core.exceptions import ValidationError
-from django.core.validators import validate_email
 from django.db import IntegrityError
 import logging
 
-from .tokens import verify_login_token, verify_verification_token
-from .services import send_verification_email, send_login_email
+# The token and mail stacks are imported inside the views that use them, so
+# loading the URLconf (and every cold start) doesn't pay for them.
+from . import events
+from .models import AuthEvent
 from .rate_limit import is_rate_limited
+from .validators import validate_email_address, validate_name
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -25,62 +27,53 @@ logger = logging.getLogger(__name__)
 LOGIN_RATE_LIMIT = {"limit": 5, "window": 15 * 60}  # 5 requests per 15 minutes
 REGISTER_RATE_LIMIT = {"limit": 3, "window": 60 * 60}  # 3 requests per hour
 
+# Rows fetched per round trip when streaming exports
+EXPORT_CHUNK_SIZE = 2000
 
-def _rate_limit_email(request, email, action, limit_config):
-    """
-    Check and enforce rate limiting for email-based actions.
+# Leading characters spreadsheets treat as formulas
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
 
-    Args:
-        request: Django request object
-        email: Email address to check
-        action: Action identifier (e.g., "login", "register")
-        limit_config: Dictionary with "limit" and "window" keys
 
-    Returns:
-        True if rate limited, False otherwise
-    """
-    if is_rate_limited(action, email.lower(), limit_config["limit"], limit_config["window"]):
-        messages.error(request, "Too many requests. Please try again later.")
-        return True
-    return False
+class _Echo:
+    """Pseudo-buffer whose write() hands the formatted row straight back."""
 
+    def write(self, value):
+        return value
 
-def _validate_email(email):
+
+def _csv_safe(value):
     """
-    Validate email format.
+    Neutralize values that a spreadsheet would evaluate as a formula.
 
     Args:
-        email: Email address to validate
+        value: Cell value
 
     Returns:
-        Tuple of (is_valid: bool, error_message: str | None)
+        The value, prefixed with a quote if it starts like a formula
     """
-    if not email:
-        return False, "Email is required."
-    try:
-        validate_email(email)
-        return True, None
-    except ValidationError:
-        return False, "Please enter a valid email address."
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
 
 
-def _validate_name(name):
+def _rate_limit_email(request, email, action, limit_config):
     """
-    Validate name field.
+    Check and enforce rate limiting for email-based actions.
 
     Args:
-        name: Name string to validate
+        request: Django request object
+        email: Email address to check
+        action: Action identifier (e.g., "login", "register")
+        limit_config: Dictionary with "limit" and "window" keys
 
     Returns:
-        Tuple of (is_valid: bool, error_message: str | None)
+        True if rate limited, False otherwise
     """
-    if not name:
-        return False, "Name is required."
-    if len(name.strip()) < 2:
-        return False, "Name must be at least 2 characters long."
-    if len(name.strip()) > 255:
-        return False, "Name must be less than 255 characters."
-    return True, None
+    if is_rate_limited(action, email.lower(), limit_config["limit"], limit_config["window"]):
+        events.record(AuthEvent.Kind.RATE_LIMITED, email, request, detail=action)
+        messages.error(request, "Too many requests. Please try again later.")
+        return True
+    return False
 
 
 def register(request):
@@ -97,19 +90,21 @@ def register(request):
         return render(request, "accounts/register.html")
 
     # POST
+    from .services import MailCircuitOpen, send_verification_email
+
     email = request.POST.get("email", "").strip()
     name = request.POST.get("name", "").strip()
     # Gets whether the User want to be part of the mailing list
     mailing_list = bool(request.POST.get("mailing_list"))
 
     # Validate email format
-    is_valid, error_msg = _validate_email(email)
+    is_valid, error_msg = validate_email_address(email)
     if not is_valid:
         messages.error(request, error_msg)
         return redirect("accounts:register")
 
     # Validate name
-    is_valid, error_msg = _validate_name(name)
+    is_valid, error_msg = validate_name(name)
     if not is_valid:
         messages.error(request, error_msg)
         return redirect("accounts:register")
@@ -124,10 +119,15 @@ def register(request):
         if not existing_user.is_verified:
             # User exists but not verified - resend verification email
             try:
-                send_verification_email(request, email)
+                send_verification_email(request, email, existing_user.name)
+                events.record(AuthEvent.Kind.VERIFICATION_SENT, email, request, detail="resend")
                 messages.info(request, "This email is already registered but not verified. We've sent a new verification email. Please check your inbox.")
+            except MailCircuitOpen:
+                events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="circuit_open")
+                messages.error(request, "This email is already registered but not verified. Email is temporarily unavailable, please try again in a minute.")
             except Exception as e:
-                logger.error(f"Failed to send verification email: {e}")
+                logger.error("Failed to send verification email: %s", e)
+                events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="verification")
                 messages.error(request, "This email is already registered but not verified. We couldn't send a verification email. Please try again later.")
             return redirect("accounts:register")
         else:
@@ -145,19 +145,25 @@ def register(request):
             name=name,
             mailing_list=mailing_list
         )
+        events.record(AuthEvent.Kind.REGISTERED, email, request)
 
         # Send verification email
         try:
-            send_verification_email(request, email)
+            send_verification_email(request, email, user.name)
+            events.record(AuthEvent.Kind.VERIFICATION_SENT, email, request)
             messages.success(request, "Registration successful! Please check your email to verify your account.")
+        except MailCircuitOpen:
+            events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="circuit_open")
+            messages.warning(request, "Account created, but email is temporarily unavailable. Register again in a minute to get your verification email.")
         except Exception as e:
-            logger.error(f"Failed to send verification email: {e}")
+            logger.error("Failed to send verification email: %s", e)
+            events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="verification")
             messages.warning(request, "Account created, but we couldn't send the verification email. Please contact support.")
     except IntegrityError as e:
-        logger.error(f"Integrity error creating user: {e}")
+        logger.error("Integrity error creating user: %s", e)
         messages.error(request, "An error occurred during registration. Please try again.")
     except Exception as e:
-        logger.error(f"Unexpected error during registration: {e}")
+        logger.error("Unexpected error during registration: %s", e)
         messages.error(request, "An unexpected error occurred. Please try again later.")
 
     return redirect("accounts:register")
@@ -176,6 +182,8 @@ def login_request(request):
         return render(request, "accounts/login.html")
 
     # POST
+    from .services import MailCircuitOpen, send_login_email
+
     email = request.POST.get("email", "").strip()
 
     # Check if user is already logged in
@@ -184,7 +192,7 @@ def login_request(request):
         return redirect("core:landing")
 
     # Validate email format
-    is_valid, error_msg = _validate_email(email)
+    is_valid, error_msg = validate_email_address(email)
     if not is_valid:
         messages.error(request, error_msg)
         return redirect("accounts:login")
@@ -207,10 +215,15 @@ def login_request(request):
 
     # Send login email
     try:
-        send_login_email(request, email)
+        send_login_email(request, email, user.name)
+        events.record(AuthEvent.Kind.LOGIN_LINK_SENT, email, request)
         messages.success(request, "Login link sent! Please check your email.")
+    except MailCircuitOpen:
+        events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="circuit_open")
+        messages.error(request, "Email is temporarily unavailable. Please try again in a minute.")
     except Exception as e:
-        logger.error(f"Failed to send login email: {e}")
+        logger.error("Failed to send login email: %s", e)
+        events.record(AuthEvent.Kind.MAIL_FAILED, email, request, detail="login")
         messages.error(request, "We couldn't send the login email. Please try again later.")
 
     # Re-render the login page (200) to avoid redirect loops during rapid requests/tests
@@ -233,6 +246,8 @@ def verify_email(request):
     Returns:
         Redirect to login page with success/error message
     """
+    from .tokens import verify_verification_token
+
     token = request.GET.get("token")
 
     if not token:
@@ -242,6 +257,7 @@ def verify_email(request):
     data = verify_verification_token(token)
 
     if not data:
+        events.record(AuthEvent.Kind.TOKEN_REJECTED, request=request, detail="verify")
         messages.error(request, "Invalid or expired verification token. Please request a new verification email.")
         return redirect("accounts:register")
 
@@ -255,12 +271,13 @@ def verify_email(request):
 
         user.is_verified = True
         user.save()
+        events.record(AuthEvent.Kind.VERIFIED, user.email, request)
         messages.success(request, "Email verified successfully! You can now log in.")
     except User.DoesNotExist:
         messages.error(request, "User account not found. Please register again.")
         return redirect("accounts:register")
     except Exception as e:
-        logger.error(f"Error verifying email: {e}")
+        logger.error("Error verifying email: %s", e)
         messages.error(request, "An error occurred during verification. Please try again.")
         return redirect("accounts:register")
 
@@ -276,6 +293,8 @@ def login_confirm(request):
     Returns:
         Redirect to landing page on success, login page on error
     """
+    from .tokens import verify_login_token
+
     token = request.GET.get("token")
 
     if not token:
@@ -285,6 +304,7 @@ def login_confirm(request):
     data = verify_login_token(token)
 
     if not data:
+        events.record(AuthEvent.Kind.TOKEN_REJECTED, request=request, detail="login")
         messages.error(request, "Invalid or expired login token. Please request a new login link.")
         return redirect("accounts:login")
 
@@ -297,12 +317,13 @@ def login_confirm(request):
             return redirect("accounts:login")
 
         login(request, user)
+        events.record(AuthEvent.Kind.LOGGED_IN, user.email, request)
         messages.success(request, f"Welcome back, {user.name}!")
     except User.DoesNotExist:
         messages.error(request, "User account not found. Please register first.")
         return redirect("accounts:register")
     except Exception as e:
-        logger.error(f"Error during login confirmation: {e}")
+        logger.error("Error during login confirmation: %s", e)
         messages.error(request, "An error occurred during login. Please try again.")
         return redirect("accounts:login")
 
@@ -318,7 +339,10 @@ def logout_view(request):
     Returns:
         Redirect to landing page
     """
+    email = getattr(request.user, "email", "")
     logout(request)
+    if email:
+        events.record(AuthEvent.Kind.LOGGED_OUT, email, request)
     messages.info(request, "You have been logged out successfully.")
     return redirect("core:landing")
 
@@ -348,3 +372,36 @@ def delete_user(request, email):
         return redirect('core:landing')
 
     return redirect('core:landing')
+
+@staff_member_required
+def export_mailing_list(request):
+    """
+    Stream opted-in, verified users as CSV (staff only).
+
+    Rows are read with a chunked iterator and written as they are produced,
+    so memory use stays flat regardless of list size.
+
+    Args:
+        request: Django request object
+
+    Returns:
+        StreamingHttpResponse with a CSV attachment
+    """
+    rows = (
+        User.objects.filter(mailing_list=True, is_verified=True)
+        .order_by("pk")
+        .values_list("email", "name", "date_joined")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    import csv
+
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield writer.writerow(["email", "name", "date_joined"])
+        for email, name, date_joined in rows:
+            yield writer.writerow([_csv_safe(email), _csv_safe(name), date_joined.isoformat()])
+
+    response = StreamingHttpResponse(stream(), content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="mailing-list.csv"'
+    return response
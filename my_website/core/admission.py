@@ -0,0 +1,148 @@
+"""
+Admission control for expensive endpoints.
+
+Requests matching a route group must take one of the group's concurrency
+slots before reaching the view. If all slots are busy a request may wait
+in a short, bounded queue; when the queue is full or the wait times out it
+is shed with 503 and Retry-After. Cheap page traffic never touches a
+semaphore, so a burst of logins cannot starve it of workers.
+
+Groups are configured with the ADMISSION_CONTROL setting:
+
+    ADMISSION_CONTROL = {
+        "password": {
+            "routes": ["login", "register"],   # URL names, reversed once
+            "methods": ["POST"],
+            "concurrency": 2,                  # requests running at once
+            "queue": 4,                        # requests allowed to wait
+            "timeout": 2.0,                    # max wait in seconds
+            "retry_after": 5,                  # Retry-After header value
+        },
+    }
+
+Limits are per process; size them against the number of worker threads.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import NoReverseMatch, reverse
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionGroup:
+    """A concurrency limit with a bounded wait queue."""
+
+    def __init__(self, name, concurrency=4, queue=8, timeout=2.0, retry_after=5, **_):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+
+    def acquire(self):
+        """
+        Take a slot, waiting in the queue if allowed.
+
+        Returns:
+            True if admitted, False if the request should be shed
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.queue_limit:
+                    self.shed_queue_full += 1
+                    return False
+                self.waiting += 1
+                self.peak_waiting = max(self.peak_waiting, self.waiting)
+            admitted = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self.waiting -= 1
+                if not admitted:
+                    self.shed_timeout += 1
+                    return False
+        with self._lock:
+            self.in_flight += 1
+            self.admitted += 1
+        return True
+
+    def release(self):
+        """Return a slot taken by acquire()."""
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def snapshot(self):
+        """Current gauges and counters for the metrics view."""
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "queue_limit": self.queue_limit,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "peak_waiting": self.peak_waiting,
+                "admitted": self.admitted,
+                "shed_queue_full": self.shed_queue_full,
+                "shed_timeout": self.shed_timeout,
+            }
+
+
+class AdmissionControlMiddleware:
+    """Gate configured routes behind their group's AdmissionGroup."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = getattr(settings, "ADMISSION_CONTROL", {})
+        self.groups = {name: AdmissionGroup(name, **options) for name, options in config.items()}
+        self._config = config
+        self._routes = None
+        metrics.register("admission", self.snapshot)
+
+    def _route_table(self):
+        """Map (method, path) to groups; URLs are reversed on first use."""
+        if self._routes is None:
+            routes = {}
+            for name, options in self._config.items():
+                methods = [method.upper() for method in options.get("methods", ["POST"])]
+                for url_name in options.get("routes", ()):
+                    try:
+                        path = reverse(url_name)
+                    except NoReverseMatch:
+                        logger.warning("Admission control route %s does not resolve", url_name)
+                        continue
+                    for method in methods:
+                        routes[(method, path)] = self.groups[name]
+            self._routes = routes
+        return self._routes
+
+    def __call__(self, request):
+        group = self._route_table().get((request.method, request.path))
+        if group is None:
+            return self.get_response(request)
+        if not group.acquire():
+            logger.warning("Shedding %s %s (group %s saturated)", request.method, request.path, group.name)
+            response = HttpResponse(
+                "The server is busy. Please try again shortly.", status=503, content_type="text/plain",
+            )
+            response["Retry-After"] = str(group.retry_after)
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            group.release()
+
+    def snapshot(self):
+        """Metrics for every group."""
+        return {name: group.snapshot() for name, group in self.groups.items()}
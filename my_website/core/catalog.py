@@ -0,0 +1,119 @@
+"""
+Project catalog queries and card rendering.
+
+Pages are fetched with keyset pagination on (pushed_at, id) so every page
+costs the same index range scan, and each card's HTML is rendered once and
+cached under a key versioned by the project's updated_at.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Project
+
+PROJECTS_PER_PAGE = 12
+
+# Bump when core/_project_card.html changes so stale fragments are ignored
+CARD_TEMPLATE_VERSION = 2
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(project):
+    """
+    Encode a project's position in the listing as an opaque cursor.
+
+    Args:
+        project: Last Project on the current page
+
+    Returns:
+        Cursor string of the form "<microseconds>.<id>"
+    """
+    delta = project.pushed_at - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
+    return f"{micros}.{project.pk}"
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string (may be None or malformed)
+
+    Returns:
+        Tuple of (pushed_at, id), or None if the cursor is missing or invalid
+    """
+    try:
+        micros, pk = cursor.split(".")
+        return _EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def get_project_page(tag=None, after=None, per_page=PROJECTS_PER_PAGE):
+    """
+    Fetch one page of published projects.
+
+    Args:
+        tag: Optional tag slug to filter by
+        after: Optional cursor from a previous page
+        per_page: Page size
+
+    Returns:
+        Tuple of (projects, next_cursor); next_cursor is None on the last page
+    """
+    projects = Project.objects.filter(is_published=True).order_by("-pushed_at", "-id")
+    if tag:
+        projects = projects.filter(tags__slug=tag)
+    position = decode_cursor(after)
+    if position is not None:
+        pushed_at, pk = position
+        projects = projects.filter(Q(pushed_at__lt=pushed_at) | Q(pushed_at=pushed_at, pk__lt=pk))
+
+    page = list(projects.prefetch_related("tags")[:per_page + 1])
+    next_cursor = encode_cursor(page[per_page - 1]) if len(page) > per_page else None
+    return page[:per_page], next_cursor
+
+
+def card_cache_key(project):
+    """
+    Build the cache key for a project's rendered card.
+
+    Args:
+        project: Project instance
+
+    Returns:
+        Cache key that changes whenever the project changes
+    """
+    return f"core:project-card:v{CARD_TEMPLATE_VERSION}:{project.pk}:{project.updated_at.timestamp()}"
+
+
+def render_project_cards(projects):
+    """
+    Return the rendered card HTML for each project, using the cache.
+
+    Args:
+        projects: Iterable of Project instances (tags prefetched)
+
+    Returns:
+        List of safe HTML strings in the same order
+    """
+    keys = {project.pk: card_cache_key(project) for project in projects}
+    cached = cache.get_many(keys.values())
+    missing = {}
+    cards = []
+    for project in projects:
+        html = cached.get(keys[project.pk])
+        if html is None:
+            html = render_to_string("core/_project_card.html", {"project": project})
+            missing[keys[project.pk]] = html
+        cards.append(mark_safe(html))
+    if missing:
+        cache.set_many(missing, CARD_CACHE_TIMEOUT)
+    return cards
@@ -0,0 +1,29 @@
+"""
+System checks for the core app.
+"""
+
+from django.conf import settings
+from django.core import checks
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Check the mail circuit breaker's cache exists and is shared between processes."""
+    from .circuit import DEFAULT_CONFIG
+
+    breaker = {**DEFAULT_CONFIG, **getattr(settings, "MAIL_CIRCUIT_BREAKER", {})}
+    if not breaker["enabled"]:
+        return []
+    if breaker["cache"] not in settings.CACHES:
+        return [checks.Error(
+            f"MAIL_CIRCUIT_BREAKER uses the cache {breaker['cache']!r}, which is not in CACHES.",
+            id="core.E001",
+        )]
+    if settings.CACHES[breaker["cache"]].get("BACKEND", "").endswith("LocMemCache"):
+        return [checks.Warning(
+            "The mail circuit breaker is enabled on a local-memory cache.",
+            hint="Each worker process then trips on its own after its own SMTP timeouts. "
+                 "Use a shared cache (DJANGO_BREAKER_CACHE=db or a redis:// URL).",
+            id="core.W001",
+        )]
+    return []
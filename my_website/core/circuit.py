@@ -0,0 +1,239 @@
+"""
+Circuit breaker with state kept in the Django cache.
+
+Wraps calls to an external dependency (the SMTP server, for one). While
+the dependency is healthy the breaker is closed and calls go through;
+outcomes are counted in the cache per `window` seconds. Once at least
+`min_calls` calls were made in the current and previous window and the
+failure share reaches `failure_rate`, the breaker opens for `open_seconds`:
+calls fail immediately with CircuitOpen instead of waiting for a timeout.
+After that one caller, across all workers, is let through as a probe (half-open).
+Success closes the breaker, failure opens it again.
+
+State lives in the cache alias named by the `cache` option. Only a shared
+backend (the database cache, Redis) gives every worker one breaker; with a
+local-memory cache each process trips on its own, and system check
+core.W001 warns about that. A breaker sees a handful of writes per call,
+so it can sit on the database cache without moving hot-path caches there.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    "enabled": True,
+    "failure_rate": 0.5,
+    "min_calls": 5,
+    "window": 60,
+    "open_seconds": 30,
+    "cache": "default",
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency while its breaker is open."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} circuit is open; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker shared through the cache.
+
+    Args:
+        name: Breaker name (cache key prefix and log label)
+        setting: Name of the settings dict overriding DEFAULT_CONFIG
+        error_class: CircuitOpen subclass to raise while open
+        counts_as_failure: Predicate deciding which exceptions count against
+            the dependency (others are re-raised without being recorded)
+    """
+
+    def __init__(self, name, setting, error_class=CircuitOpen, counts_as_failure=None):
+        self.name = name
+        self.setting = setting
+        self.error_class = error_class
+        self.counts_as_failure = counts_as_failure or (lambda error: True)
+        self._prefix = f"circuit:{name}"
+        self._lock = threading.Lock()
+        self._local = {"fast_failed": 0, "probes": 0, "opened": 0}
+
+    def get_config(self):
+        """Return the effective configuration."""
+        return {**DEFAULT_CONFIG, **getattr(settings, self.setting, {})}
+
+    @property
+    def cache(self):
+        """The cache holding this breaker's state."""
+        return caches[self.get_config()["cache"]]
+
+    def _bucket_keys(self, window, now):
+        bucket = int(now // window)
+        return [f"{self._prefix}:{kind}:{b}" for b in (bucket, bucket - 1) for kind in ("calls", "failures")]
+
+    def _count(self, kind, window, now):
+        key = f"{self._prefix}:{kind}:{int(now // window)}"
+        # add() is a no-op if the key exists; incr() is atomic on Redis, while the
+        # database cache may lose a concurrent count, which only delays tripping
+        self.cache.add(key, 0, timeout=window * 2)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, timeout=window * 2)
+
+    def _window_totals(self, window, now):
+        values = self.cache.get_many(self._bucket_keys(window, now))
+        calls = sum(v for k, v in values.items() if ":calls:" in k)
+        failures = sum(v for k, v in values.items() if ":failures:" in k)
+        return calls, failures
+
+    def _open(self, config, now):
+        self.cache.set(f"{self._prefix}:open_until", now + config["open_seconds"], timeout=None)
+        self.cache.delete(f"{self._prefix}:probe")
+        with self._lock:
+            self._local["opened"] += 1
+
+    def raise_if_open(self):
+        """
+        Fail fast while the breaker is open, without claiming the half-open probe.
+
+        Lets callers skip preparatory work (such as database writes) for a
+        call that would be refused anyway.
+
+        Raises:
+            CircuitOpen: If the breaker is open
+        """
+        if not self.get_config()["enabled"]:
+            return
+        open_until = self.cache.get(f"{self._prefix}:open_until")
+        now = time.time()
+        if open_until is not None and now < open_until:
+            with self._lock:
+                self._local["fast_failed"] += 1
+            raise self.error_class(self.name, open_until - now)
+
+    def before_call(self):
+        """
+        Check whether a call may go ahead.
+
+        Returns:
+            True if this call is the half-open probe, False for a normal call
+
+        Raises:
+            CircuitOpen: If the breaker is open, or half-open with a probe in flight
+        """
+        config = self.get_config()
+        if not config["enabled"]:
+            return False
+        open_until = self.cache.get(f"{self._prefix}:open_until")
+        if open_until is None:
+            return False
+        now = time.time()
+        if now < open_until:
+            with self._lock:
+                self._local["fast_failed"] += 1
+            raise self.error_class(self.name, open_until - now)
+        # Half-open: exactly one caller gets to probe; the probe key outlives a hung call
+        probe_timeout = max(config["open_seconds"], getattr(settings, "EMAIL_TIMEOUT", None) or 30)
+        if self.cache.add(f"{self._prefix}:probe", 1, timeout=probe_timeout):
+            with self._lock:
+                self._local["probes"] += 1
+            return True
+        with self._lock:
+            self._local["fast_failed"] += 1
+        raise self.error_class(self.name, 1)
+
+    def record(self, success, probe=False):
+        """
+        Record a call's outcome, opening or closing the breaker as needed.
+
+        Args:
+            success: Whether the call succeeded
+            probe: Whether this was the half-open probe
+        """
+        config = self.get_config()
+        if not config["enabled"]:
+            return
+        now = time.time()
+        if probe:
+            if success:
+                self.cache.delete_many([f"{self._prefix}:open_until", f"{self._prefix}:probe",
+                                   *self._bucket_keys(config["window"], now)])
+                logger.info("%s circuit closed after a successful probe", self.name)
+            else:
+                self._open(config, now)
+                logger.warning("%s circuit probe failed; open for %ss", self.name, config["open_seconds"])
+            return
+
+        self._count("calls", config["window"], now)
+        if success:
+            return
+        self._count("failures", config["window"], now)
+        calls, failures = self._window_totals(config["window"], now)
+        if calls >= config["min_calls"] and failures / calls >= config["failure_rate"]:
+            if self.cache.get(f"{self._prefix}:open_until") is None:
+                self._open(config, now)
+                logger.warning("%s circuit opened: %d of %d recent calls failed; open for %ss",
+                               self.name, failures, calls, config["open_seconds"])
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call func through the breaker.
+
+        Returns:
+            func's return value
+
+        Raises:
+            CircuitOpen: Without calling func, while the breaker is open
+            Exception: Whatever func raises
+        """
+        probe = self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record(not self.counts_as_failure(e), probe)
+            raise
+        self.record(True, probe)
+        return result
+
+    def reset(self):
+        """Close the breaker and forget recorded outcomes."""
+        config = self.get_config()
+        self.cache.delete_many([f"{self._prefix}:open_until", f"{self._prefix}:probe",
+                           *self._bucket_keys(config["window"], time.time())])
+
+    def state(self):
+        """
+        Current state for the metrics view.
+
+        Returns:
+            Dictionary with the state, window totals and per-process counters
+        """
+        config = self.get_config()
+        now = time.time()
+        open_until = self.cache.get(f"{self._prefix}:open_until")
+        if not config["enabled"]:
+            state = "disabled"
+        elif open_until is None:
+            state = CLOSED
+        else:
+            state = OPEN if now < open_until else HALF_OPEN
+        calls, failures = self._window_totals(config["window"], now)
+        with self._lock:
+            local = dict(self._local)
+        return {
+            "state": state,
+            "retry_after": round(open_until - now, 1) if state == OPEN else 0,
+            "recent_calls": calls,
+            "recent_failures": failures,
+            **local,
+        }
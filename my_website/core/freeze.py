@@ -0,0 +1,302 @@
+"""
+Static export ("freeze") of the public core pages.
+
+Each page in FROZEN_PAGES is rendered through the full middleware stack
+as an anonymous visitor. The request carries FREEZE_ENVIRON_KEY so that
+per-visitor parts render as empty placeholders: the {% dynamic_fragment %}
+slots (member nav, flash messages) and the {% csrf_input %} fields. A
+small script fills these in from /core/fragments/ after load. The HTML is
+written to <output>/<path>/index.html, and every static asset it
+references (including url() references inside CSS) is copied to
+<output>/<STATIC_URL>/.
+
+Rebuilds are incremental. The manifest records, for each page, the
+templates its last render used (with their content hashes), a data
+version and the static manifest hash. A page is re-rendered only if one
+of these changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import unquote, urljoin, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db.models import Count, Max
+from django.template.base import Template
+from django.urls import reverse
+
+# Set in the WSGI environ of freeze renders; HTTP clients cannot send it
+FREEZE_ENVIRON_KEY = "core.freeze"
+
+# Fragments /core/fragments/ may render, from core/templates/core/fragments/
+FRAGMENTS = ("nav", "messages")
+
+MANIFEST_NAME = "freeze-manifest.json"
+MANIFEST_VERSION = 1
+
+_ASSET_ATTR = re.compile(r"""(?:src|href|poster|data-src)\s*=\s*["']([^"']+)["']""")
+_SRCSET_ATTR = re.compile(r"""srcset\s*=\s*["']([^"']+)["']""")
+_LINK_HEADER_URL = re.compile(r"<([^>]+)>")
+_CSS_URL = re.compile(r"""url\(\s*["']?([^"')]+)["']?\s*\)""")
+
+
+def catalog_version():
+    """Data version of the project listing: changes whenever a published project does."""
+    from .catalog import CARD_TEMPLATE_VERSION
+    from .models import Project
+
+    state = Project.objects.filter(is_published=True).aggregate(latest=Max("updated_at"), count=Count("id"))
+    latest = state["latest"].isoformat() if state["latest"] else ""
+    return f"cards-v{CARD_TEMPLATE_VERSION}:{state['count']}:{latest}"
+
+
+@dataclass(frozen=True)
+class FrozenPage:
+    """A public route to export, with an optional data version."""
+
+    url_name: str
+    data_version: Optional[Callable[[], str]] = None
+
+    @property
+    def path(self):
+        return reverse(self.url_name)
+
+
+FROZEN_PAGES = (
+    FrozenPage("core:landing"),
+    FrozenPage("core:about"),
+    FrozenPage("core:projects", data_version=catalog_version),
+)
+
+
+def is_frozen_render(request):
+    """
+    Tell whether a request is a freeze render.
+
+    Args:
+        request: Django request object (or None)
+
+    Returns:
+        True if per-visitor output should be left as placeholders
+    """
+    return request is not None and bool(request.META.get(FREEZE_ENVIRON_KEY))
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_recording = threading.local()
+
+
+@contextmanager
+def record_templates():
+    """
+    Collect the files of every template rendered inside the block.
+
+    Yields:
+        Set of template file paths, filled as templates render
+    """
+    used = set()
+    original = Template._render
+
+    def _render(self, context):
+        names = getattr(_recording, "names", None)
+        if names is not None and self.origin and self.origin.name and os.path.isfile(self.origin.name):
+            names.add(self.origin.name)
+        return original(self, context)
+
+    Template._render = _render
+    _recording.names = used
+    try:
+        yield used
+    finally:
+        _recording.names = None
+        Template._render = original
+
+
+def static_manifest_hash():
+    """Hash of the collected static manifest, or "" when assets are not fingerprinted."""
+    manifest_name = getattr(staticfiles_storage, "manifest_name", None)
+    if manifest_name and staticfiles_storage.exists(manifest_name):
+        return _sha256_file(staticfiles_storage.path(manifest_name))
+    return ""
+
+
+def asset_urls(html, link_header=""):
+    """
+    List the static URLs an HTML page references.
+
+    Args:
+        html: Page HTML
+        link_header: Optional Link response header
+
+    Returns:
+        Sorted list of URL paths under STATIC_URL
+    """
+    static_url = urlsplit(settings.STATIC_URL).path
+    if not static_url.startswith("/"):
+        static_url = f"/{static_url}"
+    urls = set(_ASSET_ATTR.findall(html)) | set(_LINK_HEADER_URL.findall(link_header))
+    for srcset in _SRCSET_ATTR.findall(html):
+        urls.update(candidate.split()[0] for candidate in srcset.split(",") if candidate.strip())
+    return sorted({urlsplit(url).path for url in urls if urlsplit(url).path.startswith(static_url)})
+
+
+def _find_static(name):
+    """Return the file path for a static name, preferring collected (hashed) files."""
+    try:
+        if staticfiles_storage.exists(name):
+            return staticfiles_storage.path(name)
+    except NotImplementedError:
+        pass
+    return finders.find(name)
+
+
+class SiteFreezer:
+    """Render FROZEN_PAGES into a directory, re-rendering only what changed."""
+
+    def __init__(self, output_dir, pages=FROZEN_PAGES, host="localhost", force=False, log=None):
+        self.output_dir = Path(output_dir)
+        self.pages = pages
+        self.host = host
+        self.force = force
+        self.log = log or (lambda message: None)
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.stats = {"rendered": 0, "unchanged": 0, "removed": 0, "assets_copied": 0, "missing_assets": 0}
+
+    def _load_manifest(self):
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return {"pages": {}, "assets": {}}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {"pages": {}, "assets": {}}
+        return manifest
+
+    def _write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _page_file(self, url_path):
+        return self.output_dir / url_path.strip("/") / "index.html"
+
+    def _is_current(self, entry, data_version, static_hash):
+        if self.force or not entry or not self._page_file(entry["path"]).exists():
+            return False
+        if entry["data_version"] != data_version or entry["static_manifest"] != static_hash:
+            return False
+        for path, digest in entry["templates"].items():
+            try:
+                if _sha256_file(path) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _render(self, client, page):
+        response = client.get(page.path, secure=True, **{FREEZE_ENVIRON_KEY: True})
+        if response.status_code != 200 or not response.get("Content-Type", "").startswith("text/html"):
+            raise ValueError(f"{page.path} answered {response.status_code} {response.get('Content-Type', '')}")
+        return response.content, response.get("Link", "")
+
+    def build(self):
+        """
+        Render changed pages and copy the assets they reference.
+
+        Returns:
+            Dictionary of counters (rendered, unchanged, removed, assets_copied, missing_assets)
+
+        Raises:
+            ValueError: If a page does not render as a 200 HTML response
+        """
+        from django.test import Client
+
+        manifest = self._load_manifest()
+        static_hash = static_manifest_hash()
+        client = Client(HTTP_HOST=self.host, raise_request_exception=False)
+        pages, assets = {}, set()
+
+        for page in self.pages:
+            data_version = page.data_version() if page.data_version else ""
+            entry = manifest["pages"].get(page.url_name)
+            if entry and entry["path"] != page.path:
+                entry = None
+            if self._is_current(entry, data_version, static_hash):
+                pages[page.url_name] = entry
+                assets.update(entry["assets"])
+                self.stats["unchanged"] += 1
+                continue
+
+            with record_templates() as templates:
+                content, link = self._render(client, page)
+            page_assets = asset_urls(content.decode(), link)
+            self._write(self._page_file(page.path), content)
+            pages[page.url_name] = {
+                "path": page.path,
+                "data_version": data_version,
+                "static_manifest": static_hash,
+                "templates": {path: _sha256_file(path) for path in sorted(templates)},
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "link": link,
+                "assets": page_assets,
+            }
+            assets.update(page_assets)
+            self.stats["rendered"] += 1
+            self.log(f"Rendered {page.path}")
+
+        for url_name, entry in manifest["pages"].items():
+            if url_name not in pages and not any(e["path"] == entry["path"] for e in pages.values()):
+                self._page_file(entry["path"]).unlink(missing_ok=True)
+                self.stats["removed"] += 1
+
+        copied = self._copy_assets(assets, manifest["assets"])
+        self._write(self.manifest_path, json.dumps(
+            {"version": MANIFEST_VERSION, "pages": pages, "assets": copied}, indent=2, sort_keys=True,
+        ).encode())
+        return self.stats
+
+    def _copy_assets(self, urls, previous):
+        """Copy referenced static files (and their CSS url() references) that changed."""
+        static_url = urlsplit(settings.STATIC_URL).path.lstrip("/")
+        pending, done = list(urls), {}
+        while pending:
+            url = pending.pop()
+            name = unquote(url.lstrip("/"))[len(static_url):]
+            if name in done:
+                continue
+            source = _find_static(name)
+            if source is None:
+                self.stats["missing_assets"] += 1
+                self.log(f"Missing static file {name}")
+                done[name] = None
+                continue
+            digest = _sha256_file(source)
+            target = self.output_dir / static_url / name
+            if previous.get(name) != digest or not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target)
+                self.stats["assets_copied"] += 1
+            done[name] = digest
+            if name.endswith(".css"):
+                css = Path(source).read_text(encoding="utf-8", errors="replace")
+                for ref in _CSS_URL.findall(css):
+                    if not ref.startswith(("data:", "http:", "https:", "//", "#")):
+                        pending.append(urlsplit(urljoin(url, ref)).path)
+        return {name: digest for name, digest in done.items() if digest}
@@ -0,0 +1,178 @@
+"""
+Responsive image variants for project screenshots.
+
+Each original is decoded once and written out at several widths in every
+available modern format plus a JPEG/PNG fallback. Outputs live under a
+directory named after the original's SHA-256, so a re-run finds them on
+disk and only new or changed screenshots are processed. Images are never
+upscaled beyond their intrinsic width.
+
+Pillow is an optional dependency; it is only needed to build variants,
+not to serve pages that use them.
+"""
+
+import hashlib
+import io
+import json
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Target widths in CSS pixels; the intrinsic width caps the largest
+VARIANT_WIDTHS = (480, 768, 1024, 1600)
+
+# Preferred order for <source> elements: smallest files first
+MODERN_FORMATS = ("avif", "webp")
+
+MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+_SAVE_OPTIONS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 75, "method": 6},
+    "jpeg": {"quality": 80, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+}
+
+
+class ImagePipelineUnavailable(RuntimeError):
+    """Raised when Pillow is not installed."""
+
+
+def _pillow():
+    """Import Pillow lazily so page rendering never depends on it."""
+    try:
+        from PIL import Image, ImageOps, features
+    except ImportError as e:
+        raise ImagePipelineUnavailable("Pillow is required to build image variants (pip install Pillow)") from e
+    return Image, ImageOps, features
+
+
+def available_formats():
+    """
+    List the output formats this Pillow build can encode.
+
+    Returns:
+        Tuple of format names, modern formats first
+    """
+    _, _, features = _pillow()
+    supported = set(features.get_supported_modules())
+    return tuple(fmt for fmt in MODERN_FORMATS if fmt in supported)
+
+
+def content_hash(file):
+    """
+    Hash a file's contents without loading it into memory at once.
+
+    Args:
+        file: Django File (opened or openable)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    file.open("rb")
+    try:
+        for chunk in file.chunks():
+            digest.update(chunk)
+    finally:
+        file.close()
+    return digest.hexdigest()
+
+
+def variant_widths(intrinsic_width):
+    """
+    Pick output widths for an image without upscaling.
+
+    Args:
+        intrinsic_width: Width of the original in pixels
+
+    Returns:
+        Sorted tuple of widths
+    """
+    return tuple(sorted({min(width, intrinsic_width) for width in VARIANT_WIDTHS}))
+
+
+def _variant_dir(digest):
+    return f"variants/{digest[:2]}/{digest}"
+
+
+def build_variants(file, digest=None, storage=default_storage):
+    """
+    Generate (or reuse) every variant for one original image.
+
+    Args:
+        file: Django File of the original upload
+        digest: Precomputed content hash, if already known
+        storage: Storage that variants are written to
+
+    Returns:
+        Dictionary with "hash", "width", "height" and "variants", where
+        variants is a list of {"format", "width", "height", "name"} dicts
+
+    Raises:
+        ImagePipelineUnavailable: If Pillow is not installed
+    """
+    digest = digest or content_hash(file)
+    manifest_name = f"{_variant_dir(digest)}/manifest.json"
+    if storage.exists(manifest_name):
+        with storage.open(manifest_name, "rb") as handle:
+            return json.loads(handle.read())
+
+    Image, ImageOps, _ = _pillow()
+    file.open("rb")
+    try:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    finally:
+        file.close()
+
+    has_alpha = original.mode in ("RGBA", "LA") or (original.mode == "P" and "transparency" in original.info)
+    fallback = "png" if has_alpha else "jpeg"
+    source = original.convert("RGBA" if has_alpha else "RGB")
+    width, height = source.size
+
+    variants = []
+    for target_width in variant_widths(width):
+        target_height = max(1, round(height * target_width / width))
+        resized = source if target_width == width else source.resize((target_width, target_height), Image.LANCZOS)
+        for fmt in available_formats() + (fallback,):
+            name = f"{_variant_dir(digest)}/{target_width}.{fmt}"
+            if not storage.exists(name):
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), **_SAVE_OPTIONS[fmt])
+                storage.save(name, ContentFile(buffer.getvalue()))
+            variants.append({"format": fmt, "width": target_width, "height": target_height, "name": name})
+
+    result = {"hash": digest, "width": width, "height": height, "variants": variants}
+    storage.save(manifest_name, ContentFile(json.dumps(result).encode()))
+    return result
+
+
+def process_project_screenshot(project, force=False):
+    """
+    Build variants for a project's screenshot and record them on the model.
+
+    Args:
+        project: Project instance with a screenshot
+        force: Rebuild even if the stored hash matches
+
+    Returns:
+        True if the project was updated, False if it was already current
+    """
+    digest = content_hash(project.screenshot)
+    if not force and digest == project.screenshot_hash and project.screenshot_variants:
+        return False
+    result = build_variants(project.screenshot, digest=digest)
+    project.screenshot_hash = result["hash"]
+    project.screenshot_width = result["width"]
+    project.screenshot_height = result["height"]
+    project.screenshot_variants = result["variants"]
+    project.save(update_fields=[
+        "screenshot_hash", "screenshot_width", "screenshot_height", "screenshot_variants", "updated_at",
+    ])
+    return True
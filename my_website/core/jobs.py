@@ -0,0 +1,12 @@
+"""
+Periodic housekeeping jobs for the core app (see core.scheduler).
+"""
+
+from .maintenance import prune_expired_sessions
+from .scheduler import job
+
+
+@job(interval=6 * 60 * 60, budget=60)
+def clear_sessions(budget):
+    """Delete expired sessions in small batches, stopping when the budget runs out."""
+    return prune_expired_sessions(pause=0.05, should_stop=lambda: budget.exhausted)
@@ -0,0 +1,219 @@
+"""
+Request correlation IDs and non-blocking, structured logging.
+
+RequestIDMiddleware gives every request an ID: the incoming X-Request-ID
+header when a proxy set a sane one, otherwise a fresh one. The ID is kept
+in a context variable until request_finished and returned in the
+X-Request-ID response header, except on publicly cacheable responses.
+Every log record emitted while the request is handled carries it as
+`request_id`.
+
+QueueLogHandler is the only handler the loggers write to. On the calling
+thread it merges the message arguments, renders any traceback and puts
+the record on a bounded queue. A QueueListener thread formats the records
+(one JSON object per line with JSONFormatter) and does the stream or file
+I/O. When the queue is full, new records are dropped and counted instead
+of blocking the request. Queue depth and drops are reported under
+`logging` at /core/metrics/.
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import uuid
+import weakref
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+from django.core.signals import request_finished
+from django.utils.cache import cc_delim_re
+
+from . import metrics
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Accepted from upstream proxies; anything else is replaced, so clients
+# cannot inject newlines or arbitrary text into the logs
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+request_id_var = ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_queue_handlers = weakref.WeakSet()
+
+
+def get_request_id():
+    """Return the current request's ID ("-" outside a request)."""
+    return request_id_var.get()
+
+
+class RequestIDMiddleware:
+    """Assign each request an ID for log correlation and echo it in private responses."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        request.request_id = request_id
+        # Reset by _clear_request_id, not on the way out: Django logs 4xx/5xx
+        # responses (django.request) after the middleware chain returns
+        request_id_var.set(request_id)
+        response = self.get_response(request)
+        # A shared cache would replay one visitor's ID to everyone it serves
+        if "public" not in cc_delim_re.split(response.get("Cache-Control", "")):
+            response[REQUEST_ID_HEADER] = request_id
+        return response
+
+
+def _clear_request_id(sender, **kwargs):
+    # request_finished is sent when the response is closed, after django.request
+    # has logged it; records emitted later are not attributed to this request
+    request_id_var.set("-")
+
+
+request_finished.connect(_clear_request_id, dispatch_uid="core.log.clear_request_id")
+
+
+class RequestIDFilter(logging.Filter):
+    """Stamp records with the current request ID (on the emitting thread)."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Hand records to a background listener thread through a bounded queue.
+
+    Args:
+        stream: Stream the listener writes to (ignored when filename is set)
+        filename: File the listener appends to instead of a stream
+        maxsize: Records the queue holds before new ones are dropped
+        structured: Write JSON lines (False writes plain text, for development)
+    """
+
+    PLAIN_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+    def __init__(self, stream=None, filename=None, maxsize=10000, structured=True):
+        super().__init__(queue.Queue(maxsize))
+        target = WatchedFileHandler(filename, encoding="utf-8") if filename else logging.StreamHandler(stream)
+        target.setFormatter(JSONFormatter() if structured else logging.Formatter(self.PLAIN_FORMAT))
+        self.target = target
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.enqueued = 0
+        self._counter_lock = threading.Lock()
+        self.addFilter(RequestIDFilter())
+        self.listener = None
+        self._pid = None
+        self._start_listener()
+        _queue_handlers.add(self)
+        metrics.register("logging", stats)
+
+    def _start_listener(self):
+        with self._counter_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked after logging was configured (a preloading server):
+                # the listener thread did not survive, so start a fresh one
+                self.queue = queue.Queue(self.maxsize)
+            self.listener = QueueListener(self.queue, self.target)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def prepare(self, record):
+        # Resolve everything that depends on the caller (message args, the
+        # traceback, extra objects) here; the default prepare() would format the whole record
+        # on this thread, which is the work the listener is there to take over
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(vars(record))
+        for key, value in vars(record).items():
+            # Extras such as django.request's `request` stay with their thread
+            if key not in _RECORD_ATTRS and not isinstance(value, (str, int, float, bool, type(None))):
+                setattr(record, key, str(value))
+        record.msg, record.args, record.message = message, None, message
+        record.exc_info, record.exc_text = None, exc_text
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+        else:
+            with self._counter_lock:
+                self.enqueued += 1
+
+    def flush(self):
+        """Wait until the listener has written everything queued so far."""
+        if self._pid == os.getpid():
+            self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        # Stopping the listener writes out whatever is still queued
+        if self._pid == os.getpid():
+            self.listener.stop()
+            self._pid = None
+        self.target.close()
+        super().close()
+
+
+def stats():
+    """
+    Counters of the live queue handlers, for the metrics view.
+
+    Returns:
+        Dictionary with queued, capacity, enqueued and dropped totals
+    """
+    handlers = list(_queue_handlers)
+    return {
+        "handlers": len(handlers),
+        "queued": sum(handler.queue.qsize() for handler in handlers),
+        "capacity": sum(handler.maxsize for handler in handlers),
+        "enqueued": sum(handler.enqueued for handler in handlers),
+        "dropped": sum(handler.dropped for handler in handlers),
+    }
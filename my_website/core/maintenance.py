@@ -0,0 +1,119 @@
+"""
+Housekeeping routines for the core app.
+
+Expired rows in django_session are deleted in small batches, walked in
+(expire_date, session_key) order, each in its own short transaction with
+an optional pause in between. Stock clearsessions removes them in one
+DELETE, which on SQLite holds the write lock (and blocks every request
+that saves a session) until the whole table has been scanned.
+"""
+
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Index, Q
+from django.utils import timezone
+
+# Session engines whose data lives in django_session
+DB_SESSION_ENGINES = ("django.contrib.sessions.backends.db", "django.contrib.sessions.backends.cached_db")
+
+EXPIRE_INDEX_NAME = "core_session_expire_idx"
+
+
+def _session_model():
+    from django.contrib.sessions.models import Session
+
+    return Session
+
+
+def uses_session_table():
+    """Tell whether SESSION_ENGINE stores sessions in django_session."""
+    return settings.SESSION_ENGINE in DB_SESSION_ENGINES
+
+
+def has_expire_date_index(using=None):
+    """
+    Tell whether django_session has an index led by expire_date.
+
+    Args:
+        using: Database alias (defaults to the session model's write database)
+
+    Returns:
+        True if such an index exists
+    """
+    Session = _session_model()
+    connection = connections[using or router.db_for_write(Session)]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Session._meta.db_table)
+    return any(info["index"] and info["columns"][:1] == ["expire_date"] for info in constraints.values())
+
+
+def ensure_expire_date_index(using=None):
+    """
+    Create an expire_date index on django_session if none exists.
+
+    The stock migration creates one; tables from older or hand-made
+    schemas may lack it, and then every batch would scan the whole table.
+
+    Args:
+        using: Database alias (defaults to the session model's write database)
+
+    Returns:
+        True if an index was created
+    """
+    Session = _session_model()
+    using = using or router.db_for_write(Session)
+    if has_expire_date_index(using):
+        return False
+    with connections[using].schema_editor() as editor:
+        editor.add_index(Session, Index(fields=["expire_date"], name=EXPIRE_INDEX_NAME))
+    return True
+
+
+def prune_expired_sessions(now=None, batch_size=500, pause=0.0, progress=None, should_stop=None):
+    """
+    Delete expired sessions in keyset-paginated batches.
+
+    Session engines that do not use django_session fall back to their own
+    clear_expired(), in one go.
+
+    Args:
+        now: Sessions that expired before this datetime are removed (default: now)
+        batch_size: Maximum sessions deleted per transaction
+        pause: Seconds to sleep between batches, letting queued writers in
+        progress: Optional callable receiving the running totals after each batch
+        should_stop: Optional callable; when it returns True no further batch is started
+
+    Returns:
+        Dictionary with "deleted" and "batches" totals
+    """
+    totals = {"deleted": 0, "batches": 0}
+    if not uses_session_table():
+        import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+        return totals
+
+    Session = _session_model()
+    expired = Session.objects.filter(expire_date__lt=now or timezone.now()).order_by("expire_date", "session_key")
+    last = None
+
+    while not (should_stop and should_stop()):
+        page = expired
+        if last is not None:
+            page = page.filter(Q(expire_date__gt=last[0]) | Q(expire_date=last[0], session_key__gt=last[1]))
+        batch = list(page.values_list("expire_date", "session_key")[:batch_size])
+        if not batch:
+            break
+        last = batch[-1]
+        with transaction.atomic(using=router.db_for_write(Session)):
+            totals["deleted"] += Session.objects.filter(session_key__in=[key for _, key in batch]).delete()[0]
+        totals["batches"] += 1
+        if progress is not None:
+            progress(totals)
+        if len(batch) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return totals
@@ -0,0 +1,152 @@
+"""
+Benchmark request latency while requests log heavily.
+
+Each simulated request goes through RequestIDMiddleware to a view that
+emits --records log records. The records are written either synchronously
+by a StreamHandler on the request thread, or through core.log's
+QueueLogHandler, whose listener thread does the writing. --write-latency
+makes every write to the log file slow, like a busy disk or a blocked
+stdout pipe. Requests run on --threads threads at once.
+"""
+
+import logging
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.log import JSONFormatter, QueueLogHandler, RequestIDFilter, RequestIDMiddleware
+
+STRATEGIES = ("sync", "queue")
+
+
+class SlowFile:
+    """File wrapper that sleeps before every write."""
+
+    def __init__(self, path, latency):
+        self.handle = open(path, "a", encoding="utf-8")
+        self.latency = latency
+
+    def write(self, data):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.handle.write(data)
+
+    def flush(self):
+        self.handle.flush()
+
+    def close(self):
+        self.handle.close()
+
+
+class Command(BaseCommand):
+    help = "Measure request latency under heavy logging: synchronous handler vs the queue pipeline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per strategy (default: 2000)")
+        parser.add_argument("--records", type=int, default=20, help="Log records per request (default: 20)")
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent request threads (default: 4)")
+        parser.add_argument("--write-latency", type=float, default=0.0001,
+                            help="Seconds each log write takes (default: 0.0001)")
+        parser.add_argument("--queue-size", type=int, default=10000, help="Queue capacity (default: 10000)")
+        parser.add_argument("--strategy", action="append", choices=STRATEGIES, dest="strategies",
+                            help="Strategy to run (repeatable, default: all)")
+
+    def handle(self, *args, **options):
+        for name in ("requests", "records", "threads", "queue_size"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1")
+
+        rows = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for strategy in options["strategies"] or STRATEGIES:
+                rows.append(self._run(strategy, Path(tmp) / f"{strategy}.log", options))
+
+        self.stdout.write(
+            f"{options['requests']} requests x {options['records']} records on {options['threads']} threads, "
+            f"{options['write_latency'] * 1e6:.0f} us per write"
+        )
+        header = f"{'strategy':<10}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'written':>10}{'dropped':>9}{'drain':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in rows:
+            self.stdout.write(
+                f"{row['strategy']:<10}{row['rate']:>9.0f}{row['p50']:>8.2f}ms{row['p95']:>8.2f}ms{row['p99']:>8.2f}ms"
+                f"{row['written']:>10}{row['dropped']:>9}{row['drain']:>8.2f}s"
+            )
+        self.stdout.write(
+            "p50/p95/p99 = request latency seen by the caller; drain = time after the last "
+            "response until every queued record was written."
+        )
+
+    def _run(self, strategy, path, options):
+        """Serve the configured requests with one handler setup."""
+        stream = SlowFile(path, options["write_latency"])
+        if strategy == "queue":
+            handler = QueueLogHandler(stream=stream, maxsize=options["queue_size"])
+        else:
+            handler = logging.StreamHandler(stream)
+            handler.setFormatter(JSONFormatter())
+            handler.addFilter(RequestIDFilter())
+
+        bench_logger = logging.getLogger("core.bench_logging")
+        bench_logger.handlers = [handler]
+        bench_logger.propagate = False
+        bench_logger.setLevel(logging.INFO)
+
+        def view(request):
+            for i in range(options["records"]):
+                bench_logger.info("Handled step %d of %s", i, request.path, extra={"step": i})
+            return HttpResponse("ok")
+
+        middleware = RequestIDMiddleware(view)
+        factory = RequestFactory()
+        latencies = []
+        latencies_lock = threading.Lock()
+        per_thread = [options["requests"] // options["threads"]] * options["threads"]
+        per_thread[0] += options["requests"] - sum(per_thread)
+
+        def worker(count):
+            local = []
+            for i in range(count):
+                request = factory.get(f"/bench/{i}/")
+                started = time.perf_counter()
+                middleware(request)
+                local.append(time.perf_counter() - started)
+            with latencies_lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        drain_started = time.perf_counter()
+        handler.flush()
+        drain = time.perf_counter() - drain_started
+        dropped = getattr(handler, "dropped", 0)
+        handler.close()
+        stream.close()
+        bench_logger.handlers = []
+
+        with open(path, encoding="utf-8") as handle:
+            written = sum(1 for _ in handle)
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            "strategy": strategy,
+            "rate": len(latencies) / elapsed,
+            "p50": cuts[49] * 1000,
+            "p95": cuts[94] * 1000,
+            "p99": cuts[98] * 1000,
+            "written": written,
+            "dropped": dropped,
+            "drain": drain,
+        }
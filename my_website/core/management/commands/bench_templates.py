@@ -0,0 +1,66 @@
+"""
+Compare cold and warm template render times.
+
+"Cold" clears the cached loader before each render, so the template is
+read from disk and compiled again, which is what every request pays without
+caching. "Warm" renders from the populated cache, which is what requests
+pay after core.warmup has run.
+"""
+
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import get_template
+from django.test import RequestFactory
+
+from core.warmup import WARMUP_APPS, iter_template_names
+
+
+class Command(BaseCommand):
+    help = "Benchmark cold (parse + render) vs warm (cached) template rendering."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Renders per template and mode (default: 20)")
+        parser.add_argument("--app", action="append", dest="apps", help="Limit to these app labels (repeatable)")
+
+    def handle(self, *args, **options):
+        engine = engines["django"].engine
+        loaders = [loader for loader in engine.template_loaders if hasattr(loader, "reset")]
+        if not loaders:
+            self.stderr.write("No cached loader configured; cold and warm timings will match.")
+
+        request = RequestFactory().get("/", HTTP_HOST="localhost")
+        request.user = AnonymousUser()
+
+        header = f"{'template':<40}{'cold ms':>10}{'warm ms':>10}{'speedup':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        cold_total = warm_total = 0.0
+        for name in iter_template_names(options["apps"] or WARMUP_APPS):
+            try:
+                cold = self._time(name, request, options["repeat"], reset=loaders)
+                warm = self._time(name, request, options["repeat"])
+            except Exception as e:
+                self.stdout.write(f"{name:<40}  skipped ({e.__class__.__name__}: {e})")
+                continue
+            cold_total += cold
+            warm_total += warm
+            self.stdout.write(f"{name:<40}{cold:>10.3f}{warm:>10.3f}{cold / warm:>8.1f}x")
+
+        self.stdout.write("-" * len(header))
+        if warm_total:
+            self.stdout.write(f"{'total':<40}{cold_total:>10.3f}{warm_total:>10.3f}{cold_total / warm_total:>8.1f}x")
+
+    def _time(self, name, request, repeat, reset=()):
+        """Median milliseconds to fetch and render a template."""
+        samples = []
+        for _ in range(repeat):
+            for loader in reset:
+                loader.reset()
+            started = time.perf_counter()
+            get_template(name).render({}, request)
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
@@ -0,0 +1,45 @@
+"""
+Generate responsive variants for project screenshots.
+
+Only screenshots whose content hash changed since the last run are
+processed; variants already on disk are reused.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import ImagePipelineUnavailable, available_formats, process_project_screenshot
+from core.models import Project
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/AVIF/fallback variants for project screenshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Limit to these project slugs")
+        parser.add_argument("--force", action="store_true", help="Rebuild even if the screenshot is unchanged")
+
+    def handle(self, *args, **options):
+        try:
+            formats = available_formats()
+        except ImagePipelineUnavailable as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(f"Encoding {', '.join(formats + ('fallback',))}")
+
+        projects = Project.objects.exclude(screenshot="")
+        if options["slugs"]:
+            projects = projects.filter(slug__in=options["slugs"])
+
+        built = skipped = 0
+        for project in projects.iterator():
+            try:
+                changed = process_project_screenshot(project, force=options["force"])
+            except OSError as e:
+                self.stderr.write(f"{project.slug}: {e}")
+                continue
+            if changed:
+                built += 1
+                self.stdout.write(f"{project.slug}: {len(project.screenshot_variants)} variants")
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{built} screenshots processed, {skipped} already current"))
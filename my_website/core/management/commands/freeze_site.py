@@ -0,0 +1,46 @@
+"""
+Export the public core pages as static HTML.
+
+Run after collectstatic so pages reference fingerprinted asset names.
+Only pages whose templates, data or static manifest changed since the
+last run are rendered again; --force re-renders everything.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.freeze import SiteFreezer
+
+
+class Command(BaseCommand):
+    help = "Render public core pages and their static assets into a directory a front proxy can serve."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default=str(settings.BASE_DIR.parent / "frozen"),
+            help="Output directory (default: <repo>/frozen)",
+        )
+        parser.add_argument("--host", help="Host header for the renders (default: first ALLOWED_HOSTS entry)")
+        parser.add_argument("--force", action="store_true", help="Re-render every page")
+
+    def handle(self, *args, **options):
+        host = options["host"] or next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        verbose = options["verbosity"] > 1
+        freezer = SiteFreezer(
+            options["output"], host=host, force=options["force"],
+            log=self.stdout.write if verbose else None,
+        )
+        started = time.perf_counter()
+        try:
+            stats = freezer.build()
+        except ValueError as e:
+            raise CommandError(f"Freeze failed: {e}") from e
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['rendered']} rendered, {stats['unchanged']} unchanged, {stats['removed']} removed, "
+            f"{stats['assets_copied']} assets copied in {elapsed:.2f}s -> {options['output']}"
+        ))
+        if stats["missing_assets"]:
+            self.stderr.write(f"{stats['missing_assets']} referenced static files were not found")
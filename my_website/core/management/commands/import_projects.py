@@ -0,0 +1,129 @@
+"""
+Load the project catalog from a local snapshot of GitHub repositories.
+
+The snapshot is the JSON (or YAML) list returned by GitHub's
+"list repositories for a user" endpoint, optionally wrapped in an object
+with a "repositories" key. Projects are matched by slug and only saved
+when a field actually changed, so unchanged cards stay cached.
+"""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from core.models import Project, Tag
+
+
+class Command(BaseCommand):
+    help = "Import or refresh projects from a JSON/YAML snapshot of GitHub repositories."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file (.json, .yml or .yaml)")
+        parser.add_argument("--include-forks", action="store_true", help="Also import forked repositories")
+        parser.add_argument("--prune", action="store_true", help="Unpublish projects missing from the snapshot")
+
+    def handle(self, *args, **options):
+        repositories = self._load(Path(options["path"]))
+        if not options["include_forks"]:
+            repositories = [repo for repo in repositories if not repo.get("fork")]
+
+        entries = {}
+        for repo in repositories:
+            entry = self._entry(repo)
+            entries[entry["fields"]["slug"]] = entry
+
+        counts = {"created": 0, "updated": 0, "unchanged": 0, "unpublished": 0}
+        with transaction.atomic():
+            tags = self._ensure_tags({slug for entry in entries.values() for slug in entry["tags"]})
+            existing = {project.slug: project for project in Project.objects.prefetch_related("tags")}
+
+            for slug, entry in entries.items():
+                project = existing.get(slug)
+                wanted_tags = [tags[tag] for tag in entry["tags"]]
+                if project is None:
+                    project = Project.objects.create(**entry["fields"])
+                    project.tags.set(wanted_tags)
+                    counts["created"] += 1
+                    continue
+
+                changed = [name for name, value in entry["fields"].items() if getattr(project, name) != value]
+                for name in changed:
+                    setattr(project, name, entry["fields"][name])
+                if changed:
+                    project.save(update_fields=changed + ["updated_at"])
+                if {tag.slug for tag in project.tags.all()} != set(entry["tags"]):
+                    project.tags.set(wanted_tags)
+                    changed.append("tags")
+                counts["updated" if changed else "unchanged"] += 1
+
+            if options["prune"]:
+                counts["unpublished"] = (
+                    Project.objects.filter(is_published=True).exclude(slug__in=entries).update(is_published=False)
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['created']} created, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['unpublished']} unpublished"
+        ))
+
+    def _load(self, path):
+        """Read the snapshot into a list of repository dicts."""
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}") from e
+
+        if path.suffix in (".yml", ".yaml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise CommandError("PyYAML is required for YAML snapshots (pip install pyyaml)") from e
+            data = yaml.safe_load(text)
+        else:
+            data = json.loads(text)
+
+        if isinstance(data, dict):
+            data = data.get("repositories")
+        if not isinstance(data, list):
+            raise CommandError("Snapshot must be a list of repositories or an object with a 'repositories' list")
+        return data
+
+    def _entry(self, repo):
+        """Map one GitHub repository object onto Project fields and tag slugs."""
+        try:
+            name = repo["name"]
+            pushed_at = parse_datetime(repo["pushed_at"])
+            repo_url = repo["html_url"]
+        except (KeyError, TypeError) as e:
+            raise CommandError(f"Repository entry is missing {e}: {repo!r}") from e
+        if pushed_at is None:
+            raise CommandError(f"Invalid pushed_at for {name}")
+
+        return {
+            "fields": {
+                "name": name[:100],
+                "slug": slugify(name)[:100],
+                "description": repo.get("description") or "",
+                "repo_url": repo_url,
+                "homepage": repo.get("homepage") or "",
+                "language": repo.get("language") or "",
+                "stars": repo.get("stargazers_count") or 0,
+                "pushed_at": pushed_at,
+                "is_published": True,
+            },
+            "tags": sorted({slugify(topic)[:50] for topic in repo.get("topics") or [] if slugify(topic)}),
+        }
+
+    def _ensure_tags(self, slugs):
+        """Return {slug: Tag}, creating any missing tags in one insert."""
+        tags = {tag.slug: tag for tag in Tag.objects.filter(slug__in=slugs)}
+        missing = [Tag(slug=slug, name=slug.replace("-", " ")) for slug in slugs if slug not in tags]
+        for tag in Tag.objects.bulk_create(missing):
+            tags[tag.slug] = tag
+        if missing and any(tag.pk is None for tag in missing):
+            tags.update({tag.slug: tag for tag in Tag.objects.filter(slug__in=[t.slug for t in missing])})
+        return tags
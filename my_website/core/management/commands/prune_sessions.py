@@ -0,0 +1,59 @@
+"""
+Delete expired sessions in small batches (a lock-friendly clearsessions).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.maintenance import ensure_expire_date_index, prune_expired_sessions, uses_session_table
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions in keyset-paginated batches, pausing between them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Sessions deleted per transaction (default: 500)")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches (default: 0.05)")
+        parser.add_argument("--budget", type=float, help="Stop starting new batches after this many seconds")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options["pause"] < 0:
+            raise CommandError("--pause cannot be negative")
+        if options["budget"] is not None and options["budget"] <= 0:
+            raise CommandError("--budget must be positive")
+
+        if not uses_session_table():
+            prune_expired_sessions()
+            self.stdout.write(self.style.SUCCESS("Cleared expired sessions with the session engine's clear_expired()"))
+            return
+
+        if ensure_expire_date_index():
+            self.stdout.write("Created the missing index on django_session.expire_date")
+
+        started = time.monotonic()
+        deadline = None if options["budget"] is None else started + options["budget"]
+
+        def progress(totals):
+            if options["verbosity"] >= 1:
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"Deleted {totals['deleted']} expired sessions in {totals['batches']} batches "
+                    f"({totals['deleted'] / max(elapsed, 1e-9):.0f}/s)"
+                )
+
+        totals = prune_expired_sessions(
+            timezone.now(),
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            progress=progress,
+            should_stop=(lambda: time.monotonic() >= deadline) if deadline else None,
+        )
+        elapsed = time.monotonic() - started
+        stopped = " (stopped at the time budget)" if deadline and time.monotonic() >= deadline else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {totals['deleted']} expired sessions in {totals['batches']} batches, {elapsed:.1f}s{stopped}"
+        ))
@@ -0,0 +1,63 @@
+"""
+Run the periodic job scheduler in the foreground.
+
+Use this instead of SCHEDULER["autostart"] to keep housekeeping out of
+web processes. It uses the same lock files, so it can run next to
+autostarted workers without jobs running twice.
+"""
+
+import json
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.scheduler import Scheduler, get_jobs
+
+
+class Command(BaseCommand):
+    help = "Run registered periodic jobs (see core.scheduler)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--list", action="store_true", help="List registered jobs and exit")
+        parser.add_argument("--once", action="store_true", help="Run every job that is due host-wide, then exit")
+        parser.add_argument("--job", action="append", dest="jobs", help="Run this job now, even if not due (repeatable)")
+
+    def handle(self, *args, **options):
+        jobs = get_jobs()
+        if options["list"]:
+            for name, registered in jobs.items():
+                budget = f"{registered.budget:g}s" if registered.budget is not None else "none"
+                scope = "host-wide" if registered.lock else "per process"
+                self.stdout.write(f"{name:<22} every {registered.interval:>6g}s  budget {budget:<5} {scope}")
+            return
+
+        if options["jobs"]:
+            unknown = set(options["jobs"]) - set(jobs)
+            if unknown:
+                raise CommandError(f"Unknown job(s): {', '.join(sorted(unknown))}")
+            scheduler = Scheduler(jobs={name: jobs[name] for name in options["jobs"]})
+            for name in options["jobs"]:
+                ran = scheduler.run_job(jobs[name], force=True)
+                self._report(name, jobs[name], ran)
+            return
+
+        scheduler = Scheduler(jobs=jobs)
+        if options["once"]:
+            for name in scheduler.run_pending():
+                self._report(name, jobs[name], True)
+            return
+
+        signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+        self.stdout.write(f"Scheduler running {len(jobs)} jobs; Ctrl+C to stop")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
+
+    def _report(self, name, registered, ran):
+        if not ran:
+            self.stdout.write(f"{name}: skipped (another worker holds its lock)")
+            return
+        stats = registered.stats
+        outcome = f"failed: {stats['last_error']}" if stats["last_error"] else json.dumps(stats["last_result"])
+        self.stdout.write(f"{name}: {stats['last_duration_ms']} ms, {outcome}")
@@ -0,0 +1,125 @@
+"""
+Profile a cold start of the WSGI application.
+
+Each run starts a fresh interpreter with `-X importtime`, imports the
+WSGI application (settings, app registry, URLconf and warm-up) and serves
+one request through it. The report shows time to first response, each
+warm-up step, and the slowest imports overall and from project apps.
+The command fails when a first response is not 2xx/3xx or a warm-up
+step failed. --budget-ms turns it into a regression check that also fails
+when the median time to first response is over budget.
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in the child interpreter; prints one JSON line with its timings
+CHILD_SCRIPT = r"""
+import io, json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings_module!r})
+from my_website.wsgi import application
+loaded = time.perf_counter()
+status = []
+environ = {{
+    "REQUEST_METHOD": "GET", "PATH_INFO": {path!r}, "QUERY_STRING": "", "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80", "HTTP_HOST": "localhost", "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+    "wsgi.url_scheme": "http", "wsgi.version": (1, 0), "wsgi.multithread": False,
+    "wsgi.multiprocess": True, "wsgi.run_once": False,
+}}
+body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+done = time.perf_counter()
+from core.warmup import readiness
+print(json.dumps({{"load_ms": (loaded - started) * 1000, "first_response_ms": (done - loaded) * 1000,
+                  "status": status[0], "bytes": len(body), "warmup": readiness()[1]}}))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| *(\S+)")
+PROJECT_APPS = ("accounts", "core", "main", "my_website")
+
+
+class Command(BaseCommand):
+    help = "Measure cold-start import time and time to first response."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/core/", help="Path for the first request (default: /core/)")
+        parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to start (default: 3)")
+        parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (default: 10)")
+        parser.add_argument("--budget-ms", type=float, help="Fail if median time to first response exceeds this")
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1:
+            raise CommandError("--runs must be at least 1")
+        script = CHILD_SCRIPT.format(settings_module=os.environ.get("DJANGO_SETTINGS_MODULE", "my_website.settings"),
+                                     path=options["path"])
+        results, imports = [], []
+        for _ in range(options["runs"]):
+            result, imports = self._run(script)
+            results.append(result)
+
+        total = statistics.median(r["total_ms"] for r in results)
+        self.stdout.write(f"First response: {results[-1]['status']} ({results[-1]['bytes']} bytes) for {options['path']}")
+        self.stdout.write(f"  imports + warm-up:               {statistics.median(r['load_ms'] for r in results):8.1f} ms")
+        for step, check in results[-1]["warmup"].items():
+            self.stdout.write(f"    warm-up {step:<24} {check['ms']:8.1f} ms{'' if check['ok'] else ' (failed)'}")
+        self.stdout.write(f"  first request:                   {statistics.median(r['first_response_ms'] for r in results):8.1f} ms")
+        self.stdout.write(f"  process start to first response: {total:8.1f} ms (median of {len(results)})")
+
+        self._table("Slowest imports (self time)", sorted(
+            imports, key=lambda i: i["self"], reverse=True,
+        )[:options["top"]])
+        self._table("Project modules (including their imports)", sorted(
+            (i for i in imports if i["module"].split(".")[0] in PROJECT_APPS and i["module"] != "my_website.wsgi"),
+            key=lambda i: i["cumulative"], reverse=True,
+        )[:options["top"]])
+
+        # A fast start that serves an error page or skipped warm-up is not a pass
+        for result in results:
+            if result["status"][:1] not in ("2", "3"):
+                raise CommandError(f"First response was {result['status']} for {options['path']}")
+            failed = [step for step, check in result["warmup"].items() if not check["ok"]]
+            if failed:
+                raise CommandError(f"Warm-up failed: {', '.join(failed)}")
+
+        budget = options["budget_ms"]
+        if budget is not None:
+            if total > budget:
+                raise CommandError(f"Startup took {total:.1f} ms, over the {budget:.0f} ms budget")
+            self.stdout.write(self.style.SUCCESS(f"Within the {budget:.0f} ms budget"))
+
+    def _run(self, script):
+        """Start one child interpreter and parse its timings and import log."""
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        total_ms = (time.perf_counter() - started) * 1000
+        if proc.returncode != 0:
+            raise CommandError(f"Startup failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["total_ms"] = total_ms
+
+        imports = []
+        for line in proc.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                imports.append({
+                    "self": int(match.group(1)) / 1000,
+                    "cumulative": int(match.group(2)) / 1000,
+                    "module": match.group(3),
+                })
+        return result, imports
+
+    def _table(self, title, rows):
+        self.stdout.write(f"\n{title}")
+        for row in rows:
+            self.stdout.write(f"  {row['cumulative']:8.1f} ms cumulative {row['self']:8.1f} ms self  {row['module']}")
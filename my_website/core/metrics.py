@@ -0,0 +1,47 @@
+"""
+In-process metrics registry.
+
+Subsystems register a provider, a zero-argument callable returning a
+JSON-serializable dict, under a name. The staff-only metrics view calls
+every provider and reports the results. Values are per process.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def register(name, provider):
+    """
+    Register (or replace) a metrics provider.
+
+    Args:
+        name: Section name in the metrics output
+        provider: Callable returning a JSON-serializable dict
+    """
+    with _providers_lock:
+        _providers[name] = provider
+
+
+def collect():
+    """
+    Snapshot every registered provider.
+
+    Returns:
+        Dictionary of {name: snapshot}; a failing provider reports its error
+        instead of breaking the whole response
+    """
+    with _providers_lock:
+        providers = dict(_providers)
+    snapshot = {}
+    for name, provider in sorted(providers.items()):
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            logger.exception("Metrics provider %s failed", name)
+            snapshot[name] = {"error": e.__class__.__name__}
+    return snapshot
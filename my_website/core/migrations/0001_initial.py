@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Display name', max_length=50)),
+                ('slug', models.SlugField(help_text='URL identifier used for filtering', unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Project name', max_length=100)),
+                ('slug', models.SlugField(help_text='Stable identifier (repository name)', max_length=100, unique=True)),
+                ('description', models.TextField(blank=True, help_text='Short description')),
+                ('repo_url', models.URLField(help_text='Source repository URL')),
+                ('homepage', models.URLField(blank=True, help_text='Live demo or documentation URL')),
+                ('language', models.CharField(blank=True, help_text='Primary language', max_length=50)),
+                ('stars', models.PositiveIntegerField(default=0, help_text='Stargazer count at last import')),
+                ('pushed_at', models.DateTimeField(help_text='Last activity in the repository')),
+                ('is_published', models.BooleanField(default=True, help_text='Whether the project is listed publicly')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Last change; versions the cached card')),
+                ('tags', models.ManyToManyField(blank=True, help_text='Topics', related_name='projects', to='core.tag')),
+            ],
+            options={
+                'ordering': ['-pushed_at', '-id'],
+                'indexes': [models.Index(fields=['is_published', '-pushed_at', '-id'], name='project_listing_idx')],
+            },
+        ),
+    ]
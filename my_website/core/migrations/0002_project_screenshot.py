@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='screenshot',
+            field=models.FileField(blank=True, help_text='Original screenshot upload', upload_to='projects/screenshots/'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='screenshot_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the processed original', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='screenshot_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Intrinsic height in pixels', null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='screenshot_variants',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Generated resized/re-encoded copies'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='screenshot_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Intrinsic width in pixels', null=True),
+        ),
+    ]
@@ -1,3 +1,53 @@
+"""
+Models for the core app.
+
+This module defines the project catalog shown on the public projects page.
+"""
+
 from django.db import models
 
-# Create your models here.
+
+class Tag(models.Model):
+    """A topic used to group and filter projects."""
+    name = models.CharField(max_length=50, help_text="Display name")
+    slug = models.SlugField(max_length=50, unique=True, help_text="URL identifier used for filtering")
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class Project(models.Model):
+    """
+    A portfolio project, usually mirrored from a GitHub repository.
+
+    Listings are ordered newest-activity first by (pushed_at, id), which is
+    also the keyset used for pagination.
+    """
+    name = models.CharField(max_length=100, help_text="Project name")
+    slug = models.SlugField(max_length=100, unique=True, help_text="Stable identifier (repository name)")
+    description = models.TextField(blank=True, help_text="Short description")
+    repo_url = models.URLField(help_text="Source repository URL")
+    homepage = models.URLField(blank=True, help_text="Live demo or documentation URL")
+    language = models.CharField(max_length=50, blank=True, help_text="Primary language")
+    stars = models.PositiveIntegerField(default=0, help_text="Stargazer count at last import")
+    pushed_at = models.DateTimeField(help_text="Last activity in the repository")
+    tags = models.ManyToManyField(Tag, blank=True, related_name="projects", help_text="Topics")
+    is_published = models.BooleanField(default=True, help_text="Whether the project is listed publicly")
+    screenshot = models.FileField(upload_to="projects/screenshots/", blank=True, help_text="Original screenshot upload")
+    screenshot_width = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Intrinsic width in pixels")
+    screenshot_height = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Intrinsic height in pixels")
+    screenshot_hash = models.CharField(max_length=64, blank=True, editable=False, help_text="SHA-256 of the processed original")
+    screenshot_variants = models.JSONField(default=list, blank=True, editable=False, help_text="Generated resized/re-encoded copies")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Last change; versions the cached card")
+
+    class Meta:
+        ordering = ["-pushed_at", "-id"]
+        indexes = [
+            models.Index(fields=["is_published", "-pushed_at", "-id"], name="project_listing_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
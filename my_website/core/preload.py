@@ -0,0 +1,138 @@
+"""
+Preload hints for critical assets.
+
+Templates declare the assets a page needs before it can paint with the
+`{% preload %}` tag. PreloadMiddleware turns those declarations into
+`Link: rel=preload` response headers and remembers them per route, so the
+ASGI EarlyHintsMiddleware can send them as a `103 Early Hints` response on
+later requests, before the view has even started rendering.
+"""
+
+import threading
+
+from django.conf import settings
+from django.templatetags.static import static
+from django.urls import Resolver404, resolve
+
+_learned = {}
+_learned_lock = threading.Lock()
+
+
+def format_link(url, as_, mime_type=None, crossorigin=False):
+    """
+    Format one preload entry for a Link header.
+
+    Args:
+        url: Asset URL
+        as_: Request destination ("style", "script", "image", "font", ...)
+        mime_type: Optional MIME type hint
+        crossorigin: Whether to add the crossorigin attribute (fonts)
+
+    Returns:
+        Link header value
+    """
+    link = f"<{url}>; rel=preload; as={as_}"
+    if mime_type:
+        link += f'; type="{mime_type}"'
+    if crossorigin:
+        link += "; crossorigin"
+    return link
+
+
+def add_preload(request, path, as_, mime_type=None, crossorigin=False):
+    """
+    Declare a critical asset for the current response.
+
+    Args:
+        request: Django request object (ignored if None)
+        path: Static path (resolved through the static storage, so hashed in
+            production) or an absolute URL
+        as_: Request destination
+        mime_type: Optional MIME type hint
+        crossorigin: Whether to add the crossorigin attribute
+    """
+    if request is None:
+        return
+    url = path if path.startswith(("http://", "https://", "/")) else static(path)
+    links = request.__dict__.setdefault("_preload_links", [])
+    link = format_link(url, as_, mime_type, crossorigin)
+    if link not in links:
+        links.append(link)
+
+
+def remember_links(view_name, links):
+    """Record the preload set last served for a route."""
+    with _learned_lock:
+        _learned[view_name] = tuple(links)
+
+
+def links_for_path(path):
+    """
+    Return the preload links last served for the route matching a path.
+
+    Args:
+        path: Request path (without SCRIPT_NAME)
+
+    Returns:
+        Tuple of Link header values (empty if unknown)
+    """
+    try:
+        view_name = resolve(path).view_name
+    except Resolver404:
+        return ()
+    return _learned.get(view_name, ())
+
+
+class PreloadMiddleware:
+    """Emit declared preloads as a Link header and learn them per route."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        links = getattr(request, "_preload_links", None)
+        if (
+            not links
+            or response.status_code != 200
+            or response.streaming
+            or not response.get("Content-Type", "").startswith("text/html")
+        ):
+            return response
+
+        existing = response.get("Link")
+        response["Link"] = ", ".join(([existing] if existing else []) + links)
+        match = getattr(request, "resolver_match", None)
+        if match is not None and match.view_name:
+            remember_links(match.view_name, links)
+        return response
+
+
+class EarlyHintsMiddleware:
+    """
+    ASGI wrapper that sends 103 Early Hints for routes with known preloads.
+
+    Only active when PRELOAD_EARLY_HINTS is enabled and the server
+    advertises the `http.response.early_hint` ASGI extension.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and "http.response.early_hint" in scope.get("extensions", {})
+            and getattr(settings, "PRELOAD_EARLY_HINTS", False)
+        ):
+            path = scope["path"]
+            root_path = scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            links = links_for_path(path)
+            if links:
+                await send({
+                    "type": "http.response.early_hint",
+                    "links": [link.encode("latin-1") for link in links],
+                })
+        await self.app(scope, receive, send)
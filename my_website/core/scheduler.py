@@ -0,0 +1,338 @@
+"""
+In-process periodic job scheduler.
+
+Apps register housekeeping jobs in a `jobs` module with the @job
+decorator. A daemon thread started on the first request (when
+SCHEDULER["autostart"] is on), or the run_scheduler management command,
+runs each job roughly every `interval` seconds. Each run's next due time
+is jittered so workers started together drift apart.
+
+Jobs that touch shared state are single-runner across processes. Before
+running, a worker takes a non-blocking exclusive lock on
+<lock_dir>/<job>.lock and reads the last run time stored in that file. If
+another worker holds the lock, or ran the job less than `interval` seconds
+ago, the run is skipped. A pool of N workers therefore runs each job about
+once per interval, not N times. Jobs with lock=False (per-process work
+such as flushing an in-memory buffer) run in every process.
+
+Every run gets a Budget. Jobs should check it between batches and stop
+early once it is exhausted. Runs that overrun are counted. Per-job
+counters are reported through core.metrics.
+
+Configured with the SCHEDULER setting:
+
+    SCHEDULER = {
+        "autostart": False,        # start the thread on the first request
+        "lock_dir": "...",         # shared by every worker on the host
+        "startup_delay": 60,       # first runs spread over this many seconds
+        "jobs": {"clear_sessions": {"interval": 3600, "enabled": True}},
+    }
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules
+
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {"autostart": False, "lock_dir": None, "startup_delay": 60, "jobs": {}}
+
+_registry = {}
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+@dataclass
+class Job:
+    """A registered periodic job."""
+
+    name: str
+    func: Callable
+    interval: float
+    jitter: float = 0.1
+    budget: Optional[float] = None
+    lock: bool = True
+    stats: dict = field(default_factory=lambda: {
+        "runs": 0, "failures": 0, "skipped_locked": 0, "skipped_recent": 0, "over_budget": 0,
+        "last_started": None, "last_duration_ms": None, "last_result": None, "last_error": None,
+    })
+
+
+class Budget:
+    """Time allowance for one job run."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        """Seconds left (None when unlimited)."""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def exhausted(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
+def job(interval, name=None, jitter=0.1, budget=None, lock=True):
+    """
+    Register a function as a periodic job.
+
+    The function is called with a Budget and may return a JSON-serializable
+    summary, which is kept as the job's last_result.
+
+    Args:
+        interval: Seconds between runs
+        name: Job name (defaults to the function name)
+        jitter: Fraction of the interval by which each next run is randomized
+        budget: Seconds a run may take (None for unlimited)
+        lock: Run in one process at a time, at most once per interval host-wide
+
+    Returns:
+        Decorator returning the function unchanged
+    """
+    def decorator(func):
+        job_name = name or func.__name__
+        _registry[job_name] = Job(job_name, func, interval, jitter, budget, lock)
+        return func
+    return decorator
+
+
+def get_config():
+    """
+    Return the effective SCHEDULER configuration.
+
+    Returns:
+        Dictionary with autostart, lock_dir, startup_delay and jobs
+    """
+    config = {**DEFAULT_CONFIG, **getattr(settings, "SCHEDULER", {})}
+    if config["lock_dir"] is None:
+        config["lock_dir"] = str(settings.BASE_DIR.parent / ".scheduler")
+    return config
+
+
+def get_jobs():
+    """
+    Discover `jobs` modules and return the enabled jobs with settings overrides applied.
+
+    Returns:
+        Dictionary of {name: Job}
+    """
+    autodiscover_modules("jobs")
+    overrides = get_config()["jobs"]
+    jobs = {}
+    for name, registered in _registry.items():
+        override = overrides.get(name, {})
+        if not override.get("enabled", True):
+            continue
+        for attr in ("interval", "jitter", "budget"):
+            if attr in override:
+                setattr(registered, attr, override[attr])
+        jobs[name] = registered
+    return jobs
+
+
+def _try_lock(handle):
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            # msvcrt locks bytes from the current position, which "a+" puts at
+            # EOF; every process (and _unlock) must agree on byte 0
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class Scheduler:
+    """Runs due jobs, locally or on a background thread."""
+
+    def __init__(self, jobs=None, lock_dir=None, startup_delay=0):
+        config = get_config()
+        self.jobs = get_jobs() if jobs is None else jobs
+        self.lock_dir = Path(lock_dir or config["lock_dir"])
+        now = time.monotonic()
+        self.next_due = {name: now + random.uniform(0, startup_delay) for name in self.jobs}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _schedule_next(self, registered):
+        spread = registered.interval * registered.jitter
+        self.next_due[registered.name] = time.monotonic() + registered.interval + random.uniform(-spread, spread)
+
+    def run_job(self, registered, force=False):
+        """
+        Run one job now if no other worker holds it and it is due host-wide.
+
+        Args:
+            registered: Job to run
+            force: Ignore the last run time recorded by other workers
+
+        Returns:
+            True if the job ran
+        """
+        if not registered.lock:
+            self._execute(registered)
+            return True
+
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_dir / f"{registered.name}.lock", "a+", encoding="utf-8") as handle:
+            if not _try_lock(handle):
+                registered.stats["skipped_locked"] += 1
+                return False
+            try:
+                handle.seek(0)
+                try:
+                    last_run = json.loads(handle.read() or "{}").get("last_run", 0)
+                except ValueError:
+                    last_run = 0
+                if not force and time.time() - last_run < registered.interval * (1 - registered.jitter):
+                    registered.stats["skipped_recent"] += 1
+                    return False
+                self._execute(registered)
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps({"last_run": time.time(), "pid": os.getpid()}))
+                handle.flush()
+            finally:
+                _unlock(handle)
+        return True
+
+    def _execute(self, registered):
+        stats = registered.stats
+        budget = Budget(registered.budget)
+        started = time.monotonic()
+        stats["last_started"] = time.time()
+        close_old_connections()
+        try:
+            stats["last_result"] = registered.func(budget)
+            stats["last_error"] = None
+        except Exception as e:
+            stats["failures"] += 1
+            stats["last_error"] = repr(e)
+            logger.exception("Scheduled job %s failed", registered.name)
+        finally:
+            close_old_connections()
+            stats["runs"] += 1
+            elapsed = time.monotonic() - started
+            stats["last_duration_ms"] = round(elapsed * 1000, 1)
+            if registered.budget is not None and elapsed > registered.budget:
+                stats["over_budget"] += 1
+                logger.warning("Scheduled job %s took %.1fs, over its %.1fs budget",
+                               registered.name, elapsed, registered.budget)
+
+    def run_pending(self):
+        """
+        Run every job that is due in this process.
+
+        Returns:
+            Names of the jobs that ran
+        """
+        ran = []
+        now = time.monotonic()
+        for name, registered in self.jobs.items():
+            if self.next_due[name] <= now:
+                if self.run_job(registered):
+                    ran.append(name)
+                self._schedule_next(registered)
+        return ran
+
+    def run_forever(self):
+        """Run due jobs until stop() is called."""
+        while not self._stop.is_set():
+            self.run_pending()
+            wait = min(self.next_due.values(), default=time.monotonic() + 60) - time.monotonic()
+            self._stop.wait(max(1.0, wait))
+
+    def start(self):
+        """Start run_forever on a daemon thread."""
+        self._thread = threading.Thread(target=self.run_forever, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the loop and wait for the thread (a running job finishes first)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def snapshot(self):
+        """Per-job configuration and counters for the metrics view."""
+        now = time.monotonic()
+        return {
+            name: {
+                "interval": registered.interval,
+                "budget": registered.budget,
+                "locked": registered.lock,
+                "due_in": round(self.next_due[name] - now, 1),
+                **registered.stats,
+            }
+            for name, registered in self.jobs.items()
+        }
+
+
+def get_scheduler():
+    """Return this process's scheduler, if one was started."""
+    return _scheduler
+
+
+def start(startup_delay=None):
+    """
+    Start this process's background scheduler once.
+
+    Args:
+        startup_delay: Seconds over which first runs are spread (default from settings)
+
+    Returns:
+        Scheduler instance
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            delay = get_config()["startup_delay"] if startup_delay is None else startup_delay
+            _scheduler = Scheduler(startup_delay=delay)
+            _scheduler.start()
+            metrics.register("scheduler", _scheduler.snapshot)
+            logger.info("Scheduler started with jobs: %s", ", ".join(_scheduler.jobs) or "none")
+    return _scheduler
+
+
+def _start_on_first_request(**kwargs):
+    # Starting here rather than in ready() keeps the thread out of management
+    # commands and starts it after a prefork server has forked its workers
+    request_started.disconnect(_start_on_first_request, dispatch_uid="core.scheduler.autostart")
+    start()
+
+
+def install_autostart():
+    """Start the scheduler on the first request if SCHEDULER["autostart"] is on."""
+    if get_config()["autostart"]:
+        request_started.connect(_start_on_first_request, dispatch_uid="core.scheduler.autostart")
@@ -0,0 +1,121 @@
+"""
+Cacheable public shells of pages with forms.
+
+A page's CSRF token and per-visitor parts (member nav, flash messages)
+make its HTML differ per visitor. Touching them also makes Django add
+`Vary: Cookie` and a Set-Cookie header, which shared caches refuse to
+store. Views decorated with @public_shell render a shell instead when the
+visitor has no session or messages cookie, i.e. when nothing on the page
+could be personal. In the shell the {% dynamic_fragment %} slots and
+{% csrf_input %} fields are empty placeholders, the same ones a freeze
+render (see core.freeze) leaves. The response is marked public, so every
+such visitor can be served the same cached copy.
+
+static/js/fragments.js completes the page. It fills CSRF fields from the
+CSRF cookie when one is readable, fills the fragments and fields from
+/core/fragments/, and when a form is submitted before it has a token,
+fetches one from /core/csrf/ first. CsrfViewMiddleware is unchanged: a
+POST still needs the cookie and a matching token, and passes the same
+Origin and Referer checks.
+
+Configured with the PUBLIC_SHELL setting:
+
+    PUBLIC_SHELL = {
+        "enabled": True,
+        "max_age": 300,   # seconds browsers and proxies may reuse a shell
+    }
+"""
+
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.utils.cache import patch_cache_control
+
+from .freeze import is_frozen_render
+
+logger = logging.getLogger(__name__)
+
+# Set in request.META for shell renders; HTTP clients cannot send it
+SHELL_ENVIRON_KEY = "core.shell"
+
+DEFAULT_CONFIG = {"enabled": True, "max_age": 300}
+
+
+def get_config():
+    """
+    Return the effective PUBLIC_SHELL configuration.
+
+    Returns:
+        Dictionary with enabled and max_age
+    """
+    return {**DEFAULT_CONFIG, **getattr(settings, "PUBLIC_SHELL", {})}
+
+
+def is_shell_render(request):
+    """
+    Tell whether per-visitor output should be left as placeholders.
+
+    Args:
+        request: Django request object (or None)
+
+    Returns:
+        True for public shell and freeze renders
+    """
+    return request is not None and (bool(request.META.get(SHELL_ENVIRON_KEY)) or is_frozen_render(request))
+
+
+def wants_shell(request):
+    """
+    Tell whether a request can be answered with the public shell.
+
+    Args:
+        request: Django request object
+
+    Returns:
+        True for GET/HEAD requests without a session or messages cookie
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def public_shell(view):
+    """
+    Serve a view's page as a cacheable, token-free shell to cookie-less visitors.
+
+    Visitors with a session are rendered the full page as before.
+
+    Args:
+        view: Function-based view rendering a public page
+
+    Returns:
+        Wrapped view
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        config = get_config()
+        if not config["enabled"] or not wants_shell(request):
+            return view(request, *args, **kwargs)
+
+        request.META[SHELL_ENVIRON_KEY] = True
+        # Without a session cookie the visitor is anonymous; resolving that
+        # through the lazy request.user would still mark the session accessed
+        request.user = AnonymousUser()
+        response = view(request, *args, **kwargs)
+
+        session = getattr(request, "session", None)
+        if (session is not None and session.accessed) or request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            # Something on the page read per-visitor state; the middleware will
+            # add Vary: Cookie and possibly Set-Cookie, so it must not be shared
+            logger.warning("Public shell of %s touched the session or CSRF token; not caching it", request.path)
+            patch_cache_control(response, private=True)
+        elif response.status_code == 200:
+            patch_cache_control(response, public=True, max_age=config["max_age"])
+        return response
+
+    return wrapped
@@ -0,0 +1,41 @@
+"""
+Signal handlers for the core app.
+"""
+
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Project, Tag
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+def touch_project_on_tag_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Bump updated_at when a project's tags change so its cached card is re-rendered.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    now = timezone.now()
+    if not reverse:
+        Project.objects.filter(pk=instance.pk).update(updated_at=now)
+        instance.updated_at = now
+    elif action == "pre_clear":
+        # Tag side, before the rows disappear
+        instance.projects.update(updated_at=now)
+    else:
+        Project.objects.filter(pk__in=pk_set).update(updated_at=now)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_projects_on_tag_edit(sender, instance, created=False, **kwargs):
+    """
+    Bump updated_at on a tag's projects when it is renamed or deleted.
+
+    Cached cards print the tag's name and filter link; deleting a tag
+    removes its m2m rows without sending m2m_changed.
+    """
+    if created:
+        return
+    instance.projects.update(updated_at=timezone.now())
@@ -0,0 +1,50 @@
+"""
+Template tags for the page background media.
+"""
+
+import logging
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+
+from core.preload import add_preload
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+
+def _static_url(path):
+    """Resolve a static path, tolerating assets missing from the manifest."""
+    if path.startswith(("http://", "https://", "/")):
+        return path
+    try:
+        return static(path)
+    except ValueError:
+        logger.warning("Background media %s is missing from the static manifest", path)
+        return None
+
+
+@register.inclusion_tag("core/_background_video.html", takes_context=True)
+def background_video(context):
+    """
+    Render the background layer: a poster immediately, the video later.
+
+    The video has no src in the markup; a small script attaches it after
+    the window load event unless the client prefers reduced motion or has
+    Save-Data enabled. The decision is made client-side so the page itself
+    does not vary by request header. BACKGROUND_VIDEO_ENABLED=False ships
+    the poster only. The poster is declared as a preload.
+    """
+    config = getattr(settings, "BACKGROUND_VIDEO", {})
+    poster = _static_url(config["poster"]) if config.get("poster") else None
+    if poster:
+        add_preload(context.get("request"), poster, "image")
+    src = None
+    if getattr(settings, "BACKGROUND_VIDEO_ENABLED", True) and config.get("src"):
+        src = _static_url(config["src"])
+    return {
+        "poster": poster,
+        "src": src,
+        "type": config.get("type", "video/mp4"),
+    }
@@ -0,0 +1,66 @@
+"""
+Template tags for per-visitor parts of otherwise static pages.
+
+On a normal render these output the real content. On a freeze render
+(see core.freeze) or a public shell render (see core.shell) they leave
+placeholders that static/js/fragments.js fills in once the page has loaded.
+"""
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.html import format_html
+
+from core.freeze import FRAGMENTS
+from core.shell import is_shell_render
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def dynamic_fragment(context, name):
+    """
+    Render core/fragments/<name>.html in a slot that can be filled client-side.
+
+    Usage:
+        {% dynamic_fragment "nav" %}
+    """
+    if name not in FRAGMENTS:
+        raise template.TemplateSyntaxError(f"Unknown dynamic fragment {name!r}")
+    if is_shell_render(context.get("request")):
+        return format_html('<div data-fragment="{}"></div>', name)
+    fragment = context.template.engine.get_template(f"core/fragments/{name}.html")
+    with context.push():
+        return format_html('<div data-fragment="{}">{}</div>', name, fragment.render(context))
+
+
+@register.simple_tag(takes_context=True)
+def csrf_input(context):
+    """
+    Hidden CSRF field, left empty on shell and freeze renders and filled in by fragments.js.
+
+    Usage:
+        <form method="post">{% csrf_input %}...</form>
+    """
+    if is_shell_render(context.get("request")):
+        return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="" data-csrf>')
+    # Same as {% csrf_token %}: the token comes from the csrf context processor
+    token = context.get("csrf_token")
+    if not token or token == "NOTPROVIDED":
+        return ""
+    return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', token)
+
+
+@register.simple_tag(takes_context=True)
+def fragment_loader(context):
+    """Script that fills fragment slots and CSRF fields (shell and freeze renders only)."""
+    if not is_shell_render(context.get("request")):
+        return ""
+    # The CSRF cookie can seed the fields without a request when scripts may read it
+    readable = not (settings.CSRF_USE_SESSIONS or settings.CSRF_COOKIE_HTTPONLY)
+    return format_html(
+        '<script src="{}" data-endpoint="{}" data-csrf-endpoint="{}" data-csrf-cookie="{}" defer></script>',
+        static("js/fragments.js"), reverse("core:fragments"), reverse("core:csrf"),
+        settings.CSRF_COOKIE_NAME if readable else "",
+    )
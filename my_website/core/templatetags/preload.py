@@ -0,0 +1,24 @@
+"""
+Template tags for declaring critical assets.
+"""
+
+from django import template
+
+from core.preload import add_preload
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def preload(context, path, as_="style", type=None, crossorigin=False):
+    """
+    Declare an asset the browser should fetch alongside the HTML.
+
+    Renders nothing; the declaration ends up in the response's Link header
+    (and in 103 Early Hints under ASGI).
+
+    Usage:
+        {% preload 'css/output.css' as_='style' %}
+    """
+    add_preload(context.get("request"), path, as_, mime_type=type, crossorigin=crossorigin)
+    return ""
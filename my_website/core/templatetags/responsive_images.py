@@ -0,0 +1,66 @@
+"""
+Template tags for serving project screenshots at the right size.
+"""
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from core.images import MIME_TYPES, MODERN_FORMATS
+
+register = template.Library()
+
+DEFAULT_SIZES = "(min-width: 1024px) 30rem, 100vw"
+
+
+def _srcset(variants):
+    return ", ".join(f"{default_storage.url(v['name'])} {v['width']}w" for v in variants)
+
+
+@register.simple_tag
+def responsive_image(project, alt="", sizes=DEFAULT_SIZES, css_class=""):
+    """
+    Render a project's screenshot as a <picture> with per-format srcsets.
+
+    Modern formats are offered as <source> elements and the fallback format
+    goes on the <img>, which carries intrinsic dimensions (to reserve layout
+    space), lazy loading and async decoding.
+
+    Usage:
+        {% responsive_image project alt=project.name css_class="w-full h-full object-cover" %}
+    """
+    if not project.screenshot:
+        return ""
+    alt = alt or project.name
+    variants = project.screenshot_variants or []
+    if not variants:
+        # Variants not built yet; serve the original rather than nothing
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="lazy" decoding="async">',
+            project.screenshot.url, alt, css_class,
+        )
+
+    by_format = {}
+    for variant in variants:
+        by_format.setdefault(variant["format"], []).append(variant)
+    fallback_format = next(fmt for fmt in by_format if fmt not in MODERN_FORMATS)
+    fallback = by_format[fallback_format]
+    largest = fallback[-1]
+
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[fmt], _srcset(by_format[fmt]), sizes) for fmt in MODERN_FORMATS if fmt in by_format),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" '
+        'loading="lazy" decoding="async"></picture>',
+        sources,
+        default_storage.url(fallback[0]["name"]),
+        _srcset(fallback),
+        sizes,
+        largest["width"],
+        largest["height"],
+        alt,
+        css_class,
+    )
@@ -0,0 +1,43 @@
+"""
+Test runner for the project.
+"""
+
+import logging
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+from .log import QueueLogHandler
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner that keeps expected log records out of the test output.
+
+    The suite exercises 403/404/503 paths on purpose. While it runs, the
+    configured QueueLogHandlers only pass CRITICAL records; handlers that
+    tests attach themselves still get everything. The auth event flusher
+    thread is switched off too: its writes would land outside each test's
+    transaction, so tests flush explicitly.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._settings = override_settings(
+            AUTH_EVENT_LOG={**getattr(settings, "AUTH_EVENT_LOG", {}), "background_flush": False},
+        )
+        self._settings.enable()
+        self._log_levels = {}
+        loggers = [logging.root, *logging.root.manager.loggerDict.values()]
+        for logger in loggers:
+            for handler in getattr(logger, "handlers", ()):
+                if isinstance(handler, QueueLogHandler) and handler not in self._log_levels:
+                    self._log_levels[handler] = handler.level
+                    handler.setLevel(logging.CRITICAL)
+
+    def teardown_test_environment(self, **kwargs):
+        for handler, level in self._log_levels.items():
+            handler.setLevel(level)
+        self._settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,3 +1,522 @@
-from django.test import TestCase
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import json
+import logging
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.template import Context, Template, engines
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .admission import AdmissionControlMiddleware
+from .freeze import SiteFreezer
+from .log import QueueLogHandler, RequestIDMiddleware, get_request_id
+from .maintenance import has_expire_date_index, prune_expired_sessions
+from .scheduler import Job, Scheduler, _try_lock
+from .catalog import card_cache_key, get_project_page, render_project_cards
+from .images import process_project_screenshot
+from .preload import EarlyHintsMiddleware
+from . import warmup
+from .warmup import iter_template_names, warm_templates
+from .models import Project, Tag
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ProjectCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.python = Tag.objects.create(name="python", slug="python")
+        self.projects = []
+        for i in range(5):
+            project = Project.objects.create(
+                name=f"Project {i}",
+                slug=f"project-{i}",
+                repo_url=f"https://github.com/OhACD/project-{i}",
+                pushed_at=now - timedelta(days=i // 2),
+            )
+            self.projects.append(project)
+        for project in self.projects[::2]:
+            project.tags.add(self.python)
+
+    def test_keyset_pages_cover_catalog_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = get_project_page(after=cursor, per_page=2)
+            seen.extend(project.slug for project in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [p.slug for p in Project.objects.order_by("-pushed_at", "-id")])
+
+    def test_tag_filter_and_page_render(self):
+        response = self.client.get(reverse("core:projects"), {"tag": "python"})
+        self.assertContains(response, "Project 0")
+        self.assertContains(response, "Project 4")
+        self.assertNotContains(response, "Project 1")
+
+    def test_card_cache_invalidated_on_change(self):
+        project = Project.objects.prefetch_related("tags").get(pk=self.projects[1].pk)
+        render_project_cards([project])
+        old_key = card_cache_key(project)
+        self.assertIsNotNone(cache.get(old_key))
+
+        project.tags.add(self.python)
+        project.refresh_from_db()
+        self.assertNotEqual(card_cache_key(project), old_key)
+        self.assertIn("python", render_project_cards([Project.objects.prefetch_related("tags").get(pk=project.pk)])[0])
+
+    def test_card_cache_invalidated_on_tag_edit(self):
+        project = Project.objects.prefetch_related("tags").get(pk=self.projects[0].pk)
+        render_project_cards([project])
+        keys = [card_cache_key(project)]
+
+        self.python.name, self.python.slug = "Python 3", "python3"
+        self.python.save()
+        project = Project.objects.prefetch_related("tags").get(pk=project.pk)
+        self.assertIn("?tag=python3", render_project_cards([project])[0])
+        keys.append(card_cache_key(project))
+
+        self.python.delete()
+        project = Project.objects.prefetch_related("tags").get(pk=project.pk)
+        self.assertNotIn("python3", render_project_cards([project])[0])
+        keys.append(card_cache_key(project))
+        self.assertEqual(len(set(keys)), 3)
+
+    def test_import_projects_upserts_snapshot(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        snapshot = Path(tmp.name) / "repos.json"
+        snapshot.write_text(json.dumps([
+            {"name": "project-0", "html_url": "https://github.com/OhACD/project-0", "pushed_at": "2024-01-01T00:00:00Z",
+             "description": "Updated", "topics": ["django"], "stargazers_count": 3},
+            {"name": "new-tool", "html_url": "https://github.com/OhACD/new-tool", "pushed_at": "2024-02-01T00:00:00Z"},
+            {"name": "someone-else", "html_url": "https://github.com/OhACD/fork", "pushed_at": "2024-02-01T00:00:00Z", "fork": True},
+        ]))
+        out = StringIO()
+        call_command("import_projects", str(snapshot), prune=True, stdout=out)
+
+        self.assertIn("1 created, 1 updated, 0 unchanged, 4 unpublished", out.getvalue())
+        project = Project.objects.get(slug="project-0")
+        self.assertEqual(project.description, "Updated")
+        self.assertEqual([tag.slug for tag in project.tags.all()], ["django"])
+        self.assertFalse(Project.objects.filter(slug="someone-else").exists())
+
+
+class ResponsiveImageTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.project = Project.objects.create(
+            name="Shots", slug="shots", repo_url="https://github.com/OhACD/shots", pushed_at=timezone.now(),
+        )
+
+    def render(self, project):
+        return Template("{% load responsive_images %}{% responsive_image project %}").render(Context({"project": project}))
+
+    def test_tag_emits_srcset_and_lazy_attributes(self):
+        self.project.screenshot.name = "projects/screenshots/shot.png"
+        self.project.screenshot_variants = [
+            {"format": "webp", "width": 480, "height": 270, "name": "variants/ab/abc/480.webp"},
+            {"format": "jpeg", "width": 480, "height": 270, "name": "variants/ab/abc/480.jpeg"},
+            {"format": "jpeg", "width": 960, "height": 540, "name": "variants/ab/abc/960.jpeg"},
+        ]
+        html = self.render(self.project)
+        self.assertIn('<source type="image/webp" srcset="/media/variants/ab/abc/480.webp 480w"', html)
+        self.assertIn('srcset="/media/variants/ab/abc/480.jpeg 480w, /media/variants/ab/abc/960.jpeg 960w"', html)
+        self.assertIn('width="960" height="540"', html)
+        self.assertIn('loading="lazy" decoding="async"', html)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_pipeline_is_incremental_and_never_upscales(self):
+        buffer = BytesIO()
+        Image.new("RGB", (800, 400), "teal").save(buffer, format="PNG")
+        self.project.screenshot.save("shot.png", ContentFile(buffer.getvalue()))
+
+        self.assertTrue(process_project_screenshot(self.project))
+        widths = {variant["width"] for variant in self.project.screenshot_variants}
+        self.assertEqual(widths, {480, 768, 800})
+        self.assertEqual((self.project.screenshot_width, self.project.screenshot_height), (800, 400))
+        self.assertFalse(process_project_screenshot(self.project))
+
+
+class BackgroundVideoTests(TestCase):
+    def test_video_is_deferred_behind_poster(self):
+        response = self.client.get(reverse("core:landing"))
+        self.assertContains(response, 'preload="none"')
+        self.assertContains(response, 'poster="/static/img/background-poster.svg"')
+        self.assertContains(response, 'data-src="https://cdn.pixabay.com/video/')
+        # Attached by script after load, never as an eager src attribute
+        self.assertNotContains(response, ' src="https://cdn.pixabay.com')
+
+    def test_self_hosted_source_resolves_through_static(self):
+        config = {**django_settings.BACKGROUND_VIDEO, "src": "video/background.mp4"}
+        with override_settings(BACKGROUND_VIDEO=config):
+            response = self.client.get(reverse("core:landing"))
+        self.assertContains(response, 'data-src="/static/video/background.mp4"')
+
+    @override_settings(BACKGROUND_VIDEO_ENABLED=False)
+    def test_disabled_flag_ships_poster_only(self):
+        response = self.client.get(reverse("core:landing"))
+        self.assertContains(response, "background-poster.svg")
+        self.assertNotContains(response, "<video")
+
+
+class TemplateWarmupTests(TestCase):
+    def test_warmup_fills_cached_loader(self):
+        loader = engines["django"].engine.template_loaders[0]
+        loader.reset()
+        names = list(iter_template_names())
+        self.assertIn("core/layout.html", names)
+        self.assertIn("accounts/login.html", names)
+
+        self.assertEqual(warm_templates(), len(names))
+        self.assertTrue(set(names) <= set(loader.get_template_cache))
+
+
+class PreloadTests(TestCase):
+    def test_declared_assets_become_link_header(self):
+        response = self.client.get(reverse("core:landing"))
+        link = response["Link"]
+        self.assertIn("</static/css/output.css>; rel=preload; as=style", link)
+        self.assertIn("</static/img/background-poster.svg>; rel=preload; as=image", link)
+
+    @override_settings(PRELOAD_EARLY_HINTS=True)
+    def test_early_hints_sent_for_learned_route(self):
+        self.client.get(reverse("core:about"))
+        sent = []
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "path": reverse("core:about"), "extensions": {"http.response.early_hint": {}}}
+        asyncio.run(EarlyHintsMiddleware(app)(scope, None, send))
+        self.assertEqual(sent[0]["type"], "http.response.early_hint")
+        self.assertIn(b"</static/css/output.css>; rel=preload; as=style", sent[0]["links"])
+        self.assertEqual(sent[1]["type"], "http.response.start")
+
+
+@override_settings(ADMISSION_CONTROL={
+    "auth": {"routes": ["accounts:login"], "concurrency": 1, "queue": 1, "timeout": 0.05, "retry_after": 7},
+})
+class AdmissionControlTests(TestCase):
+    def setUp(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+        def slow_view(request):
+            self.entered.set()
+            self.release.wait(5)
+            return HttpResponse("ok")
+
+        self.middleware = AdmissionControlMiddleware(slow_view)
+        self.factory = RequestFactory()
+
+    def test_saturated_group_sheds_with_retry_after(self):
+        holder = threading.Thread(target=self.middleware, args=(self.factory.post(reverse("accounts:login")),))
+        holder.start()
+        self.entered.wait(5)
+        try:
+            with self.assertLogs("core.admission", "WARNING"):
+                response = self.middleware(self.factory.post(reverse("accounts:login")))
+        finally:
+            self.release.set()
+            holder.join()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+        self.assertEqual(self.middleware.snapshot()["auth"]["shed_timeout"], 1)
+        self.assertEqual(self.middleware(self.factory.post(reverse("accounts:login"))).status_code, 200)
+
+    def test_other_routes_bypass_limits(self):
+        self.release.set()
+        self.assertEqual(self.middleware(self.factory.get(reverse("accounts:login"))).status_code, 200)
+        self.assertEqual(self.middleware.snapshot()["auth"]["admitted"], 0)
+
+    def test_metrics_view_is_staff_only(self):
+        url = reverse("core:metrics")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        staff = get_user_model().objects.create_user(email="ops@example.com", name="Ops", is_staff=True)
+        self.client.force_login(staff)
+        self.assertIn("admission", self.client.get(url).json())
+
+
+class StartupTests(TestCase):
+    def setUp(self):
+        saved = dict(warmup._state)
+        warmup._state.clear()
+        self.addCleanup(lambda: (warmup._state.clear(), warmup._state.update(saved)))
+
+    def test_ready_only_after_warmup(self):
+        url = reverse("core:ready")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+        warmup.warm_up()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()["checks"]), {"resolver", "templates", "database"})
+
+    def test_profile_fails_on_error_response_or_failed_warmup(self):
+        ok = {"load_ms": 1.0, "first_response_ms": 1.0, "total_ms": 2.0, "bytes": 10, "status": "200 OK",
+              "warmup": {"database": {"ok": True, "ms": 1.0}}}
+        runs = {
+            "First response was 500": {**ok, "status": "500 Internal Server Error"},
+            "Warm-up failed: database": {**ok, "warmup": {"database": {"ok": False, "ms": 1.0}}},
+        }
+        for message, result in runs.items():
+            with mock.patch("core.management.commands.startup_profile.Command._run", return_value=(result, [])):
+                with self.assertRaisesMessage(CommandError, message):
+                    call_command("startup_profile", runs=1, stdout=StringIO())
+
+    def test_heavy_modules_stay_out_of_url_loading(self):
+        # A fresh interpreter, since this test process has imported everything already
+        code = (
+            "import sys, django; django.setup(); from django.urls import get_resolver; get_resolver().reverse_dict;"
+            "print(','.join(m for m in ('accounts.services', 'accounts.tokens', 'concurrent.futures.process', 'csv')"
+            " if m in sys.modules)); from core import metrics; print(','.join(sorted(metrics._providers)))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, timeout=60,
+            cwd=Path(__file__).resolve().parent.parent,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "my_website.settings"},
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        heavy, providers = result.stdout.split("\n")[:2]
+        self.assertEqual(heavy, "")
+        # Their metrics are reported before the modules they guard are loaded
+        self.assertTrue({"mail_circuit", "token_negative_cache"} <= set(providers.split(",")))
+
+
+class FreezeTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output = Path(tmp.name)
+        self.project = Project.objects.create(
+            name="Frozen", slug="frozen", repo_url="https://github.com/OhACD/frozen", pushed_at=timezone.now(),
+        )
+
+    def test_pages_render_with_placeholders_and_rebuild_incrementally(self):
+        stats = SiteFreezer(self.output).build()
+        self.assertEqual((stats["rendered"], stats["unchanged"]), (3, 0))
+        landing = (self.output / "core" / "index.html").read_text()
+        self.assertIn('<div data-fragment="nav"></div>', landing)
+        self.assertIn('name="csrfmiddlewaretoken" value="" data-csrf', landing)
+        self.assertIn('src="/static/js/fragments.js"', landing)
+        self.assertIn("Frozen", (self.output / "core" / "projects" / "index.html").read_text())
+        self.assertTrue((self.output / "static" / "css" / "output.css").exists())
+
+        stats = SiteFreezer(self.output).build()
+        self.assertEqual((stats["rendered"], stats["unchanged"], stats["assets_copied"]), (0, 3, 0))
+
+        self.project.name = "Thawed"
+        self.project.save()
+        stats = SiteFreezer(self.output).build()
+        self.assertEqual((stats["rendered"], stats["unchanged"]), (1, 2))
+        self.assertIn("Thawed", (self.output / "core" / "projects" / "index.html").read_text())
+
+    def test_live_pages_keep_fragments_and_token(self):
+        user = get_user_model().objects.create_user(email="member@example.com", name="Member")
+        self.client.force_login(user)
+        response = self.client.get(reverse("core:landing"))
+        self.assertContains(response, "Member")
+        self.assertNotContains(response, "data-csrf")
+        self.assertNotContains(response, 'name="csrfmiddlewaretoken" value=""')
+
+        response = self.client.get(reverse("core:fragments"), {"name": ["nav", "messages", "bogus"]})
+        data = response.json()
+        self.assertEqual(set(data["fragments"]), {"nav", "messages"})
+        self.assertIn("Member", data["fragments"]["nav"])
+        self.assertTrue(data["csrf_token"])
+        self.assertTrue(data["authenticated"])
+        self.assertEqual(response["Cache-Control"], "private, no-store")
+
+
+class PublicShellTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_visitors_get_a_shared_token_free_shell(self):
+        response = self.client.get(reverse("core:landing"))
+        self.assertEqual(response["Cache-Control"], "public, max-age=300")
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+        self.assertEqual(len(response.cookies), 0)
+        self.assertNotIn("X-Request-ID", response)
+        self.assertContains(response, 'name="csrfmiddlewaretoken" value="" data-csrf', count=2)
+        self.assertContains(response, 'data-csrf-endpoint="/core/csrf/" data-csrf-cookie="csrftoken"')
+
+        user = get_user_model().objects.create_user(email="member@example.com", name="Member")
+        self.client.force_login(user)
+        response = self.client.get(reverse("core:landing"))
+        self.assertIn("Cookie", response["Vary"])
+        self.assertNotIn("public", response.get("Cache-Control", ""))
+        self.assertIn("X-Request-ID", response)
+
+    def test_shell_forms_are_still_csrf_protected(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        client.get(reverse("core:landing"))
+        login = reverse("accounts:login")
+        self.assertEqual(client.post(login, {"email": "a@example.com"}).status_code, 403)
+
+        response = client.get(reverse("core:csrf"))
+        self.assertEqual(response["Cache-Control"], "private, no-store")
+        token = response.json()["csrf_token"]
+        self.assertEqual(client.post(login, {"email": "a@example.com", "csrfmiddlewaretoken": token}).status_code, 302)
+        # fragments.js may also copy the cookie value into the field
+        cookie = client.cookies["csrftoken"].value
+        self.assertEqual(client.post(login, {"email": "a@example.com", "csrfmiddlewaretoken": cookie}).status_code, 302)
+        self.assertEqual(client.post(login, {"email": "a@example.com", "csrfmiddlewaretoken": "x" * 32}).status_code, 403)
+
+
+class LoggingTests(TestCase):
+    def make_handler(self, stream, name="core.tests.logging", **kwargs):
+        handler = QueueLogHandler(stream=stream, **kwargs)
+        self.addCleanup(handler.close)
+        test_logger = logging.getLogger(name)
+        test_logger.addHandler(handler)
+        self.addCleanup(test_logger.removeHandler, handler)
+        return test_logger, handler
+
+    def test_records_carry_request_id_as_json(self):
+        stream = StringIO()
+        test_logger, handler = self.make_handler(stream)
+
+        def view(request):
+            test_logger.warning("Failed to send login email: %s", "timeout", extra={"attempt": 2})
+            return HttpResponse()
+
+        response = RequestIDMiddleware(view)(RequestFactory().get("/", HTTP_X_REQUEST_ID="edge-42"))
+        self.assertEqual(response["X-Request-ID"], "edge-42")
+        forged = RequestIDMiddleware(view)(RequestFactory().get("/", HTTP_X_REQUEST_ID="a\nb"))
+        self.assertRegex(forged["X-Request-ID"], r"^[0-9a-f]{32}$")
+        self.assertRegex(self.client.get(reverse("core:csrf"))["X-Request-ID"], r"^[0-9a-f]{32}$")
+        # django.request logs 404s after the middleware chain has returned
+        request_stream = StringIO()
+        _, request_handler = self.make_handler(request_stream, name="django.request")
+        missing = self.client.get("/core/missing/")
+        request_handler.flush()
+        self.assertEqual(json.loads(request_stream.getvalue().splitlines()[0])["request_id"], missing["X-Request-ID"])
+        self.assertEqual(get_request_id(), "-")
+
+        handler.flush()
+        first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(first["request_id"], "edge-42")
+        self.assertEqual(first["message"], "Failed to send login email: timeout")
+        self.assertEqual((first["level"], first["attempt"]), ("WARNING", 2))
+        self.assertEqual(second["request_id"], forged["X-Request-ID"])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        release = threading.Event()
+
+        class BlockedStream(StringIO):
+            def write(self, data):
+                release.wait(5)
+                return super().write(data)
+
+        test_logger, handler = self.make_handler(BlockedStream(), maxsize=1)
+        started = time.monotonic()
+        for i in range(3):
+            test_logger.error("record %d", i)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertGreaterEqual(handler.dropped, 1)
+        self.assertEqual(handler.enqueued + handler.dropped, 3)
+        release.set()
+        handler.flush()
+
+    def test_bench_logging_reports_both_strategies(self):
+        out = StringIO()
+        call_command("bench_logging", requests=10, records=2, threads=2, write_latency=0, stdout=out)
+        self.assertIn("sync", out.getvalue())
+        self.assertIn("queue", out.getvalue())
+
+
+class SessionPruneTests(TestCase):
+    def setUp(self):
+        from django.contrib.sessions.models import Session
+
+        self.session_model = Session
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f"old{i}", session_data="", expire_date=now - timedelta(days=1, minutes=i))
+        Session.objects.create(session_key="live", session_data="", expire_date=now + timedelta(days=1))
+
+    def test_deletes_expired_sessions_in_batches(self):
+        seen = []
+        totals = prune_expired_sessions(batch_size=2, progress=lambda t: seen.append(t["deleted"]))
+        self.assertEqual(totals, {"deleted": 5, "batches": 3})
+        self.assertEqual(seen, [2, 4, 5])
+        self.assertEqual(list(self.session_model.objects.values_list("session_key", flat=True)), ["live"])
+        self.assertTrue(has_expire_date_index())
+
+    def test_stops_between_batches_and_command_reports(self):
+        totals = prune_expired_sessions(batch_size=2, should_stop=lambda: self.session_model.objects.count() < 5)
+        self.assertEqual(totals["deleted"], 2)
+        out = StringIO()
+        call_command("prune_sessions", batch_size=2, pause=0, stdout=out)
+        self.assertIn("Deleted 3 expired sessions in 2 batches", out.getvalue())
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.lock_dir = tmp.name
+        self.calls = []
+
+    def make_job(self, func=None, **kwargs):
+        return Job("probe", func or (lambda budget: self.calls.append(budget) or {"ok": True}), **kwargs)
+
+    def test_locked_job_runs_once_per_interval_across_workers(self):
+        first, second = self.make_job(interval=60), self.make_job(interval=60)
+        self.assertTrue(Scheduler({"probe": first}, self.lock_dir).run_job(first))
+        self.assertFalse(Scheduler({"probe": second}, self.lock_dir).run_job(second))
+        self.assertEqual(second.stats["skipped_recent"], 1)
+
+        with open(Path(self.lock_dir) / "probe.lock", "a+") as held:
+            self.assertTrue(_try_lock(held))
+            self.assertFalse(Scheduler({"probe": second}, self.lock_dir).run_job(second, force=True))
+        self.assertEqual(second.stats["skipped_locked"], 1)
+        self.assertTrue(Scheduler({"probe": second}, self.lock_dir).run_job(second, force=True))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(second.stats["last_result"], {"ok": True})
+
+    def test_budget_overruns_and_failures_are_counted(self):
+        def slow(budget):
+            while not budget.exhausted:
+                pass
+            raise RuntimeError("boom")
+
+        probe = self.make_job(slow, interval=60, budget=0.01, lock=False)
+        scheduler = Scheduler({"probe": probe}, self.lock_dir)
+        with self.assertLogs("core.scheduler", "WARNING"):
+            self.assertEqual(scheduler.run_pending(), ["probe"])
+        self.assertEqual((probe.stats["failures"], probe.stats["over_budget"]), (1, 1))
+        self.assertIn("boom", probe.stats["last_error"])
+        self.assertEqual(scheduler.run_pending(), [])
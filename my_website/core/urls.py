@@ -7,4 +7,8 @@ urlpatterns = [
     path('', views.landing_view, name='landing'),
     path('about/', views.about_view, name='about'),
     path('projects/', views.projects_view, name='projects'),
+    path('fragments/', views.fragments_view, name='fragments'),
+    path('csrf/', views.csrf_view, name='csrf'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('ready/', views.ready_view, name='ready'),
 ]
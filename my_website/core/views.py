@@ -5,9 +5,21 @@ This module handles rendering of public-facing pages like landing,
 about, and projects pages.
 """
 
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
 
+from . import metrics
+from .catalog import get_project_page, render_project_cards
+from .freeze import FRAGMENTS
+from .shell import public_shell
+from .warmup import readiness
 
+
+@public_shell
 def landing_view(request):
     """
     Render the landing page.
@@ -21,6 +33,7 @@ def landing_view(request):
     return render(request, "core/landing.html")
 
 
+@public_shell
 def about_view(request):
     """
     Render the about page.
@@ -34,9 +47,14 @@ def about_view(request):
     return render(request, "core/about.html")
 
 
+@public_shell
 def projects_view(request):
     """
-    Render the projects page.
+    Render one page of the project catalog.
+
+    Supports `?tag=<slug>` filtering and `?after=<cursor>` keyset pagination.
+    Card HTML comes from the fragment cache, so render cost depends on the
+    page size rather than the size of the catalog.
 
     Args:
         request: Django request object
@@ -44,4 +62,88 @@ def projects_view(request):
     Returns:
         Rendered projects page template
     """
-    return render(request, "core/projects.html")
+    tag = request.GET.get("tag") or None
+    projects, next_cursor = get_project_page(tag=tag, after=request.GET.get("after"))
+    return render(request, "core/projects.html", {
+        "cards": render_project_cards(projects),
+        "active_tag": tag,
+        "next_cursor": next_cursor,
+    })
+
+
+@require_GET
+def fragments_view(request):
+    """
+    Render the per-visitor fragments of a frozen page.
+
+    Takes `?name=<fragment>` (repeatable) and always includes a CSRF token
+    for the page's forms. Unknown names are ignored.
+
+    Args:
+        request: Django request object
+
+    Returns:
+        JSON response with {"fragments": {name: html}, "csrf_token": token,
+        "authenticated": bool}
+    """
+    names = [name for name in dict.fromkeys(request.GET.getlist("name")) if name in FRAGMENTS]
+    response = JsonResponse({
+        "fragments": {name: render_to_string(f"core/fragments/{name}.html", request=request) for name in names},
+        "csrf_token": get_token(request),
+        "authenticated": request.user.is_authenticated,
+    })
+    response["Cache-Control"] = "private, no-store"
+    return response
+
+
+@require_GET
+def csrf_view(request):
+    """
+    Hand out a CSRF token for a form on a cached page (see core.shell).
+
+    Sets the CSRF cookie if the visitor has none. Other sites cannot read
+    the response, so this gives them nothing a page's hidden field would not.
+
+    Args:
+        request: Django request object
+
+    Returns:
+        JSON response with {"csrf_token": token}
+    """
+    response = JsonResponse({"csrf_token": get_token(request)})
+    response["Cache-Control"] = "private, no-store"
+    return response
+
+
+@staff_member_required
+def metrics_view(request):
+    """
+    Report in-process metrics from every registered provider (staff only).
+
+    Args:
+        request: Django request object
+
+    Returns:
+        JSON response with one section per provider
+    """
+    response = JsonResponse(metrics.collect())
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def ready_view(request):
+    """
+    Readiness probe: 200 once startup warm-up has finished, 503 before.
+
+    Reads only in-process state, so it stays cheap under load.
+
+    Args:
+        request: Django request object
+
+    Returns:
+        JSON response with the outcome of each warm-up step
+    """
+    ready, checks = readiness()
+    response = JsonResponse({"ready": ready, "checks": checks}, status=200 if ready else 503)
+    response["Cache-Control"] = "no-store"
+    return response
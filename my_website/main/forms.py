@@ -1,8 +1,59 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.auth.signals import user_login_failed
+
+from main import hashing
 
 User = get_user_model()
 
+# Backend recorded on the session; pooled verification replaces only the
+# password check, so the stock backend still restores the user later.
+LOGIN_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+
+class PooledAuthenticationForm(AuthenticationForm):
+    """
+    AuthenticationForm that verifies the password on the hashing pool.
+
+    Mirrors ModelBackend.authenticate: unknown users still cost one hash,
+    inactive users are rejected, and outdated hashes are upgraded when
+    PASSWORD_HASH_POOL["upgrade"] is on. Raises hashing.PasswordHashingBusy
+    when the pool is saturated.
+    """
+
+    def clean(self):
+        username = self.cleaned_data.get("username")
+        password = self.cleaned_data.get("password")
+        if username is not None and password:
+            self.user_cache = self._authenticate(username, password)
+            if self.user_cache is None:
+                user_login_failed.send(
+                    sender=__name__, credentials={"username": username}, request=self.request,
+                )
+                raise self.get_invalid_login_error()
+            self.confirm_login_allowed(self.user_cache)
+        return self.cleaned_data
+
+    def _authenticate(self, username, password):
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            hashing.make_password(password)
+            return None
+
+        def upgrade(raw):
+            hashing.set_password(user, raw)
+            user.save(update_fields=["password"])
+
+        setter = upgrade if hashing.get_pool_config()["upgrade"] else None
+        if not hashing.check_password(password, user.password, setter=setter):
+            return None
+        if not getattr(user, "is_active", True):
+            return None
+        user.backend = LOGIN_BACKEND
+        return user
+
 
 class RegisterForm(forms.ModelForm):
     email = forms.EmailField(widget=forms.EmailInput(attrs={'placeholder': 'Email'}))
@@ -41,7 +92,7 @@ class RegisterForm(forms.ModelForm):
 
     def save(self, commit=True):
         user = super().save(commit=False)
-        user.set_password(self.cleaned_data["password"])
+        hashing.set_password(user, self.cleaned_data["password"])
         if commit:
             user.save()
         return user
@@ -0,0 +1,212 @@
+"""
+Password hashing for the main app on a bounded process pool.
+
+PBKDF2 at Django's default work factor costs hundreds of milliseconds of
+CPU per call. Running it inline ties up the request thread for that long,
+and a handful of concurrent logins can take every core the process has.
+Here the parent picks the hasher and salt (so settings are only read in
+the web process) and ships the pure computation to worker processes. A
+per-process semaphore caps how many hashes may be queued or running;
+beyond that callers get PasswordHashingBusy instead of piling up.
+
+Configured with the PASSWORD_HASH_POOL setting:
+
+    PASSWORD_HASH_POOL = {
+        "workers": 2,          # processes; 0 hashes inline (tests, dev)
+        "max_pending": 4,      # hashes queued or running per process
+        "timeout": 5.0,        # seconds to wait for a slot or a result
+        "upgrade": True,       # re-hash outdated passwords on login
+    }
+"""
+
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher, is_password_usable
+from django.utils.crypto import get_random_string
+from django.utils.module_loading import import_string
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL = {"workers": 2, "max_pending": 4, "timeout": 5.0, "upgrade": True}
+
+_pool = None
+_pool_key = None
+_slots = None
+_pool_lock = threading.Lock()
+_stats = {"hashes": 0, "busy": 0}
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when no hashing slot frees up within the timeout."""
+
+
+def get_pool_config():
+    """
+    Return the effective PASSWORD_HASH_POOL configuration.
+
+    Returns:
+        Dictionary with workers, max_pending, timeout and upgrade
+    """
+    return {**DEFAULT_POOL, **getattr(settings, "PASSWORD_HASH_POOL", {})}
+
+
+def _hasher_path(hasher):
+    return f"{hasher.__class__.__module__}.{hasher.__class__.__qualname__}"
+
+
+def _encode(hasher_path, password, salt):
+    """Worker: hash a password with an explicit salt."""
+    return import_string(hasher_path)().encode(password, salt)
+
+
+def _verify(hasher_path, password, encoded, harden):
+    """Worker: verify a password, padding the runtime of outdated hashes on failure."""
+    hasher = import_string(hasher_path)()
+    is_correct = hasher.verify(password, encoded)
+    if not is_correct and harden:
+        hasher.harden_runtime(password, encoded)
+    return is_correct
+
+
+def _get_executor(config):
+    """Return the shared pool and slot semaphore, rebuilding them if the config changed."""
+    global _pool, _pool_key, _slots
+    key = (config["workers"], config["max_pending"])
+    with _pool_lock:
+        if _pool_key != key:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # multiprocessing is imported on first use to keep it out of startup
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: forking a multi-threaded web process can copy held locks
+            _pool = ProcessPoolExecutor(
+                max_workers=config["workers"], mp_context=multiprocessing.get_context("spawn"),
+            ) if config["workers"] else None
+            _slots = threading.BoundedSemaphore(config["max_pending"])
+            _pool_key = key
+        return _pool, _slots
+
+
+def _discard_pool(pool):
+    """Drop a broken pool so the next call starts a fresh one."""
+    global _pool_key
+    logger.error("Password hashing pool broke; a new one will be started")
+    with _pool_lock:
+        if _pool is pool:
+            _pool_key = None
+
+
+def _run(func, *args):
+    """
+    Run a hashing function within the per-process cap.
+
+    Raises:
+        PasswordHashingBusy: If no slot frees up (or the result does not
+            arrive) within the configured timeout
+    """
+    config = get_pool_config()
+    pool, slots = _get_executor(config)
+    if not slots.acquire(timeout=config["timeout"]):
+        _stats["busy"] += 1
+        raise PasswordHashingBusy("Password hashing is saturated")
+    _stats["hashes"] += 1
+    if pool is None:
+        try:
+            return func(*args)
+        finally:
+            slots.release()
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    try:
+        future = pool.submit(func, *args)
+    except BrokenProcessPool:
+        slots.release()
+        _discard_pool(pool)
+        raise
+    # The slot stays taken until the worker is really done, even if we time out
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=config["timeout"])
+    except FutureTimeout as e:
+        _stats["busy"] += 1
+        raise PasswordHashingBusy("Password hashing timed out") from e
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def make_password(password):
+    """
+    Hash a password with the preferred hasher on the pool.
+
+    Args:
+        password: Raw password
+
+    Returns:
+        Encoded password for storage
+
+    Raises:
+        PasswordHashingBusy: If the pool is saturated
+    """
+    hasher = get_hasher()
+    return _run(_encode, _hasher_path(hasher), password, hasher.salt())
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Verify a password on the pool, mirroring django.contrib.auth.hashers.
+
+    Unusable or unrecognised hashes still cost one hash so response time
+    does not reveal them. When the password is correct but was stored with
+    an outdated hasher or work factor, setter(password) is called so the
+    caller can store a fresh hash.
+
+    Args:
+        password: Raw password
+        encoded: Stored password hash
+        setter: Optional callable taking the raw password
+
+    Returns:
+        True if the password matches
+
+    Raises:
+        PasswordHashingBusy: If the pool is saturated
+    """
+    try:
+        hasher = identify_hasher(encoded) if password is not None and is_password_usable(encoded) else None
+    except ValueError:
+        hasher = None
+    if hasher is None:
+        make_password(get_random_string(40))
+        return False
+
+    preferred = get_hasher()
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = _run(_verify, _hasher_path(hasher), password, encoded, must_update and not hasher_changed)
+    if is_correct and must_update and setter is not None:
+        setter(password)
+    return is_correct
+
+
+def set_password(user, password):
+    """Store a pooled hash of password on user (unsaved)."""
+    user.password = make_password(password)
+    user._password = password
+
+
+def snapshot():
+    """Pool configuration and counters for the metrics view."""
+    config = get_pool_config()
+    return {"workers": config["workers"], "max_pending": config["max_pending"], **_stats}
+
+
+metrics.register("password_hashing", snapshot)
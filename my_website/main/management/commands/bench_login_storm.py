@@ -0,0 +1,102 @@
+"""
+Measure page throughput while a login storm hashes passwords.
+
+Storm threads verify a PBKDF2 password back to back while page threads
+fetch the landing page. Each mode runs for the same duration: no storm
+(baseline), inline hashing (workers=0) and the process pool at each
+requested size. The interesting column is pages/s relative to baseline.
+"""
+
+import statistics
+import threading
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from main import hashing
+
+STORM_PASSWORD = "storm-password"
+
+
+class Command(BaseCommand):
+    help = "Benchmark page throughput during a password login storm (inline vs process pool)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode (default: 5)")
+        parser.add_argument("--storm-threads", type=int, default=8, help="Concurrent login attempts (default: 8)")
+        parser.add_argument("--page-threads", type=int, default=2, help="Concurrent page fetchers (default: 2)")
+        parser.add_argument(
+            "--workers", type=int, action="append", dest="workers",
+            help="Pool size to test; 0 hashes inline (repeatable, default: 0 and 2)",
+        )
+        parser.add_argument("--max-pending", type=int, default=4, help="Hashes queued or running (default: 4)")
+
+    def handle(self, *args, **options):
+        if options["duration"] <= 0 or options["storm_threads"] < 1 or options["page_threads"] < 1:
+            raise CommandError("--duration, --storm-threads and --page-threads must be positive")
+        encoded = make_password(STORM_PASSWORD)
+        modes = [("baseline", None)] + [
+            ("inline" if workers == 0 else f"pool x{workers}", workers)
+            for workers in options["workers"] or [0, 2]
+        ]
+
+        header = f"{'mode':<12}{'pages/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'logins/s':>10}{'busy':>6}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for label, workers in modes:
+            pool = {"workers": workers or 0, "max_pending": options["max_pending"], "timeout": 5.0, "upgrade": False}
+            with override_settings(PASSWORD_HASH_POOL=pool):
+                if workers is not None:
+                    hashing.check_password(STORM_PASSWORD, encoded)  # start workers before timing
+                result = self._run(encoded, workers is not None, options)
+            self.stdout.write(
+                f"{label:<12}{result['pages'] / options['duration']:>9.1f}{result['p50']:>9.1f}"
+                f"{result['p95']:>9.1f}{result['logins'] / options['duration']:>10.1f}{result['busy']:>6}"
+            )
+
+    def _run(self, encoded, storm, options):
+        """Run page (and optionally storm) threads for the configured duration."""
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies, counts = [], {"logins": 0, "busy": 0}
+        url = reverse("core:landing")
+
+        def fetch_pages():
+            client = Client(HTTP_HOST="localhost")
+            while not stop.is_set():
+                started = time.perf_counter()
+                client.get(url)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+
+        def log_in():
+            while not stop.is_set():
+                try:
+                    hashing.check_password(STORM_PASSWORD, encoded)
+                    key = "logins"
+                except hashing.PasswordHashingBusy:
+                    key = "busy"
+                with lock:
+                    counts[key] += 1
+
+        threads = [threading.Thread(target=fetch_pages) for _ in range(options["page_threads"])]
+        if storm:
+            threads += [threading.Thread(target=log_in) for _ in range(options["storm_threads"])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options["duration"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        ordered = sorted(latencies) or [0.0]
+        return {
+            "pages": len(latencies),
+            "p50": statistics.median(ordered),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            **counts,
+        }
@@ -1,3 +1,53 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from . import hashing
+
+User = get_user_model()
+
+INLINE_POOL = {"workers": 0, "max_pending": 1, "timeout": 0.05, "upgrade": True}
+
+
+@override_settings(PASSWORD_HASH_POOL=INLINE_POOL)
+class PooledPasswordTests(TestCase):
+    def test_register_then_login(self):
+        self.client.post(reverse("register"), {
+            "email": "legacy@example.com", "name": "Legacy", "password": "s3cret-pass", "password2": "s3cret-pass",
+        })
+        user = User.objects.get(email="legacy@example.com")
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(user.check_password("s3cret-pass"))
+
+        self.client.logout()
+        response = self.client.post(reverse("login"), {"username": "legacy@example.com", "password": "s3cret-pass"})
+        self.assertRedirects(response, reverse("index"), fetch_redirect_response=False)
+        response = self.client.post(reverse("login"), {"username": "legacy@example.com", "password": "wrong"})
+        self.assertContains(response, "Invalid Credentials")
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        user = User.objects.create_user(email="old@example.com", name="Old")
+        user.password = make_password("s3cret-pass", hasher="pbkdf2_sha1")
+        user.save()
+
+        self.client.post(reverse("login"), {"username": "old@example.com", "password": "s3cret-pass"})
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+
+    def test_saturated_pool_returns_503(self):
+        User.objects.create_user(email="busy@example.com", name="Busy", password="s3cret-pass")
+        _, slots = hashing._get_executor(hashing.get_pool_config())
+        slots.acquire()
+        try:
+            response = self.client.post(reverse("login"), {"username": "busy@example.com", "password": "s3cret-pass"})
+        finally:
+            slots.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    @override_settings(PASSWORD_HASH_POOL={**INLINE_POOL, "workers": 1, "timeout": 30})
+    def test_process_pool_round_trip(self):
+        encoded = hashing.make_password("s3cret-pass")
+        self.assertTrue(hashing.check_password("s3cret-pass", encoded))
+        self.assertFalse(hashing.check_password("wrong", encoded))
@@ -1,9 +1,9 @@
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.forms import AuthenticationForm
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import render
 from django.urls import reverse
-from main.forms import RegisterForm
+from main.forms import PooledAuthenticationForm, RegisterForm
+from main.hashing import PasswordHashingBusy
 
 # Create your views here.
 def index(request):
@@ -19,18 +19,28 @@ def _apply_auth_form_styles(form):
     return form
 
 
+def _hashing_busy():
+    response = HttpResponse("The server is busy. Please try again shortly.", status=503, content_type="text/plain")
+    response["Retry-After"] = "5"
+    return response
+
+
 def login_view(request):
     if request.method == 'POST':
-        form = _apply_auth_form_styles(AuthenticationForm(request, data=request.POST))
-        if form.is_valid():
+        form = _apply_auth_form_styles(PooledAuthenticationForm(request, data=request.POST))
+        try:
+            valid = form.is_valid()
+        except PasswordHashingBusy:
+            return _hashing_busy()
+        if valid:
             user = form.get_user()
             login(request, user)
             return HttpResponseRedirect(reverse('index'))
         else:
-            new_form = _apply_auth_form_styles(AuthenticationForm(request))
+            new_form = _apply_auth_form_styles(PooledAuthenticationForm(request))
             return render(request, 'main/login.html', {'form': new_form, 'message': 'Invalid Credentials'})
     else:
-        form = _apply_auth_form_styles(AuthenticationForm())
+        form = _apply_auth_form_styles(PooledAuthenticationForm())
 
     return render(request, 'main/login.html', {'form': form})
 
@@ -42,7 +52,10 @@ def register_view(request):
     if request.method == 'POST':
         form = RegisterForm(request.POST)
         if form.is_valid():
-            user = form.save()
+            try:
+                user = form.save()
+            except PasswordHashingBusy:
+                return _hashing_busy()
             login(request, user)
             return HttpResponseRedirect(reverse('login'))
     else:
@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_website.settings')
 
-application = get_asgi_application()
+from core.preload import EarlyHintsMiddleware  # noqa: E402
+
+application = EarlyHintsMiddleware(get_asgi_application())
+
+# Resolve URLs, compile templates and check the DB before the first request
+from core.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -3,22 +3,28 @@ Django settings for my_website project.
 
 This module configures Django settings including database, authentication,
 static files, and email backend. Environment variables are loaded from
-a .env file using python-dotenv.
+a .env file using python-dotenv when one exists.
 
 For more information, see:
 https://docs.djangoproject.com/en/5.2/topics/settings/
 """
 
-from dotenv import load_dotenv
 import os
 from pathlib import Path
 
-# Load environment variables from .env file
-load_dotenv()
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Load environment variables from a .env file, if there is one. Deployed
+# workers get their environment directly, so they skip importing dotenv and
+# searching the filesystem on every cold start.
+for _env_file in (Path(__file__).resolve().parent / ".env", BASE_DIR / ".env", BASE_DIR.parent / ".env"):
+    if _env_file.is_file():
+        from dotenv import load_dotenv
+
+        load_dotenv(_env_file)
+        break
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -54,7 +60,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.log.RequestIDMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.preload.PreloadMiddleware',
+    'core.admission.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,6 +80,20 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
+# Seconds before a stalled SMTP connection gives up (None waits forever)
+EMAIL_TIMEOUT = int(os.getenv("DJANGO_EMAIL_TIMEOUT", "10"))
+
+# Fail fast while SMTP is down (see core/circuit.py): open after half of at
+# least min_calls sends within window seconds fail, probe after open_seconds.
+# State lives in the "breaker" cache (see CACHES), shared by all workers.
+MAIL_CIRCUIT_BREAKER = {
+    "enabled": True,
+    "failure_rate": 0.5,
+    "min_calls": 5,
+    "window": 60,
+    "open_seconds": 30,
+    "cache": "breaker",
+}
 
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
@@ -78,23 +101,143 @@ AUTHENTICATION_BACKENDS = [
 
 ROOT_URLCONF = 'my_website.urls'
 
+# Templates are always served through the cached loader so each file is read
+# and compiled once per process; in development the autoreloader clears the
+# cache when a template changes. Server entry points (wsgi.py / asgi.py)
+# precompile every template at startup when TEMPLATE_WARMUP is on.
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Concurrency limits for expensive POST endpoints (see core/admission.py).
+# Magic-link routes write to the DB and send mail; password routes run
+# PBKDF2. Each group sheds with 503 + Retry-After once its queue is full.
+ADMISSION_CONTROL = {
+    "magic_link": {
+        "routes": ["accounts:register", "accounts:login", "accounts:api_register", "accounts:api_login"],
+        "concurrency": int(os.getenv("DJANGO_ADMISSION_MAGIC_LINK_CONCURRENCY", "4")),
+        "queue": 8,
+        "timeout": 2.0,
+        "retry_after": 5,
+    },
+    "password": {
+        "routes": ["login", "register"],
+        "concurrency": int(os.getenv("DJANGO_ADMISSION_PASSWORD_CONCURRENCY", "2")),
+        "queue": 4,
+        "timeout": 2.0,
+        "retry_after": 5,
+    },
+}
+
+# Password hashing for the legacy main app runs on a process pool so PBKDF2
+# does not tie up request threads (see main/hashing.py). 0 workers = inline.
+PASSWORD_HASH_POOL = {
+    "workers": int(os.getenv("DJANGO_PASSWORD_HASH_WORKERS", "2")),
+    "max_pending": int(os.getenv("DJANGO_PASSWORD_HASH_MAX_PENDING", "4")),
+    "timeout": 5.0,
+    "upgrade": True,
+}
+
+# Auth events are buffered in memory and written in batches after responses
+# and by a per-process flusher thread (see accounts/events.py); when the
+# buffer is full new events are dropped.
+AUTH_EVENT_LOG = {
+    "enabled": True,
+    "max_buffer": 5000,
+    "flush_size": 100,
+    "flush_interval": 5.0,
+    "background_flush": True,
+}
+
+# Periodic housekeeping jobs (see core/scheduler.py). With autostart the
+# scheduler thread starts on each process's first request; otherwise run
+# `manage.py run_scheduler` as its own process. Workers on one host share
+# lock_dir so each locked job runs once per interval host-wide.
+SCHEDULER = {
+    "autostart": os.getenv("DJANGO_SCHEDULER_AUTOSTART", "False").lower() == "true",
+    "lock_dir": os.getenv("DJANGO_SCHEDULER_LOCK_DIR", str(BASE_DIR.parent / ".scheduler")),
+    "startup_delay": 60,
+    "jobs": {},
+}
+
+# Magic-link signing keys by ID (see accounts/keyring.py); created and rotated
+# by `manage.py rotate_magic_link_keys`. Until it exists, SECRET_KEY is key 0.
+MAGIC_LINK_KEYRING = os.getenv("MAGIC_LINK_KEYRING", str(BASE_DIR.parent / "magic_link_keys.json"))
+
+# Accept pre-compact (django.core.signing) magic-link tokens. Turn off once
+# the longest-lived legacy token (24h verification links) has expired.
+MAGIC_LINK_ACCEPT_LEGACY_TOKENS = True
+
+# Per-process LRU capacity for rejected/consumed magic-link tokens
+MAGIC_LINK_NEGATIVE_CACHE_SIZE = 10000
+
+# Send 103 Early Hints for learned preloads when served over ASGI by a server
+# that supports the http.response.early_hint extension (e.g. Hypercorn)
+PRELOAD_EARLY_HINTS = os.getenv("DJANGO_PRELOAD_EARLY_HINTS", "False").lower() == "true"
+
+# Public pages are served to visitors without a session as one cacheable,
+# token-free shell; fragments.js fills in CSRF fields and member parts
+# (see core/shell.py)
+PUBLIC_SHELL = {
+    "enabled": os.getenv("DJANGO_PUBLIC_SHELL", "True").lower() == "true",
+    "max_age": int(os.getenv("DJANGO_PUBLIC_SHELL_MAX_AGE", "300")),
+}
+
+TEMPLATE_WARMUP = os.getenv("DJANGO_TEMPLATE_WARMUP", "True").lower() == "true"
+
+# Every logger writes through one bounded queue; a listener thread does the
+# I/O (see core/log.py). Records carry the request's X-Request-ID. Set
+# DJANGO_LOG_FORMAT=text for plain lines, DJANGO_LOG_FILE to write a file.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "require_debug_false": {"()": "django.utils.log.RequireDebugFalse"},
+    },
+    "handlers": {
+        "queue": {
+            "()": "core.log.QueueLogHandler",
+            "stream": "ext://sys.stderr",
+            "filename": os.getenv("DJANGO_LOG_FILE") or None,
+            "maxsize": int(os.getenv("DJANGO_LOG_QUEUE_SIZE", "10000")),
+            "structured": os.getenv("DJANGO_LOG_FORMAT", "json").lower() == "json",
+        },
+        # Django's default: server errors emailed to ADMINS when DEBUG is off
+        "mail_admins": {
+            "level": "ERROR",
+            "filters": ["require_debug_false"],
+            "class": "django.utils.log.AdminEmailHandler",
+        },
+    },
+    "root": {"handlers": ["queue"], "level": os.getenv("DJANGO_LOG_LEVEL", "INFO")},
+    "loggers": {
+        # Replace Django's own console handler so nothing writes synchronously
+        "django": {"handlers": ["queue", "mail_admins"], "level": "INFO", "propagate": False},
+        "django.server": {"handlers": ["queue"], "level": "INFO", "propagate": False},
+    },
+}
+
 WSGI_APPLICATION = 'my_website.wsgi.application'
 
+# Quiets the log handlers while the suite runs (see core/testing.py)
+TEST_RUNNER = 'core.testing.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -106,6 +249,24 @@ DATABASES = {
     }
 }
 
+# The default cache (rate limits, rendered project cards, rejected
+# magic-link tokens) stays in process memory: those are read on hot paths
+# and must not cost database queries. The mail circuit breaker needs state
+# shared by every worker, so it gets its own alias. DJANGO_BREAKER_CACHE
+# picks its backend: "db" (default; the table is created by migrate), a
+# redis:// URL, or "locmem" (per process, so only for a single worker).
+_breaker_cache = os.getenv("DJANGO_BREAKER_CACHE", "db")
+if _breaker_cache.startswith(("redis://", "rediss://")):
+    _breaker_backend = {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": _breaker_cache}
+elif _breaker_cache == "locmem":
+    _breaker_backend = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "breaker"}
+else:
+    _breaker_backend = {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "django_cache"}
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "breaker": _breaker_backend,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -145,6 +306,41 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR.parent / 'static',
 ]
+STATIC_ROOT = BASE_DIR.parent / 'staticfiles'
+
+# Fingerprinted file names in production so assets can be cached forever;
+# run `collectstatic` after every deploy.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+            if DEBUG else
+            'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Page background loop. Loading is deferred until after the page's load
+# event and skipped for Save-Data and reduced-motion clients; set
+# DJANGO_BACKGROUND_VIDEO=False to ship the poster only. `src` is a static
+# path (e.g. video/background.mp4 once committed) or an absolute URL; it
+# defaults to the CDN copy until the self-hosted file is in static/video/.
+BACKGROUND_VIDEO_ENABLED = os.getenv("DJANGO_BACKGROUND_VIDEO", "True").lower() == "true"
+BACKGROUND_VIDEO = {
+    'src': os.getenv(
+        "DJANGO_BACKGROUND_VIDEO_SRC",
+        "https://cdn.pixabay.com/video/2025/11/05/314142_small.mp4?download",
+    ),
+    'type': 'video/mp4',
+    'poster': 'img/background-poster.svg',
+}
+
+# User uploads (project screenshots) and their generated variants
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR.parent / 'media'
 
 CSRF_TRUSTED_ORIGINS = [
     origin.strip()
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_website.settings')
 
 application = get_wsgi_application()
+
+# Resolve URLs, compile templates and check the DB before the first request
+from core.warmup import warm_up  # noqa: E402
+
+warm_up()
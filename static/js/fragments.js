@@ -0,0 +1,51 @@
+// Fills the per-visitor parts of a public shell or frozen page: {% dynamic_fragment %}
+// slots and {% csrf_input %} fields, from one request to /core/fragments/.
+(function () {
+  const script = document.currentScript;
+  const slots = Array.from(document.querySelectorAll('[data-fragment]'));
+  const csrfInputs = Array.from(document.querySelectorAll('input[data-csrf]'));
+  if (!slots.length && !csrfInputs.length) return;
+
+  const fillCsrf = token => { csrfInputs.forEach(input => { input.value = token; }); };
+  const getJSON = url => fetch(url, { credentials: 'same-origin', headers: { Accept: 'application/json' } })
+    .then(response => (response.ok ? response.json() : Promise.reject(response.status)));
+
+  // A readable CSRF cookie already holds a valid token: no request needed
+  const cookieName = script.dataset.csrfCookie;
+  if (cookieName) {
+    const cookie = document.cookie.split('; ').find(pair => pair.startsWith(`${cookieName}=`));
+    if (cookie) fillCsrf(decodeURIComponent(cookie.slice(cookieName.length + 1)));
+  }
+
+  // A form submitted before its token arrived fetches one first
+  if (script.dataset.csrfEndpoint) {
+    csrfInputs.forEach(input => {
+      if (!input.form) return;
+      input.form.addEventListener('submit', event => {
+        if (input.value) return;
+        event.preventDefault();
+        getJSON(script.dataset.csrfEndpoint)
+          .then(data => fillCsrf(data.csrf_token))
+          .catch(() => {})
+          .then(() => input.form.submit());
+      });
+    });
+  }
+
+  const url = new URL(script.dataset.endpoint, window.location.href);
+  slots.forEach(slot => url.searchParams.append('name', slot.dataset.fragment));
+
+  getJSON(url)
+    .then(data => {
+      slots.forEach(slot => {
+        const html = data.fragments[slot.dataset.fragment];
+        if (html !== undefined) slot.innerHTML = html;
+      });
+      if (data.authenticated) {
+        document.querySelectorAll('[data-anonymous-only]').forEach(element => element.remove());
+      }
+      fillCsrf(data.csrf_token);
+      document.dispatchEvent(new CustomEvent('fragments:loaded'));
+    })
+    .catch(() => {});
+})();